@@ -13,7 +13,7 @@ class FeedPropertiesDialog(QtWidgets.QDialog):
         QtCore.QTimer.singleShot(0, self.populateDialog)
 
     def populateDialog(self):
-        self.feed = self.db.getFeed(self.feedId)
+        self.feed = self.db.getFeed(self.feedId, includeImages=True)
 
         self.ui.titleLabel.setText(self.feed.m_feedTitle)
         self.ui.urlLabel.setText(self.feed.m_feedUrl)
@@ -21,3 +21,33 @@ class FeedPropertiesDialog(QtWidgets.QDialog):
         self.ui.lastUpdatedLabel.setText(str(self.feed.m_feedLastUpdated))
         self.ui.lastPurgedLabel.setText(str(self.feed.m_feedLastPurged))
         self.ui.feedIconLabel.setPixmap(self.feed.m_feedFavicon)
+
+        itemCount = self.db.getFeedItemCount(self.feedId)
+
+        if self.feed.m_retentionItems > 0:
+            self.ui.itemCountLabel.setText("{} of {}".format(itemCount, self.feed.m_retentionItems))
+        else:
+            self.ui.itemCountLabel.setText(str(itemCount))
+
+        self.ui.retentionDaysSpinBox.setValue(self.feed.m_retentionDays)
+        self.ui.retentionItemsSpinBox.setValue(self.feed.m_retentionItems)
+        self.ui.keepUnreadCheckBox.setChecked(self.feed.m_keepUnreadItems)
+        self.ui.keepItemsOfInterestCheckBox.setChecked(self.feed.m_keepItemsOfInterest)
+
+        self.ui.nextUpdateLabel.setText(str(self.feed.m_nextUpdate))
+        self.ui.minUpdateIntervalSpinBox.setValue(self.feed.m_minUpdateInterval)
+        self.ui.maxUpdateIntervalSpinBox.setValue(self.feed.m_maxUpdateInterval // 60)
+
+    def accept(self):
+        # The retention policy is applied the next time the feed is updated
+        self.db.setFeedRetentionPolicy(self.feedId,
+                                       self.ui.retentionDaysSpinBox.value(),
+                                       self.ui.retentionItemsSpinBox.value(),
+                                       self.ui.keepUnreadCheckBox.isChecked(),
+                                       self.ui.keepItemsOfInterestCheckBox.isChecked())
+
+        # The update intervals apply from the feed's next update
+        self.db.setFeedUpdateIntervals(self.feedId,
+                                       self.ui.minUpdateIntervalSpinBox.value(),
+                                       self.ui.maxUpdateIntervalSpinBox.value() * 60)
+        super(FeedPropertiesDialog, self).accept()
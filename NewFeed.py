@@ -1,17 +1,17 @@
 from PySide6 import QtCore, QtWidgets
 from feed_identifier import FeedIdentifier
-from proxy import Proxy
+from network_fetcher import NetworkFetcher
 from ui_NewFeedDlg import Ui_NewFeedDlg
 
 class NewFeedDialog(QtWidgets.QDialog):
-    def __init__(self, parent, proxy: Proxy):
+    def __init__(self, parent, networkFetcher: NetworkFetcher):
         super(NewFeedDialog, self).__init__(parent)
 
         self.ui = Ui_NewFeedDlg()
         self.ui.setupUi(self)
 
-        self.proxy = proxy
-        self.feedIdentifier = FeedIdentifier(self.proxy)
+        self.feedIdentifier = FeedIdentifier(networkFetcher)
+        self.feedIdentifier.feedIdentifiedSignal.connect(self.onFeedIdentified)
         self.feed = None
 
         self.ui.nextButton.setEnabled(False)
@@ -24,22 +24,33 @@ class NewFeedDialog(QtWidgets.QDialog):
     @QtCore.Slot()
     def on_nextButton_clicked(self):
         if self.ui.stackedWidget.currentIndex() == 0:
-            feedUrl = self.ui.feedUrlEdit.text()
-            self.feed = self.feedIdentifier.identifyFeed(feedUrl)
-
-            if self.feed is None or not self.feed.isValid():
-                QtWidgets.QMessageBox.critical(self, "RssReader", "Feed not valid")
-                return
-
-            self.ui.stackedWidget.setCurrentIndex(1)
-            self.ui.nextButton.setText("Add Feed")
-            self.ui.feedUrlLabel.setText(feedUrl)
-            self.ui.feedNameLabel.setText(self.feed.m_feedTitle)
-            self.ui.descriptionLabel.setText(self.feed.m_feedDescription)
+            # The dialog stays responsive while the feed is fetched; onFeedIdentified() is called when it is done
+            self.ui.nextButton.setEnabled(False)
+            self.ui.feedUrlEdit.setEnabled(False)
+            self.feedIdentifier.identifyFeed(self.ui.feedUrlEdit.text())
         else:
             # If we're on the second page of the stacked widget, then clicking this button is
             # equivalent to clicking OK, which accepts the feed.
             self.accept()
 
+    def onFeedIdentified(self, feed):
+        self.feed = feed
+        self.ui.nextButton.setEnabled(True)
+        self.ui.feedUrlEdit.setEnabled(True)
+
+        if self.feed is None or not self.feed.isValid():
+            QtWidgets.QMessageBox.critical(self, "RssReader", "Feed not valid")
+            return
+
+        self.ui.stackedWidget.setCurrentIndex(1)
+        self.ui.nextButton.setText("Add Feed")
+        self.ui.feedUrlLabel.setText(self.feed.m_feedUrl)
+        self.ui.feedNameLabel.setText(self.feed.m_feedTitle)
+        self.ui.descriptionLabel.setText(self.feed.m_feedDescription)
+
+    def reject(self):
+        self.feedIdentifier.cancel()
+        super(NewFeedDialog, self).reject()
+
     def getFeed(self):
         return self.feed
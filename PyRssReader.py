@@ -1,25 +1,31 @@
 import sys
 import os.path
+import datetime
 import logging
 from logging.handlers import RotatingFileHandler
 from PySide6 import QtCore, QtGui, QtWidgets
 from pathlib import Path
 from content_view_new import RssContentViewNew
 from database import Database
+from database_writer import DatabaseWriter
+from database_connections import ReadConnectionProvider
+from read_state_buffer import ReadStateBuffer
 from language_filter import LanguageFilter
 from ad_filter import AdFilter
 from prefetch_statusbar_widget import PrefetchStatusbarWidget
 from image_cache import ImageCache
 from image_prefetcher import ImagePrefetcher
-from feed_item_filter_matcher import FeedItemFilterMatcher
 from feed_tree import FeedTree
 from title_tree import TitleTree, kDateColumn
 from content_view import RssContentView
 from feed_updater import FeedUpdater
+from network_fetcher import NetworkFetcher
 from preferences_dialog import PrefsDialog
 from NewFeed import NewFeedDialog
 from purge_dialog import PurgeDialog
 from feed_purger import FeedPurger
+from body_recompressor import BodyRecompressor
+from database_backup import DatabaseBackup
 from keyboard_handler import KeyboardHandler
 from proxy import Proxy
 from ui_PyRssReaderWindow import Ui_RssReaderWindow
@@ -34,7 +40,7 @@ from enclosure_downloader import EnclosureDownloader
 from instapaper_support import InstapaperSupport
 from instapaper_credentials_dialog import InstapaperCredentialsDialog
 
-from feed import kItemsOfInterestFeedId
+from feed import kItemsOfInterestFeedId, kSearchResultsFeedId
 
 
 kDatabaseName = "Feeds.db"
@@ -63,6 +69,8 @@ kProxyUserId = "proxyuserid"
 kProxyPassword = "proxypassword"
 kGeneralPreferencesGroup = "preferences"
 kFeedUpdateInterval = "feedupdateinterval"
+kMaxConcurrentUpdates = "maxconcurrentupdates"
+kMaxFeedUpdateIntervalHours = "maxfeedupdateintervalhours"
 kUpdateOnAppStart = "updateonappstart"
 kEnclosureDirectory = "enclosuredirectory"
 kInstapaperPreferencesGroup = "instapaper"
@@ -70,6 +78,17 @@ kEncryptedInstapaperUsername = "username"
 kEncryptedInstapaperPassword = "password"
 kEncrypterPasswordPreferencesGroup = "encrypter"
 kHashedEncrypterPassword = "hashedencrypterpassword"
+kDatabaseSettingsGroup = "database"
+kJournalMode = "journalmode"
+kSynchronous = "synchronous"
+kCacheSizeMb = "cachesizemb"
+kMmapSizeMb = "mmapsizemb"
+kTempStore = "tempstore"
+kBusyTimeoutMs = "busytimeoutms"
+kCompressBodies = "compressbodies"
+kArchiveDays = "archivedays"
+kBackupIntervalHours = "backupintervalhours"
+kBackupCount = "backupcount"
 
 # Image cache size (number of cache entries)
 kMaxCacheSize = 100
@@ -88,49 +107,71 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         self.ui.setupUi(self)
 
         self.db = Database()
+        self.readConnections = ReadConnectionProvider()     # Connections used by worker threads
         self.proxy = Proxy()
         self.preferences = Preferences()
 
+        # All feeds, images and enclosures are fetched by the network fetcher, without blocking
+        self.networkFetcher = NetworkFetcher(self)
+
         self.languageFilter = LanguageFilter(self.db)
         self.adFilter = AdFilter(self.db)
         self.prefetchStatusbarWidget = PrefetchStatusbarWidget(self)
         self.imageCache = ImageCache(kMaxCacheSize)
-        self.imagePrefetcher = ImagePrefetcher(self.db, self.imageCache, self.proxy)
+        self.imagePrefetcher = ImagePrefetcher(self.readConnections, self.imageCache, self.networkFetcher)
 
         self.imagePrefetcher.imagePrefetchStartingSignal.connect(self.prefetchStatusbarWidget.prefetchOn)
         self.imagePrefetcher.imagePrefetchDoneSignal.connect(self.prefetchStatusbarWidget.prefetchOff)
         self.ui.statusBar.addPermanentWidget(self.prefetchStatusbarWidget)
 
-        self.feedItemFilterMatcher = FeedItemFilterMatcher(self.db)
-        self.feedPurger = FeedPurger(self.db, self)
+        # Feed item writes are performed by the database writer thread
+        self.dbWriter = DatabaseWriter()
+        self.dbWriter.feedItemsIngestedSignal.connect(self.onFeedItemsIngested)
+        self.dbWriter.feedItemsChangedSignal.connect(self.onFeedItemsChanged)
+        self.dbWriter.syncedSignal.connect(self.onFeedUpdatesStored)
+        self.dbWriter.vacuumDoneSignal.connect(self.onDatabaseCompacted)
+        self.dbWriter.feedItemsArchivedSignal.connect(self.onFeedItemsArchived)
+        self.dbWriter.feedChangedSignal.connect(self.db.refreshCachedFeed)
+
+        # Read flags set by the user are written to the database in batches
+        self.readStateBuffer = ReadStateBuffer(self.db, self.dbWriter, self)
+
+        self.feedPurger = FeedPurger(self.db, self.dbWriter, self)
         self.feedPurger.feedPurgedSignal.connect(self.onFeedPurged)
         self.feedPurger.messageSignal.connect(self.showStatusBarMessage)
 
+        self.bodyRecompressor = BodyRecompressor(self.dbWriter, self)
+        self.bodyRecompressor.messageSignal.connect(self.showStatusBarMessage)
+
+        # Snapshots of the database, taken between feed updates
+        self.databaseBackup = DatabaseBackup(self)
+        self.databaseBackup.messageSignal.connect(self.showStatusBarMessage)
+
         self.m_currentFeedId = -1
-        self.feedIdsToUpdate = []
 
         # This is a persistent object, so it won't go out of scope while fetching feeds
-        # self.feedUpdater = FeedUpdater(self.db)
-        # self.feedUpdater.feedItemUpdateSignal.connect(self.onFeedItemUpdate)
-        # self.feedUpdater.feedUpdateMessageSignal.connect(self.showStatusBarMessage)
+        self.feedUpdater = FeedUpdater(self.db, self.dbWriter, self.networkFetcher)
+        self.feedUpdater.feedUpdateMessageSignal.connect(self.showStatusBarMessage)
+        self.feedUpdater.feedUpdatesDoneSignal.connect(self.onFeedUpdatesDone)
 
         self.keyboardHandler = KeyboardHandler(self)
 
         self.keyboardHandler.minimizeApplicationSignal.connect(self.onMinimizeApp)
 
-        self.feedTreeObj = FeedTree(self.ui.feedTree, self.db, self.keyboardHandler)
+        self.feedTreeObj = FeedTree(self.ui.feedTree, self.db, self.readStateBuffer, self.keyboardHandler)
         self.feedTreeObj.feedSelectedSignal.connect(self.onFeedSelected)
         self.feedTreeObj.feedUpdateRequestedSignal.connect(self.onFeedUpdateRequested)
         self.feedTreeObj.feedReadStateSignal.connect(self.onSetFeedReadState)
         self.feedTreeObj.feedPurgeSignal.connect(self.onPurgeSingleFeed)
         self.feedTreeObj.feedDeleteSignal.connect(self.onDeleteFeed)
+        self.feedTreeObj.feedShowArchiveSignal.connect(self.onShowFeedArchive)
 
-        self.titleTreeObj = TitleTree(self.db, self.ui.titleTree, self.languageFilter, self.keyboardHandler, self.imagePrefetcher)
+        self.titleTreeObj = TitleTree(self.db, self.dbWriter, self.readStateBuffer, self.ui.titleTree, self.languageFilter, self.keyboardHandler, self.imagePrefetcher)
         self.titleTreeObj.feedItemSelectedSignal.connect(self.onFeedItemSelected)
         self.titleTreeObj.downloadEnclosureSignal.connect(self.onDownloadEnclosure)
 
         # self.rssContentViewObj = RssContentView(self, self.languageFilter, self.adFilter, self.imageCache,
-        #                                         self.keyboardHandler, self.proxy)
+        #                                         self.keyboardHandler, self.networkFetcher)
 
         self.rssContentViewObj = RssContentViewNew(self, self.languageFilter, self.adFilter, self.imageCache,
                                                 self.keyboardHandler, self.proxy)
@@ -139,10 +180,19 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         self.rssContentViewObj.reselectFeedItemSignal.connect(self.onReselectFeedItem)
         self.rssContentViewObj.urlHovered.connect(self.showStatusBarMessage)
 
+        # Search box
+        self.searchQuery = ""
+        self.searchLineEdit = QtWidgets.QLineEdit()
+        self.searchLineEdit.setPlaceholderText("Search all feeds")
+        self.searchLineEdit.setClearButtonEnabled(True)
+        self.searchLineEdit.setMaximumWidth(250)
+        self.searchLineEdit.returnPressed.connect(self.onSearch)
+        self.ui.mainToolBar.addSeparator()
+        self.ui.mainToolBar.addWidget(self.searchLineEdit)
+
         self.feedUpdateTimer = QtCore.QTimer()
         self.feedUpdateTimer.timeout.connect(self.onFeedUpdateTimerTimeout)
         self.feedUpdateTimer.setInterval(60000)     # One-minute interval
-        self.minutesSinceLastFeedUpdate = 0         # Minutes since last update of feeds
 
         self.enclosureDownloader = None
 
@@ -155,11 +205,16 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
 
         dbDir = getDatabasePath(kAppName, kDatabaseName)
         logging.info("Database: {}".format(dbDir))
-        self.db.open(dbDir)
+        self.db.open(dbDir, self.preferences.databaseProfile)
+        self.dbWriter.open(dbDir, self.preferences.databaseProfile)
+        self.readConnections.open(dbDir, self.preferences.databaseProfile)
+        self.databaseBackup.open(dbDir)
+        self.databaseBackup.setSchedule(self.preferences.backupIntervalHours, self.preferences.backupCount)
+        self.feedUpdater.setMaxConcurrentUpdates(self.preferences.maxConcurrentUpdates)
+        self.feedUpdater.setUpdateIntervals(self.preferences.feedUpdateInterval, self.preferences.maxFeedUpdateIntervalHours * 60)
 
         self.languageFilter.initialize()
         self.adFilter.initialize()
-        self.feedItemFilterMatcher.initialize()
 
         feedList = self.db.getFeeds()
         feedOrderList = self.db.getFeedOrder()
@@ -172,15 +227,22 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
             if password[1]:
                 self.proxy.proxyPassword = password[0]
 
+        self.networkFetcher.setProxy(self.proxy)
+
         if self.m_currentFeedId >= 0:
             self.onFeedSelected(self.m_currentFeedId)
             self.feedTreeObj.setCurrentFeed(self.m_currentFeedId)
 
         self.instapaperSupport.initialize()
 
-        self.resetFeedUpdateMinuteCount()
         self.startFeedUpdateTimer()
 
+        # Add any feed items not yet in the search index (for example, after a database update)
+        self.dbWriter.indexSearchItems()
+
+        # Store any feed items not yet using the current body codec (for example, after compression was enabled)
+        self.bodyRecompressor.start()
+
         if self.preferences.updateOnAppStart:
             self.on_actionUpdate_Feeds_triggered()
 
@@ -233,10 +295,27 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         # General Preferences
         settingsObj.beginGroup(kGeneralPreferencesGroup)
         self.preferences.feedUpdateInterval = settingsObj.value(kFeedUpdateInterval, 30, type=int)
+        self.preferences.maxConcurrentUpdates = settingsObj.value(kMaxConcurrentUpdates, self.preferences.maxConcurrentUpdates, type=int)
+        self.preferences.maxFeedUpdateIntervalHours = settingsObj.value(kMaxFeedUpdateIntervalHours, self.preferences.maxFeedUpdateIntervalHours, type=int)
         self.preferences.updateOnAppStart = settingsObj.value(kUpdateOnAppStart, False, type=bool)
         self.preferences.enclosureDirectory = settingsObj.value(kEnclosureDirectory, getDefaultEnclosureDirectory(), type=str)
         settingsObj.endGroup()
 
+        # Database settings
+        settingsObj.beginGroup(kDatabaseSettingsGroup)
+        profile = self.preferences.databaseProfile
+        profile.journalMode = settingsObj.value(kJournalMode, profile.journalMode, type=str)
+        profile.synchronous = settingsObj.value(kSynchronous, profile.synchronous, type=str)
+        profile.cacheSizeMb = settingsObj.value(kCacheSizeMb, profile.cacheSizeMb, type=int)
+        profile.mmapSizeMb = settingsObj.value(kMmapSizeMb, profile.mmapSizeMb, type=int)
+        profile.tempStore = settingsObj.value(kTempStore, profile.tempStore, type=int)
+        profile.busyTimeoutMs = settingsObj.value(kBusyTimeoutMs, profile.busyTimeoutMs, type=int)
+        profile.compressBodies = settingsObj.value(kCompressBodies, profile.compressBodies, type=bool)
+        self.preferences.archiveDays = settingsObj.value(kArchiveDays, self.preferences.archiveDays, type=int)
+        self.preferences.backupIntervalHours = settingsObj.value(kBackupIntervalHours, self.preferences.backupIntervalHours, type=int)
+        self.preferences.backupCount = settingsObj.value(kBackupCount, self.preferences.backupCount, type=int)
+        settingsObj.endGroup()
+
         # Encrypter password.  This is a hashed version of the encrypter password that is used to encrypt/decrypt
         # sensitive data, such as Instapaper credentials.
         settingsObj.beginGroup(kEncrypterPasswordPreferencesGroup)
@@ -273,7 +352,9 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
 
         #  Last-viewed feed
         settingsObj.beginGroup(kFeedSettingsGroup)
-        settingsObj.setValue(kLastViewedFeedId, self.m_currentFeedId)
+        # The search results are not kept between sessions
+        lastViewedFeedId = self.m_currentFeedId if self.m_currentFeedId != kSearchResultsFeedId else -1
+        settingsObj.setValue(kLastViewedFeedId, lastViewedFeedId)
         settingsObj.endGroup()
 
         # HTML Proxy
@@ -287,10 +368,27 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         # General Preferences
         settingsObj.beginGroup(kGeneralPreferencesGroup)
         settingsObj.setValue(kFeedUpdateInterval, self.preferences.feedUpdateInterval)
+        settingsObj.setValue(kMaxConcurrentUpdates, self.preferences.maxConcurrentUpdates)
+        settingsObj.setValue(kMaxFeedUpdateIntervalHours, self.preferences.maxFeedUpdateIntervalHours)
         settingsObj.setValue(kUpdateOnAppStart, self.preferences.updateOnAppStart)
         settingsObj.setValue(kEnclosureDirectory, self.preferences.enclosureDirectory)
         settingsObj.endGroup()
 
+        # Database settings
+        settingsObj.beginGroup(kDatabaseSettingsGroup)
+        profile = self.preferences.databaseProfile
+        settingsObj.setValue(kJournalMode, profile.journalMode)
+        settingsObj.setValue(kSynchronous, profile.synchronous)
+        settingsObj.setValue(kCacheSizeMb, profile.cacheSizeMb)
+        settingsObj.setValue(kMmapSizeMb, profile.mmapSizeMb)
+        settingsObj.setValue(kTempStore, profile.tempStore)
+        settingsObj.setValue(kBusyTimeoutMs, profile.busyTimeoutMs)
+        settingsObj.setValue(kCompressBodies, profile.compressBodies)
+        settingsObj.setValue(kArchiveDays, self.preferences.archiveDays)
+        settingsObj.setValue(kBackupIntervalHours, self.preferences.backupIntervalHours)
+        settingsObj.setValue(kBackupCount, self.preferences.backupCount)
+        settingsObj.endGroup()
+
         # Encrypter password.  This is a hashed version of the encrypter password that is used to encrypt/decrypt
         # sensitive data, such as Instapaper credentials.
         settingsObj.beginGroup(kEncrypterPasswordPreferencesGroup)
@@ -306,15 +404,6 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
     def addRssContentViewToLayout(self):
         self.ui.vertSplitter.addWidget(self.rssContentViewObj)
 
-    def createFeedUpdater(self):
-        """ Create the feed updater object.  This needs to be defined at class scope so that
-            it doesn't go out of scope while updating many feeds, but it also must be
-            destroyed after updating a feed to prevent memory leaks.
-        """
-        self.feedUpdater = FeedUpdater(self.db)
-        self.feedUpdater.feedItemUpdateSignal.connect(self.onFeedItemUpdate)
-        self.feedUpdater.feedUpdateMessageSignal.connect(self.showStatusBarMessage)
-
     @QtCore.Slot()
     def on_actionAbout_Qt_triggered(self):
         QtWidgets.QMessageBox.aboutQt(self, 'About Qt')
@@ -326,41 +415,65 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
     def onFeedSelected(self, feedId):
         self.m_currentFeedId = feedId
         self.currentFeed = self.db.getFeed(feedId)
-        if self.m_currentFeedId != kItemsOfInterestFeedId:
-            feed = self.db.getFeed(feedId)
-            self.ui.feedNameLabel.setText(feed.m_feedName)
-            self.ui.feedImageLabel.setPixmap(feed.getFeedIcon())
+        if self.m_currentFeedId == kSearchResultsFeedId:
+            self.ui.feedNameLabel.setText('Search Results: "{}"'.format(self.searchQuery))
+            self.ui.feedImageLabel.setPixmap(QtGui.QPixmap())
+            feedItemHeaderList = self.readStateBuffer.applyReadFlags(self.db.searchItems(self.searchQuery))
+
+            if self.db.isSearchIndexPending():
+                # The database writer is still indexing feed items (for example, after a database update)
+                self.showStatusBarMessage("The search index is being updated; some feed items may not be found yet.")
+
+            unreadCount = sum(1 for feedItemHeader in feedItemHeaderList if not feedItemHeader.isRead())
+            self.feedTreeObj.setFeedCount(kSearchResultsFeedId, unreadCount)
+            self.titleTreeObj.addFeedItems(feedItemHeaderList, self.currentFeed, False)
+        elif self.m_currentFeedId != kItemsOfInterestFeedId:
+            self.ui.feedNameLabel.setText(self.currentFeed.m_feedName)
+            self.ui.feedImageLabel.setPixmap(self.db.getFeedIcon(feedId))
             self.populateFeedItemView(feedId)
         else:
             self.ui.feedNameLabel.setText("Items of Interest")
             starPixmap = getResourceFilePixmap(kStarIcon)
             self.ui.feedImageLabel.setPixmap(starPixmap)
-            ioiList = self.db.getItemsOfInterest()
+            # Read the headers of the actual feed items
+            # (The unread count is counted from the headers, as they include the read flags not yet stored)
+            _, feedItemHeaderList = self.db.getItemsOfInterestFeedItemHeaders()
+            self.readStateBuffer.applyReadFlags(feedItemHeaderList)
+            unreadCount = sum(1 for feedItemHeader in feedItemHeaderList if not feedItemHeader.isRead())
 
-            if ioiList is None:
-                return
+            self.feedTreeObj.setFeedCount(kItemsOfInterestFeedId, unreadCount)
+            self.titleTreeObj.addFeedItems(feedItemHeaderList, self.currentFeed, False)
 
-            # Read the actual feed items
-            feedItemList = []
-            for ioiTuple in ioiList:
-                feedItem = self.db.getFeedItem(ioiTuple[1], ioiTuple[0])
+    @QtCore.Slot()
+    def onSearch(self):
+        """ Searches all feeds for the text in the search box, and shows the matches in the Search Results feed. """
+        self.searchQuery = self.searchLineEdit.text().strip()
 
-                if feedItem is not None:
-                    feedItemList.append(feedItem)
-                else:
-                    logging.error(f'Feed item {ioiTuple[1]} not found in feed {ioiTuple[0]}')
+        if not self.searchQuery:
+            return
+
+        if self.m_currentFeedId == kSearchResultsFeedId:
+            # Already showing search results; the feed tree will not signal a selection change
+            self.onFeedSelected(kSearchResultsFeedId)
+        else:
+            self.feedTreeObj.showSearchResultsFeed()
 
-            self.titleTreeObj.addFeedItems(feedItemList, self.currentFeed, False)
+    def populateFeedItemView(self, feedId, sameFeed=False, includeArchive=False):
+        # Only the feed item headers are needed for the title tree.  The full feed item is read when it is selected.
+        feedItemHeaderList = self.readStateBuffer.applyReadFlags(self.db.getFeedItemHeaders(feedId, includeArchive))
+        self.titleTreeObj.addFeedItems(feedItemHeaderList, self.currentFeed, sameFeed)
 
-    def populateFeedItemView(self, feedId, sameFeed=False):
-        feedItemList = self.db.getFeedItems(feedId)
-        self.titleTreeObj.addFeedItems(feedItemList, self.currentFeed, sameFeed)
+    def onShowFeedArchive(self, feedId):
+        """ Shows the feed items of the current feed, including those that have been archived. """
+        if feedId == self.m_currentFeedId:
+            self.ui.feedNameLabel.setText("{} (including archive)".format(self.currentFeed.m_feedName))
+            self.populateFeedItemView(feedId, True, includeArchive=True)
 
     def onFeedItemSelected(self, feedId, feedItemGuid):
         feedItem = self.db.getFeedItem(feedItemGuid, feedId)
 
         if feedItem is not None:
-            self.db.setFeedItemReadFlag(feedId, feedItemGuid, True)
+            self.readStateBuffer.setFeedItemReadFlag(feedId, feedItemGuid, True)
             self.feedTreeObj.updateFeedCount(feedId)
             self.rssContentViewObj.setContents(feedItem, self.currentFeed)
         else:
@@ -373,8 +486,7 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
 
     def onFeedUpdateRequested(self, feedId):
         if feedId > 0:
-            self.createFeedUpdater()
-            self.feedUpdater.updateFeed(feedId, self.proxy)
+            self.feedUpdater.updateFeed(feedId)
         else:
             logging.error("onFeedUpdateRequested: Invalid feedId: {}".format(feedId))
 
@@ -384,64 +496,87 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
     def stopFeedUpdateTimer(self):
         self.feedUpdateTimer.stop()
 
-    def resetFeedUpdateMinuteCount(self):
-        self.minutesSinceLastFeedUpdate = 0
-
     @QtCore.Slot()
     def onFeedUpdateTimerTimeout(self):
-        """ Slot to handle the feed update timer. """
-        self.minutesSinceLastFeedUpdate += 1
-        if self.minutesSinceLastFeedUpdate >= self.preferences.feedUpdateInterval:
+        """ Slot to handle the feed update timer.  Each feed has its own update schedule (see
+            FeedUpdater.scheduleNextUpdate()); only the feeds that are due are updated. """
+        dueFeedIds = self.db.getDueFeedIds(datetime.datetime.today())
+
+        if len(dueFeedIds) > 0:
             # Time to update feeds
-            self.on_actionUpdate_Feeds_triggered()
+            self.stopFeedUpdateTimer()
+            self.feedUpdater.updateFeeds(dueFeedIds)
+        else:
+            # The timer is stopped while feeds are updated, so the backup is only taken between updates
+            self.databaseBackup.backUpIfDue()
 
     @QtCore.Slot()
     def on_actionUpdate_Feeds_triggered(self):
         self.stopFeedUpdateTimer()
-        self.resetFeedUpdateMinuteCount()
 
-        self.feedIdsToUpdate = self.db.getFeedIds()
+        # The feeds are fetched in parallel; each feed's items are stored as soon as the feed has been fetched
+        self.feedUpdater.updateFeeds(self.db.getFeedIds())
 
-        self.createFeedUpdater()
-        self.updateNextFeed()
+    def onFeedUpdatesDone(self):
+        # The feed items of the last feeds may not have been stored yet; the update is complete once the
+        # writer has performed the writes queued so far (see onFeedUpdatesStored()).
+        self.dbWriter.sync()
+        if not self.feedUpdateTimer.isActive():
+            # Only want to do this if the timer is not running.  If the timer is running, calling
+            # start() on it will restart it from 0.
+            self.startFeedUpdateTimer()
 
-    def updateNextFeed(self):
-        """ Starts the update process for the next feed in the list.  This is the feed that is
-            at the head of self.feedIdsToUpdate. """
-        if self.feedIdsToUpdate:
-            feedIdToUpdate = self.feedIdsToUpdate.pop(0)
-            self.feedUpdater.updateFeed(feedIdToUpdate, self.proxy)
-        else:
-            self.feedTreeObj.updateAllFeedCounts()
-            self.showStatusBarMessage("Updating complete.")
-            if not self.feedUpdateTimer.isActive():
-                # Only want to do this if the timer is not running.  If the timer is running, calling
-                # start() on it will restart it from 0.
-                self.startFeedUpdateTimer()
-
-            # Delete the feed updater to free its memory
-            del self.feedUpdater
-
-    def onFeedItemUpdate(self, feedId, feedItemList):
-        self.db.addFeedItems(feedItemList, feedId)
-        self.feedItemFilterMatcher.filterFeedItems(feedId, feedItemList)
+    def onFeedItemsIngested(self, feedId, newFeedItemList):
+        self.feedTreeObj.updateFeedCount(feedId)
 
-        if feedId == self.m_currentFeedId:
+        if feedId == self.m_currentFeedId and len(newFeedItemList) > 0:
             # Update title tree with new set of feed items
             self.populateFeedItemView(feedId, True)
 
-        QtCore.QTimer.singleShot(0, self.updateNextFeed)
+    def onFeedItemsChanged(self, feedId):
+        self.feedTreeObj.updateFeedCount(feedId)
+
+    def onFeedUpdatesStored(self):
+        self.feedTreeObj.updateAllFeedCounts()
+        self.showStatusBarMessage("Updating complete.")
+        self.dbWriter.indexSearchItems()
+
+        if self.preferences.archiveDays > 0:
+            targetDate = datetime.datetime.today() - datetime.timedelta(days=self.preferences.archiveDays)
+            self.dbWriter.archiveFeedItems(self.db.getFeedIds(), targetDate)
+
+    def onFeedItemsArchived(self, itemsArchived):
+        if itemsArchived > 0:
+            self.feedTreeObj.updateAllFeedCounts()
+            self.showStatusBarMessage("Archived {} feed items.".format(itemsArchived))
 
     @QtCore.Slot()
     def on_actionPreferences_triggered(self):
-        prefsDialog = PrefsDialog(self, self.proxy, self.preferences)
+        prefsDialog = PrefsDialog(self, self.proxy, self.preferences, self.db)
         if prefsDialog.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             self.proxy = prefsDialog.getProxySettings()
             self.rssContentViewObj.setProxy(self.proxy)
+            self.networkFetcher.setProxy(self.proxy)
             self.preferences = prefsDialog.getPreferences()
+            self.db.applyProfile(self.preferences.databaseProfile)
+            self.dbWriter.applyProfile(self.preferences.databaseProfile)
+            self.readConnections.applyProfile(self.preferences.databaseProfile)
+            self.databaseBackup.setSchedule(self.preferences.backupIntervalHours, self.preferences.backupCount)
+            self.feedUpdater.setMaxConcurrentUpdates(self.preferences.maxConcurrentUpdates)
+            self.feedUpdater.setUpdateIntervals(self.preferences.feedUpdateInterval, self.preferences.maxFeedUpdateIntervalHours * 60)
+            self.bodyRecompressor.start()
             self.saveSettings()
 
 
+    @QtCore.Slot()
+    def on_actionCompact_Database_triggered(self):
+        # Space freed by purges is reclaimed automatically; a full vacuum also defragments the database file
+        self.showStatusBarMessage("Compacting database...", 0)
+        self.dbWriter.vacuumDatabase()
+
+    def onDatabaseCompacted(self):
+        self.showStatusBarMessage("Database compacted.")
+
     @QtCore.Slot()
     def on_actionPurge_Old_News_triggered(self):
         purgeDlg = PurgeDialog(self)
@@ -449,8 +584,8 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
             priorDays = purgeDlg.getDays()
             purgeUnreadItems = purgeDlg.purgeUnreadItems()
 
+            # The title tree is repopulated as each feed is purged (see onFeedPurged())
             self.feedPurger.purgeAllFeeds(priorDays, purgeUnreadItems)
-            self.onFeedSelected(self.m_currentFeedId)   # Force repopulation of title tree
 
 
     def onPurgeSingleFeed(self, feedId):
@@ -470,7 +605,7 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
 
     @QtCore.Slot()
     def on_actionAdd_Feed_triggered(self):
-        dlg = NewFeedDialog(self, self.proxy)
+        dlg = NewFeedDialog(self, self.networkFetcher)
 
         if dlg.exec() == QtWidgets.QDialog.DialogCode.Accepted:
             feed = dlg.getFeed()
@@ -491,12 +626,18 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
                     self.onFeedUpdateRequested(feedId)
 
     def onDeleteFeed(self, feedId):
-        self.db.deleteFeed(feedId)
+        self.readStateBuffer.discardFeed(feedId)
+        self.db.removeFeedFromFeedOrder(feedId)
+
+        # The feed's items are deleted by the writer; the feed is removed from the feed cache right away
+        self.db.removeCachedFeed(feedId)
+        self.dbWriter.deleteFeed(feedId)
 
     @QtCore.Slot()
     def on_actionCreate_Global_Filter_triggered(self):
         dlg = FilterManagerDialog(self, self.db)
         dlg.exec()
+        self.dbWriter.reloadFilters()
 
     @QtCore.Slot()
     def on_actionEdit_Language_Filter_triggered(self):
@@ -515,7 +656,7 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
 
     def onSetFeedReadState(self, feedId, readState):
         """ Marks all items in the given feed as read. """
-        self.db.setFeedReadFlagAllItems(feedId, readState)
+        self.readStateBuffer.setFeedReadFlagAllItems(feedId, readState)
         self.titleTreeObj.setReadStateOfAllRows(readState)
 
     def showStatusBarMessage(self, message, timeout=10000):
@@ -526,7 +667,7 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         # Don't clear message, until the enclosure has downloaded
         self.showStatusBarMessage("Downloading enclosure: {}".format(enclosureUrl), kDontClearMessage)
 
-        self.enclosureDownloader = EnclosureDownloader(enclosureUrl, self.preferences.enclosureDirectory, self.proxy)
+        self.enclosureDownloader = EnclosureDownloader(enclosureUrl, self.preferences.enclosureDirectory, self.networkFetcher)
         self.enclosureDownloader.enclosureDownloadedSignal.connect(self.onEnclosureDownloaded)
         self.enclosureDownloader.start()
 
@@ -580,11 +721,8 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
             self.onFeedSelected(feedId)
 
             # Fetch feed items for all feeds
-            self.feedIdsToUpdate = feedIds
             self.stopFeedUpdateTimer()
-            self.resetFeedUpdateMinuteCount()
-
-            self.updateNextFeed()
+            self.feedUpdater.updateFeeds(feedIds)
 
     @QtCore.Slot()
     def on_actionAdd_to_Instapaper_triggered(self):
@@ -683,6 +821,11 @@ class PyRssReaderWindow(QtWidgets.QMainWindow):
         self.stopFeedUpdateTimer()
         feedOrderList = self.feedTreeObj.getFeedOrder()
         self.db.setFeedOrder(feedOrderList)
+        self.readStateBuffer.flush()
+        self.feedUpdater.cancel()
+        self.networkFetcher.cancelAll()
+        self.databaseBackup.cancel()
+        self.dbWriter.close()
         self.db.close()
         self.saveSettings()
 
@@ -0,0 +1,67 @@
+# Storage codec for the description and content of feed items.
+import zlib
+
+# Codec IDs, stored in the low bits of the items table's bodycodec column
+kBodyCodecPlain = 0         # Stored as text
+kBodyCodecZlib = 1          # Stored as zlib-compressed UTF-8, using kZlibDictionary
+kBodyCodecMask = 0x0F
+
+# Flag set in the bodycodec column when the content was identical to the description, and was not stored
+kBodyContentIsDescription = 0x10
+
+# Preset dictionary for kBodyCodecZlib: strings common in feed item HTML, which lets zlib compress even short
+# descriptions.  This must never change, as it is needed to decompress existing rows; a different dictionary
+# requires a new codec ID.
+kZlibDictionary = (b'<p></p><br /><br/><div class="</div><span class="</span><a href="https://www.</a>'
+                   b'<img src="https://" alt="" width="" height="" /><strong></strong><em></em>'
+                   b'<ul><li></li></ul><blockquote></blockquote><h2></h2><h3></h3><figure></figure>'
+                   b'<figcaption></figcaption>&nbsp;&amp;&quot;&#8217;&#8220;&#8221; target="_blank" rel="noopener"'
+                   b'The post appeared first on  Continue reading  Read more  of the and to in that for with is on')
+
+kZlibLevel = 6
+
+
+def compressText(text):
+    compressor = zlib.compressobj(kZlibLevel, zlib.DEFLATED, zlib.MAX_WBITS, zdict=kZlibDictionary)
+    return compressor.compress(text.encode("utf-8")) + compressor.flush()
+
+
+def decompressText(data):
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=kZlibDictionary)
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+def encodeBody(description, content, codec):
+    """ Encodes a feed item's description and content for storage, using the given codec.  Returns a tuple of the
+        form: (storedDescription, storedContent, bodyCodec).  If compression does not make the text smaller, it is
+        stored as plain text.  If the content is identical to the description, only the description is stored. """
+    description = description or ""
+    content = content or ""
+    flags = 0
+
+    if content == description and len(content) > 0:
+        content = ""
+        flags = kBodyContentIsDescription
+
+    if codec == kBodyCodecZlib:
+        compressedDescription = compressText(description)
+        compressedContent = compressText(content)
+
+        if len(compressedDescription) + len(compressedContent) < len(description.encode("utf-8")) + len(content.encode("utf-8")):
+            return compressedDescription, compressedContent, kBodyCodecZlib | flags
+
+    return description, content, kBodyCodecPlain | flags
+
+
+def decodeBody(storedDescription, storedContent, bodyCodec):
+    """ Reverses encodeBody().  Returns a tuple of the form: (description, content). """
+    bodyCodec = bodyCodec or 0
+
+    if (bodyCodec & kBodyCodecMask) == kBodyCodecZlib:
+        description = decompressText(bytes(storedDescription))
+        content = decompressText(bytes(storedContent)) if not bodyCodec & kBodyContentIsDescription else description
+    else:
+        description = storedDescription
+        content = storedContent if not bodyCodec & kBodyContentIsDescription else description
+
+    return description, content
@@ -0,0 +1,34 @@
+from PySide6 import QtCore
+import logging
+
+# Show the recompression report for 10 seconds
+kMessageTimeout = 10000
+
+class BodyRecompressor(QtCore.QObject):
+    """ Background job that rewrites the feed items whose descriptions and contents are not stored with the
+        database's current body codec (for example, feed items stored before compression was enabled).  The work
+        is done by the database writer, a batch at a time, so the UI stays responsive. """
+    messageSignal = QtCore.Signal(str, int)
+
+    def __init__(self, dbWriter, parent):
+        super(BodyRecompressor, self).__init__(parent)
+        self.dbWriter = dbWriter
+        self.dbWriter.feedItemsRecompressedSignal.connect(self.onFeedItemsRecompressed)
+        self.running = False
+
+    def start(self):
+        """ Starts recompressing, unless a recompression is already running. """
+        if self.running:
+            return
+
+        self.running = True
+        self.dbWriter.recompressFeedItems()
+
+    def onFeedItemsRecompressed(self, bytesBefore, bytesAfter):
+        self.running = False
+
+        if bytesBefore > 0:
+            message = "Recompressed article text: {:.1f} MB before, {:.1f} MB after".format(bytesBefore / 1048576,
+                                                                                          bytesAfter / 1048576)
+            logging.info(message)
+            self.messageSignal.emit(message, kMessageTimeout)
@@ -4,7 +4,6 @@ import re
 from bs4 import BeautifulSoup
 from PySide6 import QtCore, QtGui, QtWidgets
 from img_finder import ImgFinder
-from image_fetch_thread import ImageFetchThread
 from utility import getTextFileFromResource, getResourceFilePixmap
 
 
@@ -18,14 +17,16 @@ class RssContentView(QtWidgets.QTextBrowser):
     reselectFeedItemSignal = QtCore.Signal()
     urlHovered = QtCore.Signal(str, int)
 
-    def __init__(self, parent, languageFilter, adFilter, imageCache, keyboardHandler, proxy):
+    def __init__(self, parent, languageFilter, adFilter, imageCache, keyboardHandler, networkFetcher):
         super(RssContentView, self).__init__(parent)
 
         self.languageFilter = languageFilter
         self.adFilter = adFilter
         self.imageCache = imageCache
         self.keyboardHandler = keyboardHandler
-        self.proxy = proxy
+        self.networkFetcher = networkFetcher
+        self.imageFetchRequests = set()     # Image fetches in progress
+        self.fetchedImages = []             # Images fetched so far, as tuples of the form: (url, pixmap)
         self.m_css = ""
         self.m_feedHeaderHtml = ""
         self.m_processedFeedContents = ""
@@ -102,7 +103,8 @@ class RssContentView(QtWidgets.QTextBrowser):
                 self.urlHovered.emit("", 0)    # Blank out the link
 
     def setProxy(self, proxy):
-        self.proxy = proxy
+        """ Images are fetched by the network fetcher, which is given the proxy by the main window. """
+        pass
 
     def setContents(self, feedItem, feed):
         """ Sets a feed item's HTML into the text browser. """
@@ -213,12 +215,34 @@ class RssContentView(QtWidgets.QTextBrowser):
                 #print("The image cache did not contain: {}".format(imageUrl))
                 imageFetchList.append(imageUrl)
 
-        self.imageFetchThread = ImageFetchThread(imageFetchList, self.currentFeed, self.proxy)
-        self.imageFetchThread.imageFetchDoneSignal.connect(self.onImageFetchDone)
-        self.imageFetchThread.start()
+        # Images still being fetched for the previous feed item are no longer needed
+        for fetchRequest in list(self.imageFetchRequests):
+            fetchRequest.cancel()
+
+        self.imageFetchRequests.clear()
+        self.fetchedImages = []
+
+        for imageUrl in imageFetchList:
+            fetchRequest = self.networkFetcher.fetchImage(imageUrl, self.currentFeed.m_feedWebPageLink)
+            fetchRequest.fetchDoneSignal.connect(lambda fetchRequest, imageUrl=imageUrl: self.onImageFetched(imageUrl, fetchRequest))
+            self.imageFetchRequests.add(fetchRequest)
+
+    def onImageFetched(self, url, fetchRequest):
+        if fetchRequest not in self.imageFetchRequests:
+            return      # Canceled
+
+        self.imageFetchRequests.discard(fetchRequest)
+
+        # Note: if the feed's web page link needed to be added, the original url (without the web page link)
+        # is what will be used as the key in the image cache, since the HTML will contain only the urls
+        # without the web page link prepended.
+        self.fetchedImages.append( (url, fetchRequest.getDataAsPixmap()) )
+
+        if len(self.imageFetchRequests) == 0:
+            self.onImageFetchDone(self.fetchedImages)
 
     def onImageFetchDone(self, imageList):
-        """ Called when image fetching from the thread has finished. """
+        """ Called when all images have been fetched. """
         document = self.document()
         for imageTuple in imageList:
             url = imageTuple[0]
@@ -1,11 +1,18 @@
+import copy
+import datetime
 import logging
+import re
 from PySide6 import QtCore, QtSql
 from pathlib import Path
 from exceptions import DbError
 from feed import Feed
+from feed_icon_cache import FeedIconCache
 from feed_item import FeedItem
+from feed_item_header import FeedItemHeader
 from feed_item_filter import  FeedItemFilter
-from utility import julianDayToDate, dateToJulianDay
+from database_profile import DatabaseProfile
+from body_codec import encodeBody, decodeBody, kBodyCodecPlain, kBodyCodecZlib, kBodyCodecMask
+from utility import julianDayToDate, dateToJulianDay, htmlToPlainText
 
 # Global value data type constants
 kDataTypeInteger = 0
@@ -13,7 +20,19 @@ kDataTypeString = 1
 kDataTypeBlob = 2
 
 # Current database version.  Previous versions are not handled by the Python version.
-kCurrentDatabaseVersion = 7
+kCurrentDatabaseVersion = 18
+
+# Value of the auto_vacuum PRAGMA when incremental vacuum is enabled
+kAutoVacuumIncremental = 2
+
+# Maximum number of free pages returned to the file system by each call to incrementalVacuum()
+kIncrementalVacuumPages = 1000
+
+# Number of rows copied per transaction when migrating the per-feed item tables into the items table.
+kMigrationBatchSize = 5000
+
+# Number of GUIDs looked up per query when checking which ingested feed items already exist.
+kIngestChunkSize = 200
 
 # Name of item in the globals table that indicates the version of the database
 kDatabaseVersionId = "databaseversion"
@@ -21,42 +40,344 @@ kDatabaseVersionId = "databaseversion"
 #
 kFeedOrderGlobalKey = "feed-order"
 
+# Number of feed items rewritten per call of recompressFeedItems()
+kRecompressBatchSize = 200
+
+# Name of item in the globals table that holds the body codec all feed items were last recompressed with (-1 if a
+# recompression has not completed since the codec was changed)
+kRecompressedCodecGlobalKey = "recompressed-bodycodec"
+
+# Name of item in the globals table that is 1 while feed items copied to the archive by archiveFeedItems() may not
+# have been deleted from the items table yet (see deleteArchivedFeedItems())
+kArchiveMovePendingGlobalKey = "archive-move-pending"
+
+# Number of feed items added to the search index per call of indexPendingItems()
+kSearchIndexBatchSize = 500
+
+# Default number of results returned by searchItems()
+kSearchPageSize = 500
+
+# Columns and options of the full-text search indexes
+kSearchTableColumns = "title, author, categories, body, " \
+                      "content='', contentless_delete=1, tokenize='unicode61 remove_diacritics 2'"
+
+# Schema name of the attached archive database, which holds the old feed items moved out of the items table
+kArchiveSchema = "archive"
+
+# Number of feed items copied per call of archiveFeedItems()
+kArchiveBatchSize = 200
+
 kPocketUsernameKey = "pocket-username"
 kPocketAccessToken = "pocket-accesstoken"
 
+# PRAGMAs reported by getEffectivePragmas()
+kReportedPragmas = ["journal_mode", "synchronous", "mmap_size", "cache_size", "temp_store", "busy_timeout", "page_size",
+                    "auto_vacuum", "freelist_count"]
+
+# Columns of a feed item that are present in all database versions
+kLegacyFeedItemColumns = "title, author, link, description, categories, pubdatetime, " \
+                         "thumbnaillink, thumbnailwidth, thumbnailheight, " \
+                         "guid, feedburneroriglink, readflag, " \
+                         "enclosurelink, enclosurelength, enclosuretype, contentencoded"
+
+# Columns of the items table that make up a feed item, in the order expected by feedItemFromRow()
+kFeedItemColumns = kLegacyFeedItemColumns + ", bodycodec"
+
+# Columns of the items table that make up a feed item header, in the order expected by feedItemHeaderFromRow()
+kFeedItemHeaderColumns = "feedid, title, author, categories, pubdatetime, guid, readflag, enclosurelink"
+
+# Columns of the feeds table that make up a feed, in the order expected by feedFromRow()
+kFeedColumns = "feedid, parentid, name, title, description, language, url, added, lastupdated, " \
+               "webpagelink, lastpurged, retaindays, retainitems, keepunread, keepinterest, etag, lastmodified, " \
+               "nextupdate, minupdateinterval, maxupdateinterval"
+
+# Retention policy columns of the feeds table, added by version 14
+kFeedRetentionColumns = [("retaindays", "integer default 0"),
+                         ("retainitems", "integer default 0"),
+                         ("keepunread", "integer default 1"),
+                         ("keepinterest", "integer default 1")]
+
+# HTTP validator columns of the feeds table, added by version 15.  They hold the ETag and Last-Modified headers of
+# the feed's last response, which are sent back to the server so that an unchanged feed is not downloaded again.
+kFeedValidatorColumns = [("etag", "text default ''"),
+                         ("lastmodified", "text default ''")]
+
+# Update schedule columns of the feeds table, added by version 16 (see feed_scheduler.py)
+kFeedScheduleColumns = [("nextupdate", "integer default 0"),
+                        ("minupdateinterval", "integer default 0"),
+                        ("maxupdateinterval", "integer default 0")]
+
+# Image columns of the feeds table.  These are only read when asked for, as decoding the images of every feed is
+# expensive; the feed tree gets its icons from the icon cache instead (see getFeedIcon()).
+kFeedImageColumns = "favicon, image"
+
+
+def archivePathName(pathName):
+    """ Returns the path name of the archive database of the given database (for example, Feeds-archive.db for
+        Feeds.db). """
+    p = Path(pathName)
+    return str(p.with_name(p.stem + "-archive" + p.suffix))
+
+
+def bodyBindValue(value):
+    """ Converts a description or content value returned by encodeBody() to a value that can be bound to a query
+        (compressed values must be bound as a QByteArray to be stored as a blob). """
+    return QtCore.QByteArray(value) if isinstance(value, bytes) else value
+
+
+def storedBodySize(value):
+    """ Returns the number of bytes used to store a description or content value. """
+    if value is None:
+        return 0
+    elif isinstance(value, str):
+        return len(value.encode("utf-8"))
+    else:
+        return len(value)
+
 
 class Database:
     def __init__(self):
         super(Database, self).__init__()
         self.db = None
 
-    def open(self, pathName):
-        self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE")
+        # Prepared queries, keyed by their SQL text.  Reusing a prepared query avoids having SQLite
+        # compile the same statement each time it is executed.
+        self.statementCache = {}
+
+        # Codec used to store the descriptions and contents of new feed items (see body_codec.py)
+        self.bodyCodec = kBodyCodecZlib
+
+        # Contents of the globals table, keyed by global value key.  Read when the database is opened, and
+        # written through by setGlobalValue().
+        self.globalValues = {}
+
+        # Feeds (without their images), keyed by feed ID.  Read when the database is opened, and kept up to date
+        # by the methods that change the feeds table.  getFeed() and getFeeds() return copies.
+        self.feeds = {}
+
+        # Number of nested beginTransaction() calls that have not yet ended
+        self.transactionDepth = 0
+
+        # Scaled feed icons (see getFeedIcon())
+        self.feedIconCache = FeedIconCache()
+
+        # True if the archive database is attached (see attachArchive())
+        self.archiveAttached = False
+
+    def open(self, pathName, profile=None, connectionName=None, readOnly=False):
+        """ Opens the database, applying the given DatabaseProfile.  If profile is None, the default profile is used.
+            A connectionName must be given when the database is opened by a thread other than the GUI thread, as
+            each thread needs its own connection.  A read-only connection requires the database to exist, and does
+            not update it. """
+        if connectionName is not None:
+            self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE", connectionName)
+        else:
+            self.db = QtSql.QSqlDatabase.addDatabase("QSQLITE")
         p = Path(pathName)
         dbExists = p.is_file()
 
         self.db.setDatabaseName(pathName)
 
-        if self.db.open():
-            if dbExists:
+        if readOnly:
+            self.db.setConnectOptions("QSQLITE_OPEN_READONLY")
+
+        if readOnly and not dbExists:
+            logging.error("Could not open database: {} does not exist".format(pathName))
+        elif self.db.open():
+            if not dbExists:
+                # This must be set before anything is written to a new database (including the journal mode)
+                self.executeQuery("pragma auto_vacuum=incremental", errorMessage="Error when attempting to enable incremental vacuum", cache=False)
+
+            self.applyProfile(profile if profile is not None else DatabaseProfile())
+
+            if readOnly:
+                self.loadGlobalValues()
+            elif dbExists:
                 logging.info("Database open")
+                self.loadGlobalValues()
                 self.updateDatabase()
             else:
                 # Create the database, and all tables
+                self.globalValues = {}
                 self.createNewDatabase()
+
+            self.attachArchive(archivePathName(pathName), readOnly)
+            self.loadFeeds()
         else:
             logging.error("Could not open database")
 
     def close(self):
         if self.db is not None:
+            # The cached queries must be released before their connection is closed
+            self.statementCache.clear()
             self.db.close()
 
+            connectionName = self.db.connectionName()
+            self.db = None
+            self.archiveAttached = False
+            QtSql.QSqlDatabase.removeDatabase(connectionName)
+
+    def attachArchive(self, archivePathName, readOnly):
+        """ Attaches the archive database, creating it if needed.  The archive holds the old feed items moved out of
+            the items table by archiveFeedItems(), so that the main database only holds recent feed items.  A
+            read-only connection only attaches an existing archive. """
+        archiveExists = Path(archivePathName).is_file()
+
+        if readOnly and not archiveExists:
+            return
+
+        queryObj = self.executeQuery("attach database ? as {}".format(kArchiveSchema), (archivePathName,),
+                                     "Error when attempting to attach the archive database", cache=False)
+
+        if queryObj is None:
+            return
+
+        queryObj.finish()
+        self.archiveAttached = True
+
+        if readOnly:
+            return
+
+        if not archiveExists:
+            self.executeQuery("pragma {}.auto_vacuum=incremental".format(kArchiveSchema),
+                              errorMessage="Error when attempting to enable incremental vacuum", cache=False)
+
+        # The archive uses the journal mode of the main database
+        pragmaStr = "pragma {}.journal_mode={}".format(kArchiveSchema, self.getPragmaValue("journal_mode"))
+        queryObj = self.executeQuery(pragmaStr, errorMessage="Error when attempting to apply '{}'".format(pragmaStr), cache=False)
+
+        if queryObj is not None:
+            queryObj.finish()
+
+        if not self.tableExists("items", kArchiveSchema):
+            self.createArchiveTables()
+        else:
+            # Archives created before version 17 have an index on the bodycodec column, which is no longer used
+            self.executeQuery("drop index if exists {}.itemsbodycodec".format(kArchiveSchema),
+                              errorMessage="Error when attempting to drop the archive's bodycodec index", cache=False)
+
+    def createArchiveTables(self):
+        """ Creates the tables of the archive database: an items table like the main database's, and its full-text
+            search index.  Archived feed items are indexed when they are archived. """
+        self.createItemsTable(kArchiveSchema)
+
+        createStr = "create virtual table {}.itemsearch using fts5({})".format(kArchiveSchema, kSearchTableColumns)
+
+        deleteTriggerStr = "create trigger {}.itemsearchdelete after delete on items begin ".format(kArchiveSchema)
+        deleteTriggerStr += "delete from itemsearch where rowid=old.itemid; "
+        deleteTriggerStr += "end"
+
+        for queryStr in [createStr, deleteTriggerStr]:
+            if self.executeQuery(queryStr, errorMessage="Error when attempting to create the archive search index", cache=False) is None:
+                return
+
+    def applyProfile(self, profile):
+        """ Applies the PRAGMAs and storage settings of the given DatabaseProfile to the open connection. """
+        self.bodyCodec = kBodyCodecZlib if profile.compressBodies else kBodyCodecPlain
+
+        for pragmaStr in profile.pragmaStatements():
+            queryObj = self.executeQuery(pragmaStr, errorMessage="Error when attempting to apply '{}'".format(pragmaStr), cache=False)
+
+            if queryObj is not None:
+                queryObj.finish()
+
+    def getEffectivePragmas(self):
+        """ Returns the values of the performance-related PRAGMAs of the open connection, as a dictionary
+            mapping PRAGMA name to value.  Used to verify that the database profile has taken effect. """
+        pragmas = {}
+
+        for pragmaName in kReportedPragmas:
+            value = self.getPragmaValue(pragmaName)
+
+            if value is not None:
+                pragmas[pragmaName] = value
+
+        return pragmas
+
+    def prepareQuery(self, queryStr, cache=True):
+        """ Returns a prepared query for the given SQL text.  If cache is True, the prepared query is kept, and
+            returned again the next time the same SQL text is requested.  Returns None if the SQL could not
+            be prepared. """
+        queryObj = self.statementCache.get(queryStr) if cache else None
+
+        if queryObj is None:
+            queryObj = QtSql.QSqlQuery(self.db)
+            queryObj.setForwardOnly(True)
+
+            if not queryObj.prepare(queryStr):
+                self.reportError("Error when attempting to prepare the query '{}': {}".format(queryStr, queryObj.lastError().text()))
+                return None
+
+            if cache:
+                self.statementCache[queryStr] = queryObj
+
+        return queryObj
+
+    def executeQuery(self, queryStr, params=(), errorMessage="Error when executing a query", cache=True):
+        """ Executes the given SQL with the given parameters.  Returns the query object, positioned before the
+            first result row, or None if an error occurred.  The error is reported as: "errorMessage: SQL error". """
+        queryObj = self.prepareQuery(queryStr, cache)
+
+        if queryObj is None:
+            return None
+
+        for index, param in enumerate(params):
+            queryObj.bindValue(index, param)
+
+        queryObj.exec()
+
+        # Check for errors
+        sqlErr = queryObj.lastError()
+
+        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
+            self.reportError("{}: {}".format(errorMessage, sqlErr.text()))
+            queryObj.finish()
+            return None
+
+        return queryObj
+
+    def fetchAll(self, queryStr, params=(), errorMessage="Error when executing a query", cache=True):
+        """ Executes the given query, and returns all of its result rows, as a list of tuples.
+            Returns None if an error occurred. """
+        queryObj = self.executeQuery(queryStr, params, errorMessage, cache)
+
+        if queryObj is None:
+            return None
+
+        columnRange = range(queryObj.record().count())
+        rows = []
+
+        while queryObj.next():
+            rows.append(tuple(queryObj.value(column) for column in columnRange))
+
+        queryObj.finish()
+        return rows
+
+    def fetchOne(self, queryStr, params=(), errorMessage="Error when executing a query", cache=True):
+        """ Executes the given query, and returns its first result row as a tuple.  Returns None if the query
+            returned no rows, or if an error occurred. """
+        queryObj = self.executeQuery(queryStr, params, errorMessage, cache)
+
+        if queryObj is None:
+            return None
+
+        row = None
+
+        if queryObj.next():
+            row = tuple(queryObj.value(column) for column in range(queryObj.record().count()))
+
+        queryObj.finish()
+        return row
+
     def createNewDatabase(self):
         """ Creates a new database. """
         logging.info("Creating new database...")
 
         self.createGlobalsTable()
         self.createFeedTable()
+        self.createItemsTable()
+        self.createFeedStatsTable()
+        self.createSearchTable()
         self.createFilteredWordsTable()
         self.createItemsOfInterestTable()
         self.createFilterTable()
@@ -70,8 +391,6 @@ class Database:
 
     def createGlobalsTable(self):
         """ Creates the globals table. """
-        queryObj = QtSql.QSqlQuery()
-
         createStr = "create table globals ("
         createStr += "key text UNIQUE, "
         createStr += "datatype int, "
@@ -80,20 +399,10 @@ class Database:
         createStr += "blobval blob"
         createStr += ")"
 
-        queryObj.prepare(createStr)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to the globals table: {}".format(sqlErr.text()))
+        self.executeQuery(createStr, errorMessage="Error when attempting to the globals table", cache=False)
 
     def createFeedTable(self):
         """ Creates the feed table. """
-        queryObj = QtSql.QSqlQuery()
-
         createStr = "create table feeds ("
         createStr += "feedid integer primary key, "  # Unique Feed ID (must not be 0).  SQLite guarantees this field to be unique
         createStr += "name text, "  # User - specified name of feed
@@ -107,26 +416,27 @@ class Database:
         createStr += "webpagelink text, "  # URL of web site that owns this feed
         createStr += "favicon blob, "  # Favicon for feed's main web site
         createStr += "image blob, "  # Feed image(not a favicon)
-        createStr += "lastpurged integer default 0"  # Date and time the feed was last purged
+        createStr += "lastpurged integer default 0, "  # Date and time the feed was last purged
+        createStr += "retaindays integer default 0, "  # Maximum age of the feed's items, in days (0: no limit)
+        createStr += "retainitems integer default 0, "  # Maximum number of items in the feed (0: no limit)
+        createStr += "keepunread integer default 1, "  # If 1, the retention limits do not delete unread items
+        createStr += "keepinterest integer default 1, "  # If 1, the retention limits do not delete Items of Interest
+        createStr += "etag text default '', "  # ETag header of the feed's last response
+        createStr += "lastmodified text default '', "  # Last-Modified header of the feed's last response
+        createStr += "nextupdate integer default 0, "  # Date and time the feed is next due to be updated
+        createStr += "minupdateinterval integer default 0, "  # Shortest time between updates, in minutes (0: default)
+        createStr += "maxupdateinterval integer default 0, "  # Longest time between updates, in minutes (0: default)
+        createStr += "retaincutoff integer default 0"  # Publication time of the newest item deleted by the item limit
 
         createStr += ")"
 
-        queryObj.prepare(createStr)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create the feed table: {}".format(sqlErr.text()))
-
-    def createFeedItemsTable(self, feedId):
-        """ Creates a feed item table. """
-        feedTableName = self.feedItemsTableName(feedId)
-        queryObj = QtSql.QSqlQuery()
+        self.executeQuery(createStr, errorMessage="Error when attempting to create the feed table", cache=False)
 
-        createStr = "create table {} (".format(feedTableName)
+    def createItemsTable(self, schemaName="main"):
+        """ Creates the items table, which holds the feed items of all feeds, in the given database. """
+        createStr = "create table {}.items (".format(schemaName)
+        createStr += "itemid integer primary key, " # Unique item ID.  SQLite guarantees this field to be unique
+        createStr += "feedid integer, " # Feed ID of the feed that owns this item
         createStr += "title text, " # Item title
         createStr += "author text, " # Item author
         createStr += "link text, " # Item link
@@ -136,44 +446,86 @@ class Database:
         createStr += "thumbnaillink text, " # Link to item 's thumbnail
         createStr += "thumbnailwidth integer, " # Width of thumbnail
         createStr += "thumbnailheight integer, " # Height of thumbnail
-        createStr += "guid text UNIQUE, " # Item guid(usually just the URL of the article)
+        createStr += "guid text, " # Item guid(usually just the URL of the article)
         createStr += "feedburneroriglink text, " # Feedburner link(possibly unnecessary?)
         createStr += "readflag integer, " # 0 for Not Read, non - zero for Read
         createStr += "enclosurelink text, " # Link to media enclosure(ie, podcast)
         createStr += "enclosurelength integer, " # Length of enclosure
         createStr += "enclosuretype text, " # Type of enclosure(such as "media/mpeg")
-        createStr += "contentencoded text " # Store < content: encoded > tag data
+        createStr += "contentencoded text, " # Store < content: encoded > tag data
+        createStr += "bodycodec integer default 0, " # How description and contentencoded are stored (see body_codec.py)
+        createStr += "unique (feedid, guid)"
         createStr += ")"
 
-        queryObj.prepare(createStr)
-        queryObj.exec()
+        if self.executeQuery(createStr, errorMessage="Error when attempting to create the items table", cache=False) is None:
+            return
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        # Indexes for the per-feed queries (date-ordered listing/purging, and unread counts)
+        indexList = ["create index itemsfeeddate on items (feedid, pubdatetime)",
+                     "create index itemsfeedread on items (feedid, readflag)"]
+
+        for indexStr in indexList:
+            indexStr = indexStr.replace("create index ", "create index {}.".format(schemaName))
+            self.executeQuery(indexStr, errorMessage="Error when attempting to create an index on the items table", cache=False)
+
+    def createFeedStatsTable(self):
+        """ Creates the feed statistics table, and the triggers that keep it in sync with the items table. """
+        # Create feedstats table - table that holds the number of unread and total items of each feed
+        createStr = "create table feedstats ("
+        createStr += "feedid integer primary key, "  # Feed ID
+        createStr += "unreadcount integer, "  # Number of unread items in the feed
+        createStr += "totalcount integer "  # Number of items in the feed
+        createStr += ")"
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create a feed item table: {}".format(sqlErr.text()))
+        # Note that "readflag is 0" evaluates to 0 or 1, even when readflag is null.
+        triggerList = [
+            "create trigger feedstatsinsert after insert on items begin "
+            "insert or ignore into feedstats (feedid, unreadcount, totalcount) values (new.feedid, 0, 0); "
+            "update feedstats set unreadcount=unreadcount+(new.readflag is 0), totalcount=totalcount+1 where feedid=new.feedid; "
+            "end",
+
+            "create trigger feedstatsdelete after delete on items begin "
+            "update feedstats set unreadcount=unreadcount-(old.readflag is 0), totalcount=totalcount-1 where feedid=old.feedid; "
+            "end",
+
+            "create trigger feedstatsreadflag after update of readflag on items "
+            "when (old.readflag is 0) != (new.readflag is 0) begin "
+            "update feedstats set unreadcount=unreadcount+(new.readflag is 0)-(old.readflag is 0) where feedid=new.feedid; "
+            "end"
+        ]
+
+        for queryStr in [createStr] + triggerList:
+            if self.executeQuery(queryStr, errorMessage="Error when attempting to create the feed statistics table", cache=False) is None:
+                return
 
-    def deleteFeedItemsTable(self, feedId):
-        """ Deletes a feed items table. """
-        feedItemsTableName = self.feedItemsTableName(feedId)
+    def createSearchTable(self):
+        """ Creates the full-text search index of the feed items.  The index is contentless (the text is only
+            stored in the items table), and its rowids are the item IDs of the items table.  New feed items are
+            queued in the searchpending table by a trigger, and added to the index by indexPendingItems(), so
+            that indexing does not slow down storing new feed items. """
+        # body holds the plain text of the description and content
+        createStr = "create virtual table itemsearch using fts5({})".format(kSearchTableColumns)
 
-        queryObj = QtSql.QSqlQuery()
-        queryStr = "drop table {}".format(feedItemsTableName)
+        pendingStr = "create table searchpending (itemid integer primary key)"
 
-        queryObj.prepare(queryStr)
-        queryObj.exec()
+        insertTriggerStr = "create trigger itemsearchinsert after insert on items begin "
+        insertTriggerStr += "insert or ignore into searchpending (itemid) values (new.itemid); "
+        insertTriggerStr += "end"
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        # Deleting a feed item (including by purging or deleting its feed) removes it from the index
+        deleteTriggerStr = "create trigger itemsearchdelete after delete on items begin "
+        deleteTriggerStr += "delete from itemsearch where rowid=old.itemid; "
+        deleteTriggerStr += "delete from searchpending where itemid=old.itemid; "
+        deleteTriggerStr += "end"
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete a feed items table: {}".format(sqlErr.text()))
+        for queryStr in [createStr, pendingStr, insertTriggerStr, deleteTriggerStr]:
+            if self.executeQuery(queryStr, errorMessage="Error when attempting to create the search index", cache=False) is None:
+                return False
+
+        return True
 
     def createFilteredWordsTable(self):
         """ Creates the filtered words (aka language filter) table. """
-        queryObj = QtSql.QSqlQuery()
-
         # Create filteredwords table - table to hold words that should not be displayed.
         # Words in this table will be replaced with asterisks (or something similar) when
         # displayed to the user.
@@ -181,38 +533,28 @@ class Database:
         createStr += "word text "  # Word to filter
         createStr += ")"
 
-        queryObj.prepare(createStr)
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create the filtered words table: {}".format(sqlErr.text()))
+        self.executeQuery(createStr, errorMessage="Error when attempting to create the filtered words table", cache=False)
 
     def createItemsOfInterestTable(self):
         """ Creates the Items of Interest table. """
-        queryObj = QtSql.QSqlQuery()
-
         # Create items of interest table - table that holds links to interesting feed items
         createStr = "create table itemsofinterest ("
         createStr += "feedid integer, " # Feed ID of this item
         createStr += "guid text "       # Item guid
         createStr += ")"
 
-        queryObj.prepare(createStr)
-        queryObj.exec()
+        if self.executeQuery(createStr, errorMessage="Error when attempting to create the Items of Interest table", cache=False) is None:
+            return
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        self.createItemsOfInterestIndex()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create the Items of Interest table: {}".format(sqlErr.text()))
+    def createItemsOfInterestIndex(self):
+        """ Creates the unique index on the Items of Interest table, which prevents a feed item from being added twice. """
+        self.executeQuery("create unique index itemsofinterestunique on itemsofinterest (feedid, guid)",
+                          errorMessage="Error when attempting to create the Items of Interest index", cache=False)
 
     def createFilterTable(self):
         """ Creates the filter table. """
-        queryObj = QtSql.QSqlQuery()
-
         # Create items of interest table - table that holds links to interesting feed items
         createStr = "create table feeditemfilters ("
         createStr += "filterid integer primary key, "  # Filter ID
@@ -223,19 +565,10 @@ class Database:
         createStr += "action integer "  # Action ID
         createStr += ")"
 
-        queryObj.prepare(createStr)
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create the filter table: {}".format(sqlErr.text()))
+        self.executeQuery(createStr, errorMessage="Error when attempting to create the filter table", cache=False)
 
     def createAdFilterTable(self):
         """ Creates the ad filter table. """
-        queryObj = QtSql.QSqlQuery()
-
         # Create ad filter table - table that holds strings of ad-related words to filter.
         # When HTML elements are encountered with these words, the HTML elements will be
         # removed.  Such elements contain undesirable advertisement-related content.
@@ -243,14 +576,7 @@ class Database:
         createStr += "word text "  # Word to filter
         createStr += ")"
 
-        queryObj.prepare(createStr)
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to create the ad filter table: {}".format(sqlErr.text()))
+        self.executeQuery(createStr, errorMessage="Error when attempting to create the ad filter table", cache=False)
 
     def reportError(self, errorMessage):
         logging.error(errorMessage)
@@ -260,181 +586,408 @@ class Database:
 
     def updateDatabase(self):
         """ Updates the database to the current version. """
-        # Nothing to do at this point.
-        pass
+        databaseVersion = self.getGlobalValue(kDatabaseVersionId)
 
-    def beginTransaction(self):
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("begin transaction")
-        queryObj.exec()
+        if databaseVersion is None:
+            self.reportError("Database version not found; the database cannot be updated.")
+            return
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        if databaseVersion < 8:
+            self.updateToVersion8()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error beginning a transaction: {}".format(sqlErr.text()))
+            if self.getGlobalValue(kDatabaseVersionId) < 8:
+                # The migration did not complete; it will be resumed the next time the database is opened.
+                return
 
-    def endTransaction(self):
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("end transaction")
-        queryObj.exec()
+        if databaseVersion < 9:
+            self.updateToVersion9()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        if databaseVersion < 10:
+            self.updateToVersion10()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error ending a transaction: {}".format(sqlErr.text()))
+        if databaseVersion < 11:
+            self.updateToVersion11()
 
-    def vacuumDatabase(self):
-        """ Performs a 'vacuum' operation on the database.  This compacts the database file. """
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("vacuum;")
+        if databaseVersion < 12:
+            self.updateToVersion12()
 
-        queryObj.exec()
+        if databaseVersion < 13:
+            self.updateToVersion13()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        if databaseVersion < 14:
+            self.updateToVersion14()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to vacuum the database: {}".format(sqlErr.text()))
+        if databaseVersion < 15:
+            self.updateToVersion15()
 
-    def getGlobalValue(self, key):
-        """ Returns the value of a 'global value' for the given key. """
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("select datatype from globals where key = ?")
-        queryObj.bindValue(0, key)
+        if databaseVersion < 16:
+            self.updateToVersion16()
 
-        queryObj.exec()
+        if databaseVersion < 17:
+            self.updateToVersion17()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        if databaseVersion < 18:
+            self.updateToVersion18()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve a global value key: {}".format(sqlErr.text()))
-            return None
+    def updateToVersion8(self):
+        """ Version 8 moves the feed items from the per-feed FeedItems tables into the single items table.
+            Each feed table is copied in batches, and dropped in the same transaction as its last batch, so
+            an interrupted migration simply resumes with the tables that remain. """
+        logging.info("Updating database to version 8...")
 
-        if queryObj.next():
-            typeField = queryObj.record().indexOf("datatype")
+        if not self.tableExists("items"):
+            self.createItemsTable()
 
-            dataType = queryObj.value(typeField)
-        else:
-            # key not found
-            return None
+        legacyTableNames = self.getLegacyFeedItemsTableNames()
 
-        if dataType == kDataTypeInteger:
-            createStr = "select intval from globals where key=?"
-        elif dataType == kDataTypeString:
-            createStr = "select stringval from globals where key=?"
-        elif dataType == kDataTypeBlob:
-            createStr = "select blobval from globals where key=?"
-        else:
-            # Unknown data type
-            self.reportError("getGlobalValue: unknown data type: {}".format(dataType))
-            return None
+        for index, tableName in enumerate(legacyTableNames):
+            logging.info("Migrating {} ({} of {})".format(tableName, index + 1, len(legacyTableNames)))
+            if not self.migrateLegacyFeedItemsTable(tableName):
+                self.reportError("Database migration stopped at {}; it will be resumed the next time the database is opened.".format(tableName))
+                return
 
-        # Now that the data type is known, retrieve the data itself.
-        queryObj.prepare(createStr)
-        queryObj.bindValue(0, key)
+        self.setGlobalValue(kDatabaseVersionId, 8)
+        logging.info("Database updated to version 8.")
 
-        queryObj.exec()
+    def updateToVersion9(self):
+        """ Version 9 adds the feedstats table, whose counts are maintained by triggers on the items table. """
+        logging.info("Updating database to version 9...")
+        self.beginTransaction()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve a page: {}".format(sqlErr.text()))
-            return None
+        self.createFeedStatsTable()
 
-        if queryObj.next():
-            if dataType == kDataTypeInteger:
-                valueField = queryObj.record().indexOf("intval")
-            elif dataType == kDataTypeString:
-                valueField = queryObj.record().indexOf("stringval")
-            elif dataType == kDataTypeBlob:
-                valueField = queryObj.record().indexOf("blobval")
+        queryStr = "insert into feedstats (feedid, unreadcount, totalcount) " \
+                   "select feedid, sum(readflag is 0), count(*) from items group by feedid"
 
-            value = queryObj.value(valueField)
-            return value
+        if self.executeQuery(queryStr, errorMessage="Error when attempting to populate the feed statistics table", cache=False) is None:
+            self.rollbackTransaction()
+            return
 
+        self.setGlobalValue(kDatabaseVersionId, 9)
+        self.endTransaction()
+        logging.info("Database updated to version 9.")
 
-    def setGlobalValue(self, key, value):
-        """ Sets the value of the given key to the given value. """
+    def updateToVersion10(self):
+        """ Version 10 removes duplicate Items of Interest, and adds a unique index to prevent new ones. """
+        logging.info("Updating database to version 10...")
+        self.beginTransaction()
 
-        # See if the key exists
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("select datatype from globals where key = ?")
-        queryObj.bindValue(0, key)
+        queryStr = "delete from itemsofinterest where rowid not in " \
+                   "(select min(rowid) from itemsofinterest group by feedid, guid)"
 
-        queryObj.exec()
+        if self.executeQuery(queryStr, errorMessage="Error when attempting to remove duplicate Items of Interest", cache=False) is None:
+            self.rollbackTransaction()
+            return
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        self.createItemsOfInterestIndex()
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to determine if a global value exists: {}".format(sqlErr.text()))
+        self.setGlobalValue(kDatabaseVersionId, 10)
+        self.endTransaction()
+        logging.info("Database updated to version 10.")
+
+    def updateToVersion11(self):
+        """ Version 11 adds the full-text search index.  Existing feed items are queued for indexing, which is done
+            in the background by indexPendingItems(). """
+        logging.info("Updating database to version 11...")
+        self.beginTransaction()
+
+        if not self.createSearchTable():
+            self.rollbackTransaction()
             return
 
-        if queryObj.next():
-            # Key exists; update its value
-            if isinstance(value, int):
-                createStr = "update globals set intval=? where key=?"
-            elif isinstance(value, str):
-                createStr = "update globals set stringval=? where key=?"
-            elif isinstance(value, QtCore.QByteArray):
-                createStr = "update globals set blobval=? where key=?"
-            else:
-                self.reportError("setGlobalValue: invalid data type")
+        if self.executeQuery("insert into searchpending (itemid) select itemid from items",
+                             errorMessage="Error when attempting to queue feed items for indexing", cache=False) is None:
+            self.rollbackTransaction()
+            return
+
+        self.setGlobalValue(kDatabaseVersionId, 11)
+        self.endTransaction()
+        logging.info("Database updated to version 11.")
+
+    def updateToVersion12(self):
+        """ Version 12 adds the bodycodec column to the items table, allowing feed item descriptions and contents to
+            be stored compressed.  Existing feed items are compressed in the background by recompressFeedItems(). """
+        logging.info("Updating database to version 12...")
+        self.beginTransaction()
+
+        # The items table already has the column if it was created by the version 8 update
+        if not self.columnExists("items", "bodycodec"):
+            if self.executeQuery("alter table items add column bodycodec integer default 0",
+                                 errorMessage="Error when attempting to add the bodycodec column", cache=False) is None:
+                self.rollbackTransaction()
                 return
 
-            queryObj.prepare(createStr)
+        self.setGlobalValue(kDatabaseVersionId, 12)
+        self.endTransaction()
+        logging.info("Database updated to version 12.")
 
-            queryObj.addBindValue(value)
-            queryObj.addBindValue(key)
-        else:
-            if isinstance(value, int):
-                createStr = "insert into globals (key, datatype, intval) values (?, ?, ?)"
-                dataType = kDataTypeInteger
-            elif isinstance(value, str):
-                createStr = "insert into globals (key, datatype, stringval) values (?, ?, ?)"
-                dataType = kDataTypeString
-            elif isinstance(value, QtCore.QByteArray):
-                createStr = "insert into globals (key, datatype, blobval) values (?, ?, ?)"
-                dataType = kDataTypeBlob
-            else:
-                self.reportError("setGlobalValue: invalid data type")
+    def updateToVersion13(self):
+        """ Version 13 switches the database to auto_vacuum=INCREMENTAL, so that the space freed by purges can be
+            returned to the file system a few pages at a time (see incrementalVacuum()), instead of by rewriting the
+            whole file.  Changing auto_vacuum on an existing database takes one full vacuum. """
+        logging.info("Updating database to version 13...")
+        self.vacuumDatabase()
+
+        if self.getPragmaValue("auto_vacuum") != kAutoVacuumIncremental:
+            # The database still works, but space is only reclaimed by a full vacuum (which also retries the switch)
+            self.reportError("Could not enable incremental vacuum")
+
+        self.setGlobalValue(kDatabaseVersionId, 13)
+        logging.info("Database updated to version 13.")
+
+    def updateToVersion14(self):
+        """ Version 14 adds the per-feed retention policy columns to the feeds table (see applyRetentionPolicy()). """
+        logging.info("Updating database to version 14...")
+        self.beginTransaction()
+
+        for columnName, columnType in kFeedRetentionColumns:
+            if not self.columnExists("feeds", columnName):
+                if self.executeQuery("alter table feeds add column {} {}".format(columnName, columnType),
+                                     errorMessage="Error when attempting to add the {} column".format(columnName),
+                                     cache=False) is None:
+                    self.rollbackTransaction()
+                    return
+
+        self.setGlobalValue(kDatabaseVersionId, 14)
+        self.endTransaction()
+        logging.info("Database updated to version 14.")
+
+    def updateToVersion15(self):
+        """ Version 15 adds the HTTP validator columns to the feeds table (see setFeedValidators()). """
+        logging.info("Updating database to version 15...")
+        self.beginTransaction()
+
+        for columnName, columnType in kFeedValidatorColumns:
+            if not self.columnExists("feeds", columnName):
+                if self.executeQuery("alter table feeds add column {} {}".format(columnName, columnType),
+                                     errorMessage="Error when attempting to add the {} column".format(columnName),
+                                     cache=False) is None:
+                    self.rollbackTransaction()
+                    return
+
+        self.setGlobalValue(kDatabaseVersionId, 15)
+        self.endTransaction()
+        logging.info("Database updated to version 15.")
+
+    def updateToVersion16(self):
+        """ Version 16 adds the update schedule columns to the feeds table (see setFeedNextUpdate()). """
+        logging.info("Updating database to version 16...")
+        self.beginTransaction()
+
+        for columnName, columnType in kFeedScheduleColumns:
+            if not self.columnExists("feeds", columnName):
+                if self.executeQuery("alter table feeds add column {} {}".format(columnName, columnType),
+                                     errorMessage="Error when attempting to add the {} column".format(columnName),
+                                     cache=False) is None:
+                    self.rollbackTransaction()
+                    return
+
+        self.setGlobalValue(kDatabaseVersionId, 16)
+        self.endTransaction()
+        logging.info("Database updated to version 16.")
+
+    def updateToVersion17(self):
+        """ Version 17 drops the index on the bodycodec column.  The predicate used to find the feed items to
+            recompress could not use it, so it only slowed down inserts; a recompression is skipped instead once it
+            has completed (see isRecompressionComplete()).  The archive's index is dropped when it is attached. """
+        logging.info("Updating database to version 17...")
+
+        if self.executeQuery("drop index if exists itemsbodycodec",
+                             errorMessage="Error when attempting to drop the bodycodec index", cache=False) is None:
+            return
+
+        self.setGlobalValue(kDatabaseVersionId, 17)
+        logging.info("Database updated to version 17.")
+
+    def updateToVersion18(self):
+        """ Version 18 adds the retaincutoff column to the feeds table (see applyRetentionPolicy()). """
+        logging.info("Updating database to version 18...")
+        self.beginTransaction()
+
+        if not self.columnExists("feeds", "retaincutoff"):
+            if self.executeQuery("alter table feeds add column retaincutoff integer default 0",
+                                 errorMessage="Error when attempting to add the retaincutoff column", cache=False) is None:
+                self.rollbackTransaction()
                 return
 
-            queryObj.prepare(createStr)
+        self.setGlobalValue(kDatabaseVersionId, 18)
+        self.endTransaction()
+        logging.info("Database updated to version 18.")
 
-            queryObj.addBindValue(key)
-            queryObj.addBindValue(dataType)
-            queryObj.addBindValue(value)
+    def getLegacyFeedItemsTableNames(self):
+        """ Returns the names of the per-feed item tables used by database versions prior to 8. """
+        rows = self.fetchAll("select name from sqlite_master where type='table' and name like 'FeedItems%'",
+                             errorMessage="Error when attempting to retrieve the feed item tables")
 
-        queryObj.exec()
+        if rows is None:
+            return []
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        return [row[0] for row in rows]
+
+    def migrateLegacyFeedItemsTable(self, tableName):
+        """ Copies the rows of a legacy per-feed item table into the items table, kMigrationBatchSize rows per
+            transaction, and drops the legacy table.  Rows already copied by an interrupted migration are
+            skipped by the (feedid, guid) constraint.  Returns True if the table was migrated. """
+        feedId = int(tableName[len("FeedItems"):])
+        lastRowId = 0
+
+        while True:
+            # Find the last row of this batch.  If there are fewer than kMigrationBatchSize rows left, this is the final batch.
+            queryObj = self.executeQuery("select rowid from {} where rowid>? order by rowid limit 1 offset ?".format(tableName),
+                                         (lastRowId, kMigrationBatchSize - 1),
+                                         "Error when attempting to read {}".format(tableName), cache=False)
+            if queryObj is None:
+                return False
+
+            finalBatch = not queryObj.next()
+            batchEndRowId = None if finalBatch else queryObj.value(0)
+            queryObj.finish()
+
+            self.beginTransaction()
+
+            queryStr = "insert or ignore into items (feedid, {}) ".format(kLegacyFeedItemColumns)
+            queryStr += "select ?, {} from {} where rowid>?".format(kLegacyFeedItemColumns, tableName)
+            params = (feedId, lastRowId)
+            if not finalBatch:
+                queryStr += " and rowid<=?"
+                params += (batchEndRowId,)
+
+            if self.executeQuery(queryStr, params, "Error when attempting to copy the items of {}".format(tableName), cache=False) is None:
+                self.rollbackTransaction()
+                return False
+
+            if finalBatch:
+                if self.executeQuery("drop table {}".format(tableName),
+                                     errorMessage="Error when attempting to drop {}".format(tableName), cache=False) is None:
+                    self.rollbackTransaction()
+                    return False
+
+            self.endTransaction()
+
+            # Keep the UI responsive while migrating large databases
+            QtCore.QCoreApplication.processEvents()
+
+            if finalBatch:
+                return True
+
+            lastRowId = batchEndRowId
+
+    def beginTransaction(self, readOnly=False):
+        """ Begins a transaction.  Transactions may be nested (for example, when the database writer groups several
+            writes into one transaction); a nested transaction is a savepoint within the outermost transaction.
+            A read-only transaction only reads from a single snapshot of the database, and does not take the write
+            lock. """
+        if self.transactionDepth == 0 and readOnly:
+            self.executeQuery("begin deferred transaction", errorMessage="Error beginning a transaction")
+        elif self.transactionDepth == 0:
+            # The write lock is taken immediately.  A deferred transaction that first reads and then writes fails,
+            # without waiting, if another connection has written in between.
+            self.executeQuery("begin immediate transaction", errorMessage="Error beginning a transaction")
+        else:
+            self.executeQuery("savepoint nested{}".format(self.transactionDepth), errorMessage="Error beginning a nested transaction")
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to set a global value: {}".format(sqlErr.text()))
+        self.transactionDepth += 1
 
+    def endTransaction(self):
+        self.transactionDepth -= 1
 
-    def globalValueExists(self, key):
-        """ Checks if a global value exists. """
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("select datatype from globals where key=?")
-        queryObj.addBindValue(key)
+        if self.transactionDepth == 0:
+            self.executeQuery("end transaction", errorMessage="Error ending a transaction")
+        else:
+            self.executeQuery("release nested{}".format(self.transactionDepth), errorMessage="Error ending a nested transaction")
 
-        queryObj.exec()
+    def rollbackTransaction(self):
+        self.transactionDepth -= 1
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        if self.transactionDepth == 0:
+            self.executeQuery("rollback transaction", errorMessage="Error rolling back a transaction")
+        else:
+            self.executeQuery("rollback to nested{}".format(self.transactionDepth), errorMessage="Error rolling back a nested transaction")
+            self.executeQuery("release nested{}".format(self.transactionDepth), errorMessage="Error rolling back a nested transaction")
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            return False
+    def vacuumDatabase(self):
+        """ Performs a 'vacuum' operation on the database.  This compacts the database file, by rewriting all of it.
+            Space freed by deleting feed items is normally reclaimed by incrementalVacuum() instead. """
+        # The vacuum also applies the auto_vacuum mode, if the database does not use it yet
+        self.executeQuery("pragma auto_vacuum=incremental", errorMessage="Error when attempting to enable incremental vacuum", cache=False)
+        self.executeQuery("vacuum;", errorMessage="Error when attempting to vacuum the database", cache=False)
+
+    def incrementalVacuum(self, maxPages=kIncrementalVacuumPages):
+        """ Returns up to maxPages free pages at the end of the database file to the file system.  Returns a tuple of
+            the form: (bytesReclaimed, freePagesLeft). """
+        freePages = self.getPragmaValue("freelist_count") or 0
+        numPages = min(freePages, maxPages)
+
+        if numPages == 0:
+            return 0, 0
+
+        self.beginTransaction()
+
+        # Qt only steps a statement once, and each step of incremental_vacuum frees one page
+        for _ in range(numPages):
+            if self.executeQuery("pragma incremental_vacuum(1)", errorMessage="Error when attempting to vacuum the database incrementally", cache=False) is None:
+                break
+
+        self.endTransaction()
+
+        freePagesLeft = self.getPragmaValue("freelist_count") or 0
+        return (freePages - freePagesLeft) * (self.getPragmaValue("page_size") or 0), freePagesLeft
+
+    def getPragmaValue(self, pragmaName):
+        """ Returns the value of the given PRAGMA, or None if it could not be read. """
+        row = self.fetchOne("pragma {}".format(pragmaName), errorMessage="Error when attempting to read '{}'".format(pragmaName), cache=False)
+        return row[0] if row is not None else None
+
+    def loadGlobalValues(self):
+        """ Reads the whole globals table into the globals cache. """
+        self.globalValues = {}
+
+        rows = self.fetchAll("select key, datatype, intval, stringval, blobval from globals",
+                             errorMessage="Error when attempting to retrieve the global values")
+
+        for key, dataType, intValue, stringValue, blobValue in rows or []:
+            if dataType == kDataTypeInteger:
+                self.globalValues[key] = intValue
+            elif dataType == kDataTypeString:
+                self.globalValues[key] = stringValue
+            elif dataType == kDataTypeBlob:
+                self.globalValues[key] = blobValue
+            else:
+                # Unknown data type
+                self.reportError("loadGlobalValues: unknown data type for {}: {}".format(key, dataType))
+
+    def getGlobalValue(self, key):
+        """ Returns the value of a 'global value' for the given key, or None if the key does not exist. """
+        return self.globalValues.get(key)
+
+    def setGlobalValue(self, key, value):
+        """ Sets the value of the given key to the given value. """
+        if isinstance(value, int):
+            dataType = kDataTypeInteger
+        elif isinstance(value, str):
+            dataType = kDataTypeString
+        elif isinstance(value, QtCore.QByteArray):
+            dataType = kDataTypeBlob
         else:
-            atLeastOne = queryObj.next()
-            return atLeastOne
+            self.reportError("setGlobalValue: invalid data type")
+            return
+
+        queryStr = "insert into globals (key, datatype, intval, stringval, blobval) values (?, ?, ?, ?, ?) "
+        queryStr += "on conflict (key) do update set "
+        queryStr += "datatype=excluded.datatype, intval=excluded.intval, stringval=excluded.stringval, blobval=excluded.blobval"
+
+        params = (key,
+                  dataType,
+                  value if dataType == kDataTypeInteger else None,
+                  value if dataType == kDataTypeString else None,
+                  value if dataType == kDataTypeBlob else None)
+
+        if self.executeQuery(queryStr, params, "Error when attempting to set a global value") is not None:
+            self.globalValues[key] = value
 
+    def globalValueExists(self, key):
+        """ Checks if a global value exists. """
+        return key in self.globalValues
 
     def getFeedOrder(self):
         """ Returns the list of feeds, in the order in which they were organized on the UI by the user.
@@ -463,112 +1016,119 @@ class Database:
         feedOrderString = ",".join(feedIdStrList)
         self.setGlobalValue(kFeedOrderGlobalKey, feedOrderString)
 
-    def getFeeds(self):
-        """ Returns a list of feed objects, consisting of all feeds. """
-        feedList = []
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("select feedid, parentid, name, title, description, language, url, added, lastupdated, webpagelink, favicon, image, lastpurged from feeds")
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all feeds: {}".format(sqlErr.text()))
-            # TODO: Maybe an exception should be thrown here
-            return []
-
-        while queryObj.next():
-            feedObj = Feed()
-
-            feedObj.m_feedId = queryObj.record().value(0)
-            feedObj.m_parentId = queryObj.record().value(1)
-            feedObj.m_feedName = queryObj.record().value(2)
-            feedObj.m_feedTitle = queryObj.record().value(3)
-            feedObj.m_feedDescription = queryObj.record().value(4)
-            feedObj.m_feedLanguage = queryObj.record().value(5)
-            feedObj.m_feedUrl = queryObj.record().value(6)
-            feedObj.m_feedDateAdded = julianDayToDate(queryObj.record().value(7))    # Convert to time
-            feedObj.m_feedLastUpdated = julianDayToDate(queryObj.record().value(8))  # Convert to time
-            feedObj.m_feedWebPageLink = queryObj.record().value(9)
-            favicon = queryObj.record().value(10)
+    def feedFromRow(self, row):
+        """ Creates a feed object from a row of the feeds table, containing the kFeedColumns columns, optionally
+            followed by the kFeedImageColumns columns. """
+        feedObj = Feed()
+
+        feedObj.m_feedId = row[0]
+        feedObj.m_parentId = row[1]
+        feedObj.m_feedName = row[2]
+        feedObj.m_feedTitle = row[3]
+        feedObj.m_feedDescription = row[4]
+        feedObj.m_feedLanguage = row[5]
+        feedObj.m_feedUrl = row[6]
+        feedObj.m_feedDateAdded = julianDayToDate(row[7])    # Convert to time
+        feedObj.m_feedLastUpdated = julianDayToDate(row[8])  # Convert to time
+        feedObj.m_feedWebPageLink = row[9]
+        feedObj.m_feedLastPurged = julianDayToDate(row[10])  # Convert to time
+        feedObj.m_retentionDays = row[11]
+        feedObj.m_retentionItems = row[12]
+        feedObj.m_keepUnreadItems = bool(row[13])
+        feedObj.m_keepItemsOfInterest = bool(row[14])
+        feedObj.m_etag = row[15]
+        feedObj.m_lastModified = row[16]
+        feedObj.m_nextUpdate = julianDayToDate(row[17])  # Convert to time
+        feedObj.m_minUpdateInterval = row[18]
+        feedObj.m_maxUpdateInterval = row[19]
+
+        if len(row) > 20:
+            favicon = row[20]
             if isinstance(favicon, QtCore.QByteArray):
                 feedObj.m_feedFavicon.loadFromData(favicon)
 
-            feedObj.m_feedImage = queryObj.record().value(11)
-            feedObj.m_feedLastPurged = julianDayToDate(queryObj.record().value(12))  # Convert to time
-            feedList.append(feedObj)
+            feedObj.m_feedImage = row[21]
 
-        return feedList
+        return feedObj
 
+    def feedColumns(self, includeImages):
+        return kFeedColumns + ", " + kFeedImageColumns if includeImages else kFeedColumns
 
-    def getFeedIds(self):
-        """ Returns a list of feed IDs. """
-        feedList = []
-        queryObj = QtSql.QSqlQuery()
-        queryObj.prepare("select feedid from feeds")
+    def loadFeeds(self):
+        """ Reads the feeds table (without the feeds' images) into the feed cache. """
+        rows = self.fetchAll("select {} from feeds".format(kFeedColumns),
+                             errorMessage="Error when attempting to retrieve all feeds")
 
-        queryObj.exec()
+        self.feeds = {row[0]: self.feedFromRow(row) for row in rows or []}
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve feed IDs: {}".format(sqlErr.text()))
-            # TODO: Maybe an exception should be thrown here
-            return []
+    def refreshFeed(self, feedId):
+        """ Re-reads a feed into the feed cache, after it has been changed. """
+        row = self.fetchOne("select {} from feeds where feedid=?".format(kFeedColumns), (feedId,),
+                            "Error when attempting to retrieve a single feeds")
 
-        while queryObj.next():
-            feedId = queryObj.record().value(0)
-            feedList.append(feedId)
+        if row is not None:
+            self.feeds[feedId] = self.feedFromRow(row)
+        else:
+            self.feeds.pop(feedId, None)
 
-        return feedList
+    def refreshCachedFeed(self, feedId):
+        """ Re-reads a feed into the feed cache, after the database writer has changed it.  A feed that is no longer
+            in the cache is being deleted by the writer, so it is not read back. """
+        if feedId in self.feeds:
+            self.refreshFeed(feedId)
 
+    def removeCachedFeed(self, feedId):
+        """ Removes a feed from the feed cache and the icon cache (for example, when the feed is deleted). """
+        self.feeds.pop(feedId, None)
+        self.feedIconCache.removeIcon(feedId)
 
-    def getFeed(self, feedId):
-        """ Returns data for a single feed. """
-        feed = Feed()
+    def getFeeds(self, includeImages=False):
+        """ Returns a list of feed objects, consisting of all feeds.  The feeds' favicons and images are only read
+            if includeImages is True; otherwise, the feeds come from the feed cache. """
+        if not includeImages:
+            return [copy.copy(feed) for feed in self.feeds.values()]
 
-        queryObj = QtSql.QSqlQuery()
+        rows = self.fetchAll("select {} from feeds".format(self.feedColumns(includeImages)),
+                             errorMessage="Error when attempting to retrieve all feeds")
 
-        queryStr = "select feedid, parentid, name, title, description, language, url, added, lastupdated, "
-        queryStr += "webpagelink, favicon, image, lastpurged from feeds where feedid=?"
+        if rows is None:
+            # TODO: Maybe an exception should be thrown here
+            return []
 
-        queryObj.prepare(queryStr)
+        return [self.feedFromRow(row) for row in rows]
 
-        queryObj.addBindValue(feedId)
+    def getFeedIds(self):
+        """ Returns a list of feed IDs. """
+        return list(self.feeds.keys())
 
-        queryObj.exec()
+    def getFeed(self, feedId, includeImages=False):
+        """ Returns data for a single feed.  The feed's favicon and image are only read if includeImages is True;
+            otherwise, the feed comes from the feed cache. """
+        if not includeImages:
+            feed = self.feeds.get(feedId)
+            return copy.copy(feed) if feed is not None else Feed()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        row = self.fetchOne("select {} from feeds where feedid=?".format(self.feedColumns(includeImages)), (feedId,),
+                            "Error when attempting to retrieve a single feeds")
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve a single feeds: {}".format(sqlErr.text()))
+        if row is None:
             # TODO: Maybe an exception should be thrown here
-            return feed
+            return Feed()
 
-        while queryObj.next():
-            feed.m_feedId = queryObj.record().value(0)
-            feed.m_parentId = queryObj.record().value(1)
-            feed.m_feedName = queryObj.record().value(2)
-            feed.m_feedTitle = queryObj.record().value(3)
-            feed.m_feedDescription = queryObj.record().value(4)
-            feed.m_feedLanguage = queryObj.record().value(5)
-            feed.m_feedUrl = queryObj.record().value(6)
-            feed.m_feedDateAdded = julianDayToDate(queryObj.record().value(7))    # Convert to time
-            feed.m_feedLastUpdated = julianDayToDate(queryObj.record().value(8))  # Convert to time
-            feed.m_feedWebPageLink = queryObj.record().value(9)
-            favicon = queryObj.record().value(10)
-            if isinstance(favicon, QtCore.QByteArray):
-                feed.m_feedFavicon.loadFromData(favicon)
+        return self.feedFromRow(row)
 
-            feed.m_feedImage = queryObj.record().value(11)
-            feed.m_feedLastPurged = julianDayToDate(queryObj.record().value(12))  # Convert to time
+    def getFeedIcon(self, feedId):
+        """ Returns the icon of the given feed, scaled for display in the feed tree.  Icons are cached, so the feed's
+            images are only read and decoded the first time the icon is requested. """
+        icon = self.feedIconCache.getIcon(feedId)
 
-        return feed
+        if icon is None:
+            row = self.fetchOne("select {} from feeds where feedid=?".format(kFeedImageColumns), (feedId,),
+                                "Error when attempting to retrieve the icon of a feed")
+            favicon, image = row if row is not None else (None, None)
+            icon = self.feedIconCache.addIcon(feedId, favicon, image)
 
+        return icon
 
     def addFeed(self, feed):
         """ Adds a feed to the database.  Returns the feed with its feed ID updated to reflect the actual feed ID. """
@@ -585,267 +1145,309 @@ class Database:
         tempImageBuffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
         feed.m_feedImage.save(tempImageBuffer, "PNG")   # Write pixmap into bytes in PNG format
 
-        queryObj = QtSql.QSqlQuery()
-
         # Note that feedid is not specified here.  Since feedid is the primary key, it's value is chosen by
         # SQLite to be a unique value.
         queryStr = "insert into feeds (parentid, name, title, description, language, url, added, lastupdated, " \
-                   "webpagelink, favicon, image, lastpurged) " \
-                   "values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
-        queryObj.prepare(queryStr)
-
-        queryObj.addBindValue(feed.m_parentId)
-        queryObj.addBindValue(feed.m_feedName)
-        queryObj.addBindValue(feed.m_feedTitle)
-        queryObj.addBindValue(feed.m_feedDescription)
-        queryObj.addBindValue(feed.m_feedLanguage)
-        queryObj.addBindValue(feed.m_feedUrl)
-        queryObj.addBindValue(dateToJulianDay(feed.m_feedDateAdded))
-        queryObj.addBindValue(dateToJulianDay(feed.m_feedLastUpdated))
-        queryObj.addBindValue(feed.m_feedWebPageLink)
-        queryObj.addBindValue(faviconBytes)
-        queryObj.addBindValue(imageBytes)
-        queryObj.addBindValue(dateToJulianDay(feed.m_feedLastPurged))
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to add a feed: {}".format(sqlErr.text()))
+                   "webpagelink, favicon, image, lastpurged, retaindays, retainitems, keepunread, keepinterest, " \
+                   "etag, lastmodified, nextupdate, minupdateinterval, maxupdateinterval) " \
+                   "values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+        params = (feed.m_parentId,
+                  feed.m_feedName,
+                  feed.m_feedTitle,
+                  feed.m_feedDescription,
+                  feed.m_feedLanguage,
+                  feed.m_feedUrl,
+                  dateToJulianDay(feed.m_feedDateAdded),
+                  dateToJulianDay(feed.m_feedLastUpdated),
+                  feed.m_feedWebPageLink,
+                  faviconBytes,
+                  imageBytes,
+                  dateToJulianDay(feed.m_feedLastPurged),
+                  feed.m_retentionDays,
+                  feed.m_retentionItems,
+                  feed.m_keepUnreadItems,
+                  feed.m_keepItemsOfInterest,
+                  feed.m_etag,
+                  feed.m_lastModified,
+                  dateToJulianDay(feed.m_nextUpdate),
+                  feed.m_minUpdateInterval,
+                  feed.m_maxUpdateInterval)
+
+        queryObj = self.executeQuery(queryStr, params, "Error when attempting to add a feed")
+
+        if queryObj is None:
             return
 
         # Retrieve the feed ID (it is set by SQLite when the row was created)
-        queryObj.prepare("select last_insert_rowid();")
-        queryObj.exec()
+        feedId = queryObj.lastInsertId()
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve the last inserted row id: {}".format(sqlErr.text()))
-            # Note that if an error occurs here, and we exit, the above-created row will still be present, thus
-            # leaving the database in an inconsistent state.  But, without the rowid of the newly-created row,
-            # we can't delete it!
-            return None
-
-        if queryObj.next():
-            feedId = queryObj.record().value(0)
-        else:
+        if feedId is None:
             self.reportError("Can't retrieve the last inserted row id.")
             # Note that if an error occurs here, and we exit, the above-created row will still be present, thus
             # leaving the database in an inconsistent state.  But, without the rowid of the newly-created row,
             # we can't delete it!
             return None
 
-        # Create the corresponding FeedItemsTable for this feed
-        self.createFeedItemsTable(feedId)
         feed.m_feedId = feedId
+        self.refreshFeed(feedId)
+        self.feedIconCache.removeIcon(feedId)       # Feed IDs of deleted feeds may be reused
         return feed
 
     def deleteFeed(self, feedId):
         """ Deletes a feed.  This involves:
-            1. Deleting the feed's feed item table
+            1. Deleting the feed's feed items (including those in the archive)
             2. Deleting the feed's ID from the feed table
-            3. Removing the feed's ID from the feed order, stored in the globals table
+            The feed's ID is not removed from the feed order here: feeds are deleted by the database writer, whose
+            globals cache does not see the GUI thread's changes to the feed order.  The GUI thread removes it, with
+            removeFeedFromFeedOrder().
         """
-        self.deleteFeedItemsTable(feedId)
+        self.executeQuery("delete from items where feedid=?", (feedId,),
+                          "Error when attempting to delete the feed items of a feed")
 
-        queryObj = QtSql.QSqlQuery()
-        queryStr = "delete from feeds where feedid=?"
-        queryObj.prepare(queryStr)
+        self.executeQuery("delete from feedstats where feedid=?", (feedId,),
+                          "Error when attempting to delete the statistics of a feed")
 
-        queryObj.addBindValue(feedId)
+        self.executeQuery("delete from feeds where feedid=?", (feedId,),
+                          "Error when attempting to delete a feed from the feed table")
 
-        queryObj.exec()
+        if self.archiveAttached:
+            self.executeQuery("delete from {}.items where feedid=?".format(kArchiveSchema), (feedId,),
+                              "Error when attempting to delete the archived feed items of a feed")
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete a feed from the feed table: {}".format(sqlErr.text()))
-
-        self.removeFeedFromFeedOrder(feedId)
+        self.removeCachedFeed(feedId)
 
     def updateFeedLastUpdatedField(self, feedId, lastUpdatedDate):
         """ Updates the last-updated field for the given feed. """
-        queryObj = QtSql.QSqlQuery()
-
-        # Determine number of unread items
-        queryStr = "update feeds set lastupdated=? where feedid=?"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(dateToJulianDay(lastUpdatedDate))
-        queryObj.addBindValue(feedId)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to update the last-updated field: {}".format(sqlErr.text()))
+        self.executeQuery("update feeds set lastupdated=? where feedid=?", (dateToJulianDay(lastUpdatedDate), feedId),
+                          "Error when attempting to update the last-updated field")
+        self.refreshFeed(feedId)
 
     def updateFeedLastPurgedField(self, feedId, lastPurgedDate):
         """ Updates the last-purged field for the given feed. """
-        queryObj = QtSql.QSqlQuery()
-
-        # Determine number of unread items
-        queryStr = "update feeds set lastpurged=? where feedid=?"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(dateToJulianDay(lastPurgedDate))
-        queryObj.addBindValue(feedId)
+        self.executeQuery("update feeds set lastpurged=? where feedid=?", (dateToJulianDay(lastPurgedDate), feedId),
+                          "Error when attempting to update the last-purged field")
+        self.refreshFeed(feedId)
+
+    def setFeedNextUpdate(self, feedId, nextUpdateDate):
+        """ Sets the date and time the given feed is next due to be updated. """
+        self.executeQuery("update feeds set nextupdate=? where feedid=?", (dateToJulianDay(nextUpdateDate), feedId),
+                          "Error when attempting to set the next update of a feed")
+        self.refreshFeed(feedId)
+
+    def setFeedUpdateIntervals(self, feedId, minUpdateInterval, maxUpdateInterval):
+        """ Sets the shortest and longest times between updates of the given feed, in minutes.  0 means the
+            application's default. """
+        self.executeQuery("update feeds set minupdateinterval=?, maxupdateinterval=? where feedid=?",
+                          (minUpdateInterval, maxUpdateInterval, feedId),
+                          "Error when attempting to set the update intervals of a feed")
+        self.refreshFeed(feedId)
+
+    def getDueFeedIds(self, now):
+        """ Returns the IDs of the feeds due to be updated at the given time. """
+        nowJulianDay = dateToJulianDay(now)
+        return [feedId for feedId, feed in self.feeds.items() if dateToJulianDay(feed.m_nextUpdate) <= nowJulianDay]
+
+    def getFeedPublicationTimes(self, feedId, maxItems):
+        """ Returns the publication times (as timestamps) of the given feed's most recent feed items. """
+        rows = self.fetchAll("select pubdatetime from items where feedid=? order by pubdatetime desc limit ?",
+                             (feedId, maxItems), "Error when attempting to retrieve the publication times of a feed")
+
+        return [row[0] for row in rows or []]
+
+    def setFeedValidators(self, feedId, etag, lastModified):
+        """ Sets the ETag and Last-Modified headers of the feed's last response.  These are sent with the next
+            fetch of the feed (as If-None-Match and If-Modified-Since). """
+        self.executeQuery("update feeds set etag=?, lastmodified=? where feedid=?", (etag, lastModified, feedId),
+                          "Error when attempting to set the HTTP validators of a feed")
+        self.refreshFeed(feedId)
+
+    def setFeedRetentionPolicy(self, feedId, retentionDays, retentionItems, keepUnreadItems, keepItemsOfInterest):
+        """ Sets the retention policy of the given feed.  A limit of 0 means no limit. """
+        self.executeQuery("update feeds set retaindays=?, retainitems=?, keepunread=?, keepinterest=? where feedid=?",
+                          (retentionDays, retentionItems, keepUnreadItems, keepItemsOfInterest, feedId),
+                          "Error when attempting to set the retention policy of a feed")
+        self.refreshFeed(feedId)
+
+    def applyRetentionPolicy(self, feedId):
+        """ Deletes the feed items of the given feed that are older, or in excess of, the limits of the feed's
+            retention policy.  Unread items and Items of Interest are kept if the policy says so, so a feed can hold
+            more items than its limit.  The policy is read from the feeds table rather than the feed cache, as this
+            is called by the database writer, whose feed cache is not kept up to date by the GUI thread's changes.
+            The publication time of the newest feed item deleted by the item limit is kept as the feed's retention
+            cut-off, so ingestFeedItems() does not add those feed items again while the feed still lists them.
+            Returns the number of feed items deleted. """
+        row = self.fetchOne("select retaindays, retainitems, keepunread, keepinterest from feeds where feedid=?",
+                            (feedId,), "Error when attempting to retrieve the retention policy of a feed")
+
+        if row is None:
+            return 0
 
-        queryObj.exec()
+        retentionDays, retentionItems, keepUnreadItems, keepItemsOfInterest = row
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to update the last-purged field: {}".format(sqlErr.text()))
+        if retentionDays == 0 and retentionItems == 0:
+            return 0
 
-    def getFeedItemUnreadCount(self, feedId):
-        """ Returns the number of unread feed items in the given feed. """
-        feedTableName = self.feedItemsTableName(feedId)
+        deletableStr = "feedid=?"
 
-        queryObj = QtSql.QSqlQuery()
+        if keepUnreadItems:
+            deletableStr += " and readflag=1"
 
-        # Determine number of unread items
-        queryStr = "select title from {} where readflag='0'".format(feedTableName)
-        queryObj.prepare(queryStr)
-        queryObj.exec()
+        if keepItemsOfInterest:
+            deletableStr += " and not exists (select 1 from itemsofinterest " \
+                            "where itemsofinterest.feedid=items.feedid and itemsofinterest.guid=items.guid)"
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve number of unread items in feed: {}".format(sqlErr.text()))
-            return 0
+        numDeleted = 0
 
-        numUnreadItems = 0
+        if retentionDays > 0:
+            targetDate = datetime.datetime.today() - datetime.timedelta(days=retentionDays)
+            queryObj = self.executeQuery("delete from items where {} and pubdatetime<?".format(deletableStr),
+                                         (feedId, dateToJulianDay(targetDate)),
+                                         "Error when attempting to delete feed items by age")
+            numDeleted += queryObj.numRowsAffected() if queryObj is not None else 0
 
-        while queryObj.next():
-            numUnreadItems += 1
+        if retentionItems > 0:
+            numExcessItems = self.getFeedItemCount(feedId) - retentionItems
 
-        return numUnreadItems
+            if numExcessItems > 0:
+                queryStr = "select max(pubdatetime) from " \
+                           "(select pubdatetime from items where {} order by pubdatetime limit ?)".format(deletableStr)
+                row = self.fetchOne(queryStr, (feedId, numExcessItems),
+                                    "Error when attempting to retrieve the retention cut-off of a feed")
 
-    def getUnreadCountForItemsOfInterest(self):
-        """ Returns the number of unread feed items in the Items of Interest feed. """
-        ioiList = self.getItemsOfInterest()
-        unreadCount = 0
+                queryStr = "delete from items where itemid in " \
+                           "(select itemid from items where {} order by pubdatetime limit ?)".format(deletableStr)
+                queryObj = self.executeQuery(queryStr, (feedId, numExcessItems),
+                                             "Error when attempting to delete the oldest feed items")
+                numDeleted += queryObj.numRowsAffected() if queryObj is not None else 0
 
-        if ioiList is not None:
-            for ioiTuple in ioiList:
-                if not self.isFeedItemRead(ioiTuple[0], ioiTuple[1]):
-                    unreadCount += 1
+                if row is not None and row[0] is not None:
+                    self.executeQuery("update feeds set retaincutoff=max(retaincutoff, ?) where feedid=?", (row[0], feedId),
+                                      "Error when attempting to set the retention cut-off of a feed")
 
-        return unreadCount
+        if numDeleted > 0 and not keepItemsOfInterest:
+            self.removeDeletedItemsOfInterest()
 
+        return numDeleted
 
-    def setFeedReadFlagAllItems(self, feedId, readFlag):
-        """ Sets the read flag of all feed items in the given feed to the given value:
-            readFlag:  True: read, False: unread. """
-        feedTableName = self.feedItemsTableName(feedId)
+    def getFeedItemCount(self, feedId):
+        """ Returns the number of feed items in the given feed. """
+        row = self.fetchOne("select totalcount from feedstats where feedid=?", (feedId,),
+                            "Error when attempting to retrieve number of items in feed")
 
-        queryObj = QtSql.QSqlQuery()
+        return row[0] if row is not None else 0
 
-        queryStr = "update {} set readflag=?".format(feedTableName)
+    def getFeedItemUnreadCount(self, feedId):
+        """ Returns the number of unread feed items in the given feed. """
+        # The feedstats table is kept up to date by triggers on the items table
+        row = self.fetchOne("select unreadcount from feedstats where feedid=?", (feedId,),
+                            "Error when attempting to retrieve number of unread items in feed")
 
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(1 if readFlag else 0)
-        queryObj.exec()
+        return row[0] if row is not None else 0
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to set the read flag for all feed items in feed {}: {}".format(feedId, sqlErr.text()))
+    def getAllUnreadCounts(self):
+        """ Returns the number of unread feed items of every feed, as a dictionary mapping feed ID to unread count.
+            Feeds that have never had any feed items do not appear in the dictionary. """
+        rows = self.fetchAll("select feedid, unreadcount from feedstats",
+                             errorMessage="Error when attempting to retrieve the unread counts of all feeds")
 
+        if rows is None:
+            return {}
 
-    def getFeedItemGuids(self, feedId):
-        """ Returns the GUIDs for all feed items for the given feed.
-            This is used when adding new feed items, to ensure that they do not already exist. """
-        guidList = []
-        feedTableName = self.feedItemsTableName(feedId)
+        return dict(rows)
 
-        queryObj = QtSql.QSqlQuery()
+    def getUnreadCountForItemsOfInterest(self):
+        """ Returns the number of unread feed items in the Items of Interest feed. """
+        queryStr = "select count(*) from itemsofinterest join items "
+        queryStr += "on items.feedid=itemsofinterest.feedid and items.guid=itemsofinterest.guid "
+        queryStr += "where items.readflag=0"
 
-        queryStr = "select "
-        queryStr += "guid"
-        queryStr += " from {}".format(feedTableName)
+        row = self.fetchOne(queryStr, errorMessage="Error when attempting to retrieve number of unread Items of Interest")
 
-        queryObj.prepare(queryStr)
+        return row[0] if row is not None else 0
 
-        queryObj.exec()
+    def setFeedReadFlagAllItems(self, feedId, readFlag):
+        """ Sets the read flag of all feed items in the given feed to the given value:
+            readFlag:  True: read, False: unread. """
+        self.executeQuery("update items set readflag=? where feedid=?", (1 if readFlag else 0, feedId),
+                          "Error when attempting to set the read flag for all feed items in feed {}".format(feedId))
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all guids: {}".format(sqlErr.text()))
-            # TODO: Maybe an exception should be thrown here
-            return []
+    def feedItemFromRow(self, row, feedId):
+        """ Creates a feed item from a row of the items table, containing the kFeedItemColumns columns. """
+        feedItem = FeedItem()
 
-        while queryObj.next():
-            guid = queryObj.record().value(0)
-            guidList.append(guid)
+        feedItem.m_title = row[0]
+        feedItem.m_author = row[1]
+        feedItem.m_link = row[2]
+        feedItem.m_description, feedItem.m_encodedContent = decodeBody(row[3], row[15], row[16])
 
-        return guidList
+        categoriesStr = row[4]
+        feedItem.m_categories = list(filter(None, categoriesStr.split(",")))    # Filter out empty strings
 
-    def getFeedItems(self, feedId):
-        """ Returns a list of feed items for the given feed ID. """
-        feedItemList = []
-        feedTableName = self.feedItemsTableName(feedId)
+        feedItem.m_publicationDatetime = julianDayToDate(row[5])     # Convert to datetime
+        feedItem.m_thumbnailLink = row[6]
+        thumbnailWidth = row[7]
+        thumbnailHeight = row[8]
+        feedItem.m_thumbnailSize = QtCore.QSize(thumbnailWidth, thumbnailHeight)
 
-        queryObj = QtSql.QSqlQuery()
+        feedItem.m_guid = row[9]
+        feedItem.m_feedburnerOrigLink = row[10]
+        feedItem.m_bRead = True if row[11] == 1 else False
 
-        queryStr = "select "
-        queryStr += "title, author, link, description, categories, pubdatetime, "
-        queryStr += "thumbnaillink, thumbnailwidth, thumbnailheight, "
-        queryStr += "guid, feedburneroriglink, readflag, "
-        queryStr += "enclosurelink, enclosurelength, enclosuretype, contentencoded "
-        queryStr += "from {}".format(feedTableName)
+        feedItem.m_enclosureLink = row[12]
+        feedItem.m_enclosureLength = row[13]
+        feedItem.m_enclosureType = row[14]
 
-        queryObj.prepare(queryStr)
+        feedItem.m_parentFeedId = feedId
+        return feedItem
 
-        queryObj.exec()
+    def getFeedItems(self, feedId):
+        """ Returns a list of feed items for the given feed ID. """
+        rows = self.fetchAll("select {} from items where feedid=?".format(kFeedItemColumns), (feedId,),
+                             "Error when attempting to retrieve all feed items")
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all feed items: {}".format(sqlErr.text()))
+        if rows is None:
             # TODO: Maybe an exception should be thrown here
             return []
 
-        while queryObj.next():
-            feedItem = FeedItem()
-
-            feedItem.m_title = queryObj.record().value(0)
-            feedItem.m_author = queryObj.record().value(1)
-            feedItem.m_link = queryObj.record().value(2)
-            feedItem.m_description = queryObj.record().value(3)
+        return [self.feedItemFromRow(row, feedId) for row in rows]
 
-            categoriesStr = queryObj.record().value(4)
-            feedItem.m_categories = list(filter(None, categoriesStr.split(",")))    # Filter out empty strings
+    def feedItemHeaderFromRow(self, row):
+        """ Creates a feed item header from a row containing the kFeedItemHeaderColumns columns. """
+        feedItemHeader = FeedItemHeader()
 
-            feedItem.m_publicationDatetime = julianDayToDate(queryObj.record().value(5))     # Convert to datetime
-            feedItem.m_thumbnailLink = queryObj.record().value(6)
-            thumbnailWidth = queryObj.record().value(7)
-            thumbnailHeight = queryObj.record().value(8)
-            feedItem.m_thumbnailSize = QtCore.QSize(thumbnailWidth, thumbnailHeight)
+        feedItemHeader.m_parentFeedId = row[0]
+        feedItemHeader.m_title = row[1]
+        feedItemHeader.m_author = row[2]
+        feedItemHeader.m_categories = list(filter(None, row[3].split(",")))    # Filter out empty strings
+        feedItemHeader.m_publicationDatetime = julianDayToDate(row[4])     # Convert to datetime
+        feedItemHeader.m_guid = row[5]
+        feedItemHeader.m_bRead = True if row[6] == 1 else False
+        feedItemHeader.m_enclosureLink = row[7]
+        return feedItemHeader
 
-            feedItem.m_guid = queryObj.record().value(9)
-            feedItem.m_feedburnerOrigLink = queryObj.record().value(10)
-            feedItem.m_bRead = True if queryObj.record().value(11) == 1 else False
+    def getFeedItemHeaders(self, feedId, includeArchive=False):
+        """ Returns a list of feed item headers for the given feed ID.  Feed item headers contain only the fields
+            shown in the title tree; use getFeedItem() to read the full feed item.  Archived feed items are only
+            included if includeArchive is True. """
+        queryStr = "select {} from items where feedid=?".format(kFeedItemHeaderColumns)
+        params = (feedId,)
 
-            feedItem.m_enclosureLink = queryObj.record().value(12)
-            feedItem.m_enclosureLength = queryObj.record().value(13)
-            feedItem.m_enclosureType = queryObj.record().value(14)
-            feedItem.m_encodedContent = queryObj.record().value(15)
+        if includeArchive and self.archiveAttached:
+            queryStr += " union all select {} from {}.items where feedid=?".format(kFeedItemHeaderColumns, kArchiveSchema)
+            params = (feedId, feedId)
 
-            feedItem.m_parentFeedId = feedId
+        rows = self.fetchAll(queryStr, params, "Error when attempting to retrieve all feed item headers")
 
-            feedItemList.append(feedItem)
-
-        return feedItemList
+        if rows is None:
+            return []
 
+        return [self.feedItemHeaderFromRow(row) for row in rows]
 
     def getFeedItemsFromList(self, feedItemList):
         """ Returns a list of feed items, corresponding to the given feed item guids in feedItemList. """
         contentList = []
-        self.beginTransaction()
+        self.beginTransaction(readOnly=True)
 
         for feedItem in feedItemList:
             feedId = feedItem[0]
@@ -858,363 +1460,489 @@ class Database:
         self.endTransaction()
         return contentList
 
+    def ingestFeedItems(self, feedItemList, feedId):
+        """ Adds a batch of feed items to the given feed, in a single transaction.  Feed items whose GUIDs already
+            exist in the feed (or appear earlier in the batch) are skipped, as are those published no later than the
+            feed's retention cut-off (see applyRetentionPolicy()).  Returns the list of feed items that were
+            actually added, or None if an error occurred (in which case none of them were added). """
+        row = self.fetchOne("select retaincutoff from feeds where feedid=?", (feedId,),
+                            "Error when attempting to retrieve the retention cut-off of a feed")
+        retentionCutoff = row[0] if row is not None and row[0] is not None else 0
+        newFeedItems = {}
+
+        for feedItem in feedItemList:
+            if retentionCutoff == 0 or dateToJulianDay(feedItem.m_publicationDatetime) > retentionCutoff:
+                newFeedItems.setdefault(feedItem.m_guid, feedItem)
+
+        if len(newFeedItems) == 0:
+            return []
 
-    def addFeedItems(self, feedItemList, feedId):
-        """ Adds multiple feed items, using a transaction.  Does not check for duplicates. """
         self.beginTransaction()
 
-        for feedItem in feedItemList:
-            self.addFeedItem(feedItem, feedId)
+        for guid in self.getExistingGuids(feedId, list(newFeedItems.keys())):
+            del newFeedItems[guid]
 
-        self.endTransaction()
+        newFeedItemList = list(newFeedItems.values())
 
+        if len(newFeedItemList) > 0 and not self.insertFeedItems(newFeedItemList, feedId):
+            self.rollbackTransaction()
+            return None
 
-    def addFeedItem(self, feedItem, feedId):
-        """ Adds the given feed item to the given feed. """
-        queryObj = QtSql.QSqlQuery()
-
-        feedTableName = self.feedItemsTableName(feedId)
-
-        queryStr = "insert into {} ".format(feedTableName)
-        queryStr += "(title, author, link, description, categories, pubdatetime, thumbnaillink, thumbnailwidth, "
-        queryStr += "thumbnailheight, guid, feedburneroriglink, readflag, "
-        queryStr += "enclosurelink, enclosurelength, enclosuretype, contentencoded)"
-        queryStr += "values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
-
-        queryObj.prepare(queryStr)
-
-        queryObj.addBindValue(feedItem.m_title)
-        queryObj.addBindValue(feedItem.m_author)
-        queryObj.addBindValue(feedItem.m_link)
-        queryObj.addBindValue(feedItem.m_description)
-        queryObj.addBindValue(",".join(feedItem.m_categories))
-        queryObj.addBindValue(dateToJulianDay(feedItem.m_publicationDatetime))
-        queryObj.addBindValue(feedItem.m_thumbnailLink)
-        queryObj.addBindValue(feedItem.m_thumbnailSize.width())
-        queryObj.addBindValue(feedItem.m_thumbnailSize.height())
-        queryObj.addBindValue(feedItem.m_guid)
-        queryObj.addBindValue(feedItem.m_feedburnerOrigLink)
-        queryObj.addBindValue(1 if feedItem.isRead() else 0)
-        queryObj.addBindValue(feedItem.m_enclosureLink)
-        queryObj.addBindValue(feedItem.m_enclosureLength)
-        queryObj.addBindValue(feedItem.m_enclosureType)
-        queryObj.addBindValue(feedItem.m_encodedContent)
+        self.endTransaction()
+        return newFeedItemList
 
-        queryObj.exec()
+    def getExistingGuids(self, feedId, guidList):
+        """ Returns the GUIDs in guidList that already exist in the given feed, in the main database or in the
+            archive (so an archived feed item that is still in the feed is not added again). """
+        existingGuids = []
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
+        # Look the GUIDs up kIngestChunkSize at a time.  The last chunk is padded with nulls (which never match), so
+        # that every lookup uses the same cached statement.
+        placeholderStr = ", ".join(["?"] * kIngestChunkSize)
+        queryStr = "select guid from items where feedid=? and guid in ({})".format(placeholderStr)
 
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error adding a feed item: {}".format(sqlErr.text()))
-            # TODO: Maybe an exception should be thrown here
+        if self.archiveAttached:
+            queryStr += " union select guid from {}.items where feedid=? and guid in ({})".format(kArchiveSchema, placeholderStr)
 
+        for chunkStart in range(0, len(guidList), kIngestChunkSize):
+            chunk = guidList[chunkStart:chunkStart + kIngestChunkSize]
+            chunk += [None] * (kIngestChunkSize - len(chunk))
 
-    def getFeedItem(self, guid, feedId):
-        """ Retrieves a single feed item."""
-        feedItem = FeedItem()
+            params = [feedId] + chunk
 
-        feedTableName = self.feedItemsTableName(feedId)
+            if self.archiveAttached:
+                params += params
 
-        if not self.tableExists(feedTableName):
-            return None
+            rows = self.fetchAll(queryStr, params, "Error when attempting to look up existing feed items")
 
-        queryObj = QtSql.QSqlQuery()
+            if rows is not None:
+                existingGuids.extend(row[0] for row in rows)
 
-        queryStr = "select "
-        queryStr += "title, author, link, description, categories, pubdatetime, "
-        queryStr += "thumbnaillink, thumbnailwidth, thumbnailheight, "
-        queryStr += "guid, feedburneroriglink, readflag, "
-        queryStr += "enclosurelink, enclosurelength, enclosuretype, contentencoded "
-        queryStr += "from {} where guid=?".format(feedTableName)
+        return existingGuids
 
-        queryObj.prepare(queryStr)
+    def insertFeedItems(self, feedItemList, feedId):
+        """ Inserts the given feed items.  Feed items that already exist are ignored.  Returns True if successful.
+            Note: the QSQLITE driver only emulates QSqlQuery.execBatch(), at a cost that grows with the square of
+            the batch size, so the cached insert statement is simply executed once per feed item. """
+        for feedItem in feedItemList:
+            if self.insertFeedItem(feedItem, feedId) is None:
+                return False
+
+        return True
+
+    def insertFeedItem(self, feedItem, feedId, schemaName="main", bodyCodec=None):
+        """ Inserts a feed item into the items table of the given database, storing its description and content with
+            the given body codec (by default, the codec of the current profile).  A feed item that already exists is
+            ignored.  Returns the query object, or None if an error occurred. """
+        queryStr = "insert or ignore into {}.items (feedid, {}) ".format(schemaName, kFeedItemColumns)
+        queryStr += "values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+        storedDescription, storedContent, bodyCodec = encodeBody(feedItem.m_description, feedItem.m_encodedContent,
+                                                                 bodyCodec if bodyCodec is not None else self.bodyCodec)
+
+        params = (feedId,
+                  feedItem.m_title,
+                  feedItem.m_author,
+                  feedItem.m_link,
+                  bodyBindValue(storedDescription),
+                  ",".join(feedItem.m_categories),
+                  dateToJulianDay(feedItem.m_publicationDatetime),
+                  feedItem.m_thumbnailLink,
+                  feedItem.m_thumbnailSize.width(),
+                  feedItem.m_thumbnailSize.height(),
+                  feedItem.m_guid,
+                  feedItem.m_feedburnerOrigLink,
+                  1 if feedItem.isRead() else 0,
+                  feedItem.m_enclosureLink,
+                  feedItem.m_enclosureLength,
+                  feedItem.m_enclosureType,
+                  bodyBindValue(storedContent),
+                  bodyCodec)
+
+        return self.executeQuery(queryStr, params, "Error adding a feed item")
+
+    def isRecompressionComplete(self):
+        """ Returns True if all feed items are stored with the current body codec: a recompression with that codec
+            has completed, and new feed items are stored with it.  Finding the feed items to recompress means reading
+            every feed item, so this lets a recompression be skipped when there is nothing to do. """
+        return self.getGlobalValue(kRecompressedCodecGlobalKey) == self.bodyCodec
+
+    def setRecompressionComplete(self, complete):
+        """ Records whether a recompression with the current body codec has completed.  This is cleared when a
+            recompression starts, so an interrupted one is resumed. """
+        self.setGlobalValue(kRecompressedCodecGlobalKey, self.bodyCodec if complete else -1)
+
+    def recompressFeedItems(self, afterItemId, maxItems=kRecompressBatchSize):
+        """ Rewrites up to maxItems feed items, with item IDs greater than afterItemId, whose descriptions and contents
+            are not stored with the current body codec.  Returns a tuple of the form:
+            (lastItemId, storedBytesBefore, storedBytesAfter), where lastItemId is None if no feed items remain. """
+        queryStr = "select itemid from items where (bodycodec & ?) != ? and itemid>? order by itemid limit ?"
+        rows = self.fetchAll(queryStr, (kBodyCodecMask, self.bodyCodec, afterItemId, maxItems),
+                             "Error when attempting to find feed items to recompress")
+
+        if not rows:
+            return None, 0, 0
+
+        bytesBefore = 0
+        bytesAfter = 0
+        self.beginTransaction()
 
-        queryObj.addBindValue(guid)
+        for itemIdRow in rows:
+            itemId = itemIdRow[0]
+            row = self.fetchOne("select description, contentencoded, bodycodec from items where itemid=?", (itemId,),
+                                "Error when attempting to read a feed item to recompress")
 
-        queryObj.exec()
+            if row is None:
+                continue
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve a single feed item: {}".format(sqlErr.text()))
-            # TODO: Maybe an exception should be thrown here
-            return feedItem
+            description, encodedContent = decodeBody(row[0], row[1], row[2])
+            storedDescription, storedContent, bodyCodec = encodeBody(description, encodedContent, self.bodyCodec)
 
-        while queryObj.next():
-            feedItem.m_title = queryObj.record().value(0)
-            feedItem.m_author = queryObj.record().value(1)
-            feedItem.m_link = queryObj.record().value(2)
-            feedItem.m_description = queryObj.record().value(3)
+            bytesBefore += storedBodySize(row[0]) + storedBodySize(row[1])
+            bytesAfter += storedBodySize(storedDescription) + storedBodySize(storedContent)
 
-            categoriesStr = queryObj.record().value(4)
-            feedItem.m_categories = list(filter(None, categoriesStr.split(",")))    # Filter out empty strings
+            self.executeQuery("update items set description=?, contentencoded=?, bodycodec=? where itemid=?",
+                              (bodyBindValue(storedDescription), bodyBindValue(storedContent), bodyCodec, itemId),
+                              "Error when attempting to recompress a feed item")
 
-            feedItem.m_publicationDatetime = julianDayToDate(queryObj.record().value(5))     # Convert to datetime
-            feedItem.m_thumbnailLink = queryObj.record().value(6)
-            thumbnailWidth = queryObj.record().value(7)
-            thumbnailHeight = queryObj.record().value(8)
-            feedItem.m_thumbnailSize = QtCore.QSize(thumbnailWidth, thumbnailHeight)
+        self.endTransaction()
+        return rows[-1][0], bytesBefore, bytesAfter
 
-            feedItem.m_guid = queryObj.record().value(9)
-            feedItem.m_feedburnerOrigLink = queryObj.record().value(10)
-            feedItem.m_bRead = True if queryObj.record().value(11) == 1 else False
+    def indexPendingItems(self, maxItems=kSearchIndexBatchSize):
+        """ Adds up to maxItems of the feed items waiting in the searchpending table to the full-text search index,
+            in a single transaction.  Returns the number of feed items indexed; 0 means the index is up to date. """
+        queryStr = "select items.itemid, title, author, categories, description, contentencoded, bodycodec "
+        queryStr += "from searchpending join items on items.itemid=searchpending.itemid limit ?"
 
-            feedItem.m_enclosureLink = queryObj.record().value(12)
-            feedItem.m_enclosureLength = queryObj.record().value(13)
-            feedItem.m_enclosureType = queryObj.record().value(14)
-            feedItem.m_encodedContent = queryObj.record().value(15)
+        rows = self.fetchAll(queryStr, (maxItems,), "Error when attempting to read feed items to index")
 
-            feedItem.m_parentFeedId = feedId
+        if not rows:
+            return 0
 
-        return feedItem
+        self.beginTransaction()
 
-    def deleteFeedItem(self, feedId, guid):
-        """ Deletes the given feed item. """
-        feedTableName = self.feedItemsTableName(feedId)
+        for row in rows:
+            description, encodedContent = decodeBody(row[4], row[5], row[6])
 
-        queryObj = QtSql.QSqlQuery()
+            if not self.addToSearchIndex(row[0], row[1], row[2], row[3], description, encodedContent):
+                self.rollbackTransaction()
+                return 0
 
-        queryStr = "delete from {} where guid=?".format(feedTableName)
+            self.executeQuery("delete from searchpending where itemid=?", (row[0],),
+                              "Error when attempting to remove a feed item from the search index queue")
 
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(guid)
+        self.endTransaction()
+        return len(rows)
+
+    def isSearchIndexPending(self):
+        """ Returns True if feed items are waiting to be added to the full-text search index. """
+        row = self.fetchOne("select exists (select 1 from searchpending)",
+                            errorMessage="Error when attempting to check the search index queue")
+        return row is not None and bool(row[0])
+
+    def addToSearchIndex(self, itemId, title, author, categories, description, encodedContent, schemaName="main"):
+        """ Adds a feed item to the full-text search index of the given database.  Returns True if successful. """
+        body = htmlToPlainText(description)
+
+        if encodedContent and encodedContent != description:
+            body += " " + htmlToPlainText(encodedContent)
+
+        return self.executeQuery("insert into {}.itemsearch (rowid, title, author, categories, body) values (?, ?, ?, ?, ?)".format(schemaName),
+                                 (itemId, title, author, categories, body),
+                                 "Error when attempting to add a feed item to the search index") is not None
+
+    def searchItems(self, query, limit=kSearchPageSize, offset=0):
+        """ Searches the title, author, categories and text of all feed items, including the archived ones.  Each
+            word (or double-quoted phrase) in query must be present; a trailing * matches any word with that prefix.
+            Returns a list of feed item headers, best matches first, skipping the first offset matches and returning
+            at most limit.  The index is searched as it is: feed items still waiting to be indexed by the database
+            writer are not found (see isSearchIndexPending()). """
+        matchExpression = self.searchMatchExpression(query)
+
+        if not matchExpression:
+            return []
 
-        queryObj.exec()
+        schemaNames = ["main", kArchiveSchema] if self.archiveAttached else ["main"]
+        selectList = []
+        params = []
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete a feed item: {}".format(sqlErr.text()))
+        for schemaName in schemaNames:
+            selectStr = "select {}, matches.rank from {}.items ".format(kFeedItemHeaderColumns, schemaName)
+            selectStr += "join (select rowid, rank from {}.itemsearch where itemsearch match ? order by rank limit ?) as matches ".format(schemaName)
+            selectStr += "on items.itemid=matches.rowid"
+            selectList.append(selectStr)
+            params += [matchExpression, limit + offset]
 
-    def deleteFeedItemsByDate(self, feedId, targetDate, deleteUnreadItems):
-        """ Deletes feed items in the given feed.
-            :param feedId Feed ID in which to delete the items
-            :param targetDate Items on this date and later will be deleted
-            :param deleteUnreadItems If true, unread items in the target range will be included
-        """
-        feedTableName = self.feedItemsTableName(feedId)
+        queryStr = " union all ".join(selectList) + " order by rank limit ? offset ?"
 
-        queryObj = QtSql.QSqlQuery()
+        rows = self.fetchAll(queryStr, params + [limit, offset], "Error when attempting to search feed items")
 
-        if deleteUnreadItems:
-            queryStr = "delete from {} where pubdatetime<=?".format(feedTableName)
-        else:
-            queryStr = "delete from {} where pubdatetime<=? and readflag=1".format(feedTableName)
-        queryObj.prepare(queryStr)
+        if rows is None:
+            return []
 
-        queryObj.addBindValue(dateToJulianDay(targetDate))
+        return [self.feedItemHeaderFromRow(row) for row in rows]
 
-        queryObj.exec()
+    def searchMatchExpression(self, query):
+        """ Converts a user-entered search query into an FTS5 match expression, quoting each term so that
+            characters with special meaning to FTS5 are searched for literally. """
+        terms = []
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete feed items by date: {}".format(sqlErr.text()))
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            term = phrase or word
+            prefix = word.endswith("*")
+            term = term.rstrip("*")
 
-    def setFeedItemReadFlag(self, feedId, guid, readFlag):
-        """ Sets the read flag of the given feed item."""
-        feedTableName = self.feedItemsTableName(feedId)
+            if term:
+                terms.append('"{}"{}'.format(term.replace('"', '""'), "*" if prefix else ""))
 
-        queryObj = QtSql.QSqlQuery()
+        return " ".join(terms)
 
-        queryStr = "update {} set readflag=? where guid=?".format(feedTableName)
+    def getFeedItem(self, guid, feedId):
+        """ Retrieves a single feed item, from the archive if it has been archived.  Returns None if the feed item
+            does not exist. """
+        row = self.fetchOne("select {} from items where feedid=? and guid=?".format(kFeedItemColumns), (feedId, guid),
+                            "Error when attempting to retrieve a single feed item")
 
-        queryObj.prepare(queryStr)
+        if row is None and self.archiveAttached:
+            row = self.fetchOne("select {} from {}.items where feedid=? and guid=?".format(kFeedItemColumns, kArchiveSchema),
+                                (feedId, guid), "Error when attempting to retrieve a single archived feed item")
 
-        queryObj.addBindValue(1 if readFlag else 0)
-        queryObj.addBindValue(guid)
+        if row is None:
+            return None
 
-        queryObj.exec()
+        return self.feedItemFromRow(row, feedId)
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to set feed item's read flag: {}".format(sqlErr.text()))
+    def deleteFeedItem(self, feedId, guid):
+        """ Deletes the given feed item. """
+        self.executeQuery("delete from items where feedid=? and guid=?", (feedId, guid),
+                          "Error when attempting to delete a feed item")
+
+        if self.archiveAttached:
+            self.executeQuery("delete from {}.items where feedid=? and guid=?".format(kArchiveSchema), (feedId, guid),
+                              "Error when attempting to delete an archived feed item")
+
+    def archiveFeedItems(self, feedId, targetDate, maxItems=kArchiveBatchSize):
+        """ Copies up to maxItems read feed items of the given feed, published before targetDate, from the items table
+            to the archive database, in a single transaction.  Archived feed items are stored compressed, and added
+            to the archive's search index.  Items of Interest are not archived.  Returns the number of feed items
+            copied; fewer than maxItems means the feed has no more feed items to archive.
+            The copies are only deleted from the items table by deleteArchivedFeedItems(), which must be called in a
+            later transaction.  With a write-ahead log, SQLite does not commit a transaction on an attached database
+            atomically: the main database is committed first, so a crash could otherwise lose the feed items that
+            were deleted from it, but not yet committed to the archive.  A crash between the two transactions only
+            leaves copies in both databases (and the archive-move-pending flag set), which the database writer
+            deletes from the items table when it is next started. """
+        if not self.archiveAttached:
+            return 0
 
-    def isFeedItemRead(self, feedId, guid):
-        """ Returns True if the given feed item is read, False otherwise.
-            False is returned if the feed item doesn't exist. """
-        feedTableName = self.feedItemsTableName(feedId)
+        queryStr = "select itemid, {} from items where feedid=? and pubdatetime<? and readflag=1 ".format(kFeedItemColumns)
+        queryStr += "and not exists (select 1 from itemsofinterest "
+        queryStr += "where itemsofinterest.feedid=items.feedid and itemsofinterest.guid=items.guid) "
+        queryStr += "and not exists (select 1 from {0}.items where {0}.items.feedid=items.feedid ".format(kArchiveSchema)
+        queryStr += "and {}.items.guid=items.guid) limit ?".format(kArchiveSchema)
 
-        if not self.tableExists(feedTableName):
-            return False
+        self.beginTransaction()
 
-        queryObj = QtSql.QSqlQuery()
-        queryStr = "select readflag from {} where guid=?".format(feedTableName)
-        queryObj.prepare(queryStr)
+        rows = self.fetchAll(queryStr, (feedId, dateToJulianDay(targetDate), maxItems),
+                             "Error when attempting to read feed items to archive")
 
-        queryObj.addBindValue(guid)
+        if rows and not self.isArchiveMovePending():
+            self.setArchiveMovePending(True)
 
-        queryObj.exec()
+        for row in rows or []:
+            feedItem = self.feedItemFromRow(row[1:], feedId)
+            queryObj = self.insertFeedItem(feedItem, feedId, kArchiveSchema, kBodyCodecZlib)
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to get feed item's read flag: {}, on feed {}".format(sqlErr.text(), feedId))
-            return False
+            if queryObj is None:
+                self.rollbackTransaction()
+                return 0
 
-        bReturn = False
-        if queryObj.next():
-            readFlag = queryObj.record().value(0)
-            bReturn = True if readFlag == 1 else False
+            if queryObj.numRowsAffected() > 0 and \
+                    not self.addToSearchIndex(queryObj.lastInsertId(), feedItem.m_title, feedItem.m_author, row[5],
+                                              feedItem.m_description, feedItem.m_encodedContent, kArchiveSchema):
+                self.rollbackTransaction()
+                return 0
 
-        return bReturn
+        self.endTransaction()
+        return len(rows or [])
+
+    def deleteArchivedFeedItems(self, feedId):
+        """ Completes the archiving of the given feed's feed items: deletes the feed items that archiveFeedItems()
+            copied to the archive (in an earlier transaction) from the items table.  This also resolves an
+            interrupted restoreArchivedFeedItem(), whose feed item (an Item of Interest) is deleted from the archive
+            instead.  Returns the number of feed items deleted from the items table. """
+        if not self.archiveAttached:
+            return 0
 
-    def feedItemExists(self, feedId, guid):
-        """ Returns True if the given feed item exists, False otherwise. """
-        feedTableName = self.feedItemsTableName(feedId)
+        interestStr = "exists (select 1 from itemsofinterest where itemsofinterest.feedid=? and itemsofinterest.guid={}.items.guid)"
 
-        queryObj = QtSql.QSqlQuery()
-        queryStr = "select title from {} where guid=?".format(feedTableName)
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(guid)
+        queryStr = "delete from main.items where feedid=? and not {} ".format(interestStr.format("main"))
+        queryStr += "and exists (select 1 from {0}.items where {0}.items.feedid=? and {0}.items.guid=main.items.guid)".format(kArchiveSchema)
+        queryObj = self.executeQuery(queryStr, (feedId, feedId, feedId), "Error when attempting to delete archived feed items")
+        numDeleted = queryObj.numRowsAffected() if queryObj is not None else 0
 
-        queryObj.exec()
+        queryStr = "delete from {0}.items where feedid=? and {1} ".format(kArchiveSchema, interestStr.format(kArchiveSchema))
+        queryStr += "and exists (select 1 from main.items where main.items.feedid=? and main.items.guid={}.items.guid)".format(kArchiveSchema)
+        self.executeQuery(queryStr, (feedId, feedId, feedId), "Error when attempting to delete restored feed items from the archive")
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to determine if a feed item exists: {}".format(sqlErr.text()))
-            return False
+        return numDeleted
 
-        return queryObj.next()
+    def isArchiveMovePending(self):
+        """ Returns True if feed items copied to the archive may still have to be deleted from the items table. """
+        return self.getGlobalValue(kArchiveMovePendingGlobalKey) == 1
 
-    def tableExists(self, tableName):
-        queryObj = QtSql.QSqlQuery()
-        queryStr = f"select name from sqlite_master where type='table' and name='{tableName}'"
-        queryObj.prepare(queryStr)
+    def setArchiveMovePending(self, pending):
+        self.setGlobalValue(kArchiveMovePendingGlobalKey, 1 if pending else 0)
 
-        queryObj.exec()
+    def restoreArchivedFeedItem(self, feedId, guid):
+        """ Moves a feed item from the archive database back to the items table.  Returns True if the feed item was
+            restored.  (After a crash, the feed item may be left in both databases; see deleteArchivedFeedItems().) """
+        row = self.fetchOne("select {} from {}.items where feedid=? and guid=?".format(kFeedItemColumns, kArchiveSchema),
+                            (feedId, guid), "Error when attempting to retrieve an archived feed item")
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to determine if a table exists: {}".format(sqlErr.text()))
+        if row is None:
             return False
 
-        hasFirstItem = queryObj.next()
-        # logging.info(f'Tablename: {tableName} -> hasFirstItem: {hasFirstItem}')
+        self.beginTransaction()
 
-        return hasFirstItem
+        if not self.insertFeedItems([self.feedItemFromRow(row, feedId)], feedId):
+            self.rollbackTransaction()
+            return False
 
-    def getItemsOfInterest(self):
-        """ Retrieves all the items of interest, as a list of tuples of the form: (feedId, guid). """
-        queryObj = QtSql.QSqlQuery()
+        self.executeQuery("delete from {}.items where feedid=? and guid=?".format(kArchiveSchema), (feedId, guid),
+                          "Error when attempting to delete a restored feed item from the archive")
 
-        queryStr = "select feedid, guid from itemsofinterest"
+        self.endTransaction()
+        return True
 
-        queryObj.prepare(queryStr)
+    def deleteFeedItemsByDate(self, feedId, targetDate, deleteUnreadItems, maxItems=-1):
+        """ Deletes feed items in the given feed, from the main database and then from the archive.
+            :param feedId Feed ID in which to delete the items
+            :param targetDate Items on this date and later will be deleted
+            :param deleteUnreadItems If true, unread items in the target range will be included
+            :param maxItems Maximum number of items to delete (-1 for no limit)
+            Returns the number of feed items deleted.
+        """
+        numDeleted = 0
+        schemaNames = ["main", kArchiveSchema] if self.archiveAttached else ["main"]
 
-        queryObj.exec()
+        for schemaName in schemaNames:
+            queryStr = "delete from {0}.items where itemid in (select itemid from {0}.items where feedid=? and pubdatetime<=?".format(schemaName)
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when retrieving items of interest: {}".format(sqlErr.text()))
-            return
+            if not deleteUnreadItems:
+                queryStr += " and readflag=1"
 
-        itemsOfInterestList = []
+            queryStr += " limit ?)"
 
-        while queryObj.next():
-            feedId = queryObj.record().value(0)
-            guid = queryObj.record().value(1)
-            itemsOfInterestList.append( (feedId, guid) )
+            queryObj = self.executeQuery(queryStr, (feedId, dateToJulianDay(targetDate), maxItems - numDeleted if maxItems >= 0 else -1),
+                                         "Error when attempting to delete feed items by date")
+            numDeleted += queryObj.numRowsAffected() if queryObj is not None else 0
 
-        return itemsOfInterestList
+            if numDeleted == maxItems:
+                break
 
-    def addItemOfInterest(self, feedId, guid):
-        """ Adds a feed item to the Items of Interest feed. """
-        queryObj = QtSql.QSqlQuery()
+        return numDeleted
 
-        queryStr = "insert into itemsofinterest (feedid, guid) values (?, ?)"
+    def setFeedItemReadFlag(self, feedId, guid, readFlag):
+        """ Sets the read flag of the given feed item."""
+        queryObj = self.executeQuery("update items set readflag=? where feedid=? and guid=?", (1 if readFlag else 0, feedId, guid),
+                                     "Error when attempting to set feed item's read flag")
 
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(feedId)
-        queryObj.addBindValue(guid)
+        if queryObj is not None and queryObj.numRowsAffected() == 0 and self.archiveAttached:
+            self.executeQuery("update {}.items set readflag=? where feedid=? and guid=?".format(kArchiveSchema),
+                              (1 if readFlag else 0, feedId, guid), "Error when attempting to set archived feed item's read flag")
 
-        queryObj.exec()
+    def isFeedItemRead(self, feedId, guid):
+        """ Returns True if the given feed item is read, False otherwise.
+            False is returned if the feed item doesn't exist. """
+        row = self.fetchOne("select readflag from items where feedid=? and guid=?", (feedId, guid),
+                            "Error when attempting to get feed item's read flag, on feed {}".format(feedId))
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when adding an item of interest: {}".format(sqlErr.text()))
+        if row is None and self.archiveAttached:
+            row = self.fetchOne("select readflag from {}.items where feedid=? and guid=?".format(kArchiveSchema), (feedId, guid),
+                                "Error when attempting to get archived feed item's read flag, on feed {}".format(feedId))
 
-    def deleteItemOfInterest(self, feedId, guid):
-        """ Deletes an item of interest. """
-        queryObj = QtSql.QSqlQuery()
+        return row is not None and row[0] == 1
 
-        queryStr = "delete from itemsofinterest where feedid=? and guid=?"
+    def feedItemExists(self, feedId, guid):
+        """ Returns True if the given feed item exists, False otherwise. """
+        return self.fetchOne("select 1 from items where feedid=? and guid=?", (feedId, guid),
+                             "Error when attempting to determine if a feed item exists") is not None
 
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(feedId)
-        queryObj.addBindValue(guid)
+    def columnExists(self, tableName, columnName):
+        rows = self.fetchAll("pragma table_info({})".format(tableName),
+                             errorMessage="Error when attempting to determine if a column exists", cache=False)
+        return any(row[1] == columnName for row in rows or [])
 
-        queryObj.exec()
+    def tableExists(self, tableName, schemaName="main"):
+        return self.fetchOne("select name from {}.sqlite_master where type='table' and name=?".format(schemaName), (tableName,),
+                             "Error when attempting to determine if a table exists") is not None
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when deleting an item of interest: {}".format(sqlErr.text()))
+    def getItemsOfInterest(self):
+        """ Retrieves all the items of interest, as a list of tuples of the form: (feedId, guid). """
+        return self.fetchAll("select feedid, guid from itemsofinterest",
+                             errorMessage="Error when retrieving items of interest")
 
-    def feedItemsTableName(self, feedId):
-        tableName = "FeedItems{:06}".format(feedId)
-        return tableName
+    def getItemsOfInterestFeedItemHeaders(self):
+        """ Retrieves the feed item headers of the Items of Interest feed with a single query.  Returns a tuple of
+            the form: (unreadCount, feedItemHeaderList).  Items of Interest whose feed items no longer exist are
+            not returned. """
+        queryStr = "select items.feedid, title, author, categories, pubdatetime, items.guid, readflag, enclosurelink "
+        queryStr += "from itemsofinterest join items "
+        queryStr += "on items.feedid=itemsofinterest.feedid and items.guid=itemsofinterest.guid"
 
-    def getFilteredWords(self):
-        """ Reads the filtered words from the database, and returns them as a list. """
-        queryObj = QtSql.QSqlQuery()
+        rows = self.fetchAll(queryStr, errorMessage="Error when retrieving the Items of Interest feed items")
 
-        queryStr = "select word from filteredwords"
+        if rows is None:
+            return 0, []
 
-        queryObj.prepare(queryStr)
+        feedItemHeaderList = [self.feedItemHeaderFromRow(row) for row in rows]
+        unreadCount = sum(1 for feedItemHeader in feedItemHeaderList if not feedItemHeader.m_bRead)
 
-        queryObj.exec()
+        return unreadCount, feedItemHeaderList
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all filtered words: {}".format(sqlErr.text()))
+    def isItemOfInterest(self, feedId, guid):
+        """ Returns True if the given feed item is in the Items of Interest feed. """
+        return self.fetchOne("select 1 from itemsofinterest where feedid=? and guid=?", (feedId, guid),
+                             "Error when attempting to determine if a feed item is an item of interest") is not None
 
-        allFilteredWords = []
+    def addItemOfInterest(self, feedId, guid):
+        """ Adds a feed item to the Items of Interest feed.  Adding an item that is already present has no effect.
+            Items of Interest are kept in the main database, so an archived feed item is restored. """
+        if self.archiveAttached and not self.feedItemExists(feedId, guid):
+            self.restoreArchivedFeedItem(feedId, guid)
 
-        while queryObj.next():
-            filteredWord = queryObj.record().value(0)
+        self.executeQuery("insert or ignore into itemsofinterest (feedid, guid) values (?, ?)", (feedId, guid),
+                          "Error when adding an item of interest")
 
-            if filteredWord:
-                allFilteredWords.append(filteredWord)
+    def deleteItemOfInterest(self, feedId, guid):
+        """ Deletes an item of interest. """
+        self.executeQuery("delete from itemsofinterest where feedid=? and guid=?", (feedId, guid),
+                          "Error when deleting an item of interest")
 
-        return allFilteredWords
+    def removeDeletedItemsOfInterest(self):
+        """ Removes deleted items from the Items of Interest feed. """
+        queryStr = "delete from itemsofinterest where not exists "
+        queryStr += "(select 1 from items where items.feedid=itemsofinterest.feedid and items.guid=itemsofinterest.guid)"
 
-    def addFilteredWord(self, newWord):
-        """ Adds a word to the language filter table. """
-        queryObj = QtSql.QSqlQuery()
+        self.executeQuery(queryStr, errorMessage="Error when attempting to remove deleted Items of Interest")
 
-        queryStr = "insert into filteredwords (word) values (?)"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(newWord)
+    def getFilteredWords(self):
+        """ Reads the filtered words from the database, and returns them as a list. """
+        rows = self.fetchAll("select word from filteredwords",
+                             errorMessage="Error when attempting to retrieve all filtered words")
 
-        queryObj.exec()
+        return [row[0] for row in rows or [] if row[0]]
 
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to add a new filtered word: {}".format(sqlErr.text()))
+    def addFilteredWord(self, newWord):
+        """ Adds a word to the language filter table. """
+        self.executeQuery("insert into filteredwords (word) values (?)", (newWord,),
+                          "Error when attempting to add a new filtered word")
 
     def deleteFilteredWord(self, word):
         """ Deletes a word from the language filter table. """
-        queryObj = QtSql.QSqlQuery()
-
-        queryStr = "delete from filteredwords where word=?"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(word)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete a filtered word: {}".format(sqlErr.text()))
+        self.executeQuery("delete from filteredwords where word=?", (word,),
+                          "Error when attempting to delete a filtered word")
 
     def addFilteredWords(self, wordList):
         """ Adds multiple filtered words to the database. """
@@ -1236,58 +1964,20 @@ class Database:
 
     def getAdFilters(self):
         """ Reads the URLS/domains for filtering ads, and returns them as a list. """
-        queryObj = QtSql.QSqlQuery()
-
-        queryStr = "select word from adfilters"
-
-        queryObj.prepare(queryStr)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all ad filters: {}".format(sqlErr.text()))
-
-        allFilters = []
-
-        while queryObj.next():
-            filteredWord = queryObj.record().value(0)
+        rows = self.fetchAll("select word from adfilters",
+                             errorMessage="Error when attempting to retrieve all ad filters")
 
-            if filteredWord:
-                allFilters.append(filteredWord)
-
-        return allFilters
+        return [row[0] for row in rows or [] if row[0]]
 
     def addAdFilter(self, word):
         """ Adds an ad filter word to the database. """
-        queryObj = QtSql.QSqlQuery()
-
-        queryStr = "insert into adfilters (word) values (?)"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(word)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to add a new ad filter word: {}".format(sqlErr.text()))
+        self.executeQuery("insert into adfilters (word) values (?)", (word,),
+                          "Error when attempting to add a new ad filter word")
 
     def deleteAdFilter(self, word):
         """ Deletes an ad filter word from the database. """
-        queryObj = QtSql.QSqlQuery()
-
-        queryStr = "delete from adfilters where word=?"
-        queryObj.prepare(queryStr)
-        queryObj.addBindValue(word)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete an ad filter word: {}".format(sqlErr.text()))
+        self.executeQuery("delete from adfilters where word=?", (word,),
+                          "Error when attempting to delete an ad filter word")
 
     def addAdFilters(self, wordList):
         """ Adds a list of words to the ad filter in the database. """
@@ -1309,30 +1999,23 @@ class Database:
 
     def getFeedItemFilters(self):
         """ Returns a list of all the global feed item filters. """
-        queryObj = QtSql.QSqlQuery()
+        rows = self.fetchAll("select filterid, feedid, field, verb, querystring, action from feeditemfilters",
+                             errorMessage="Error when attempting to retrieve all feed item filters")
 
-        queryStr = "select filterid, feedid, field, verb, querystring, action from feeditemfilters"
-        queryObj.prepare(queryStr)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to retrieve all feed item filters: {}".format(sqlErr.text()))
+        if rows is None:
             return []
 
         allFilters = []
 
-        while queryObj.next():
+        for row in rows:
             feedItemFilter = FeedItemFilter()
 
-            feedItemFilter.m_filterId = queryObj.record().value(0)
-            feedItemFilter.m_feedId = queryObj.record().value(1)
-            feedItemFilter.m_fieldId = queryObj.record().value(2)
-            feedItemFilter.m_verb = queryObj.record().value(3)
-            feedItemFilter.m_queryStr = queryObj.record().value(4)
-            feedItemFilter.m_action = queryObj.record().value(5)
+            feedItemFilter.m_filterId = row[0]
+            feedItemFilter.m_feedId = row[1]
+            feedItemFilter.m_fieldId = row[2]
+            feedItemFilter.m_verb = row[3]
+            feedItemFilter.m_queryStr = row[4]
+            feedItemFilter.m_action = row[5]
 
             allFilters.append(feedItemFilter)
 
@@ -1340,67 +2023,26 @@ class Database:
 
     def addFeedItemFilter(self, filter):
         """ Adds a feed item filter. """
-        queryObj = QtSql.QSqlQuery()
-
         queryStr = "insert into feeditemfilters "
         queryStr += "(feedid, field, verb, querystring, action) "
         queryStr += "values (?, ?, ?, ?, ?)"
 
-        queryObj.prepare(queryStr)
-
-        queryObj.addBindValue(filter.m_feedId)
-        queryObj.addBindValue(filter.m_fieldId)
-        queryObj.addBindValue(filter.m_verb)
-        queryObj.addBindValue(filter.m_queryStr)
-        queryObj.addBindValue(filter.m_action)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to add a feed item filter: {}".format(sqlErr.text()))
+        self.executeQuery(queryStr, (filter.m_feedId, filter.m_fieldId, filter.m_verb, filter.m_queryStr, filter.m_action),
+                          "Error when attempting to add a feed item filter")
 
     def deleteFeedItemFilter(self, filterId):
         """ Deletes a filter. """
-        queryObj = QtSql.QSqlQuery()
-
-        queryStr = "delete from feeditemfilters where filterid=?"
-
-        queryObj.prepare(queryStr)
-
-        queryObj.addBindValue(filterId)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to delete a feed item filter: {}".format(sqlErr.text()))
+        self.executeQuery("delete from feeditemfilters where filterid=?", (filterId,),
+                          "Error when attempting to delete a feed item filter")
 
     def updateFeedItemFilter(self, filter):
         """ Updates all fields of a filter. """
-        queryObj = QtSql.QSqlQuery()
-
         queryStr = "update feeditemfilters set "
         queryStr += "feedid=?, field=?, verb=?, querystring=?, action=? "
         queryStr += "where filterid=?"
 
-        queryObj.prepare(queryStr)
-
-        queryObj.addBindValue(filter.m_feedId)
-        queryObj.addBindValue(filter.m_fieldId)
-        queryObj.addBindValue(filter.m_verb)
-        queryObj.addBindValue(filter.m_queryStr)
-        queryObj.addBindValue(filter.m_action)
-        queryObj.addBindValue(filter.m_filterId)
-
-        queryObj.exec()
-
-        # Check for errors
-        sqlErr = queryObj.lastError()
-        if sqlErr.type() != QtSql.QSqlError.ErrorType.NoError:
-            self.reportError("Error when attempting to update a feed item filter: {}".format(sqlErr.text()))
+        self.executeQuery(queryStr, (filter.m_feedId, filter.m_fieldId, filter.m_verb, filter.m_queryStr, filter.m_action, filter.m_filterId),
+                          "Error when attempting to update a feed item filter")
 
     def addFeedItemFilters(self, filterList):
         """ Adds the filters in filterList. """
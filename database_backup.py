@@ -0,0 +1,295 @@
+from PySide6 import QtCore
+import datetime
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from database import archivePathName, kArchiveSchema
+
+# Number of pages copied per step of the online backup.  The source database is only locked during a step.
+kBackupPagesPerStep = 256
+
+# Pause between backup steps, leaving the database to the application's own connections
+kBackupStepDelaySec = 0.02
+
+# If the database is written while it is being copied, the copy is started again after this pause
+kBackupRetryDelaySec = 5
+
+# Number of times a snapshot is started before it is left to the next backup
+kMaxBackupAttempts = 5
+
+# Name of the directory, next to the database, in which snapshots are stored
+kBackupDirectoryName = "Backups"
+
+# Snapshots are stored in directories named after the time they were taken
+kSnapshotTimeFormat = "%Y%m%d-%H%M%S"
+
+# Suffix of a snapshot directory while its snapshot is being taken
+kPartialSnapshotSuffix = ".partial"
+
+
+class SnapshotCheckThread(QtCore.QThread):
+    """ Checks a new snapshot with quick_check, and then moves it from its partial directory to its snapshot
+        directory.  The snapshot is only read, so the check does not keep the application's connections waiting. """
+
+    # Emitted when the snapshot has been checked.  Parameters: snapshot directory, error message ("" if successful)
+    snapshotDoneSignal = QtCore.Signal(str, str)
+
+    def __init__(self, partialDirectory, snapshotDirectory):
+        super(SnapshotCheckThread, self).__init__()
+        self.partialDirectory = partialDirectory
+        self.snapshotDirectory = snapshotDirectory
+
+    def run(self):
+        try:
+            errorMessage = self.checkSnapshot()
+
+            if not errorMessage:
+                os.rename(self.partialDirectory, self.snapshotDirectory)
+        except (sqlite3.Error, OSError) as inst:
+            errorMessage = "Backup failed: {}".format(inst)
+
+        if errorMessage:
+            shutil.rmtree(self.partialDirectory, ignore_errors=True)
+
+        self.snapshotDoneSignal.emit(self.snapshotDirectory, errorMessage)
+
+    def checkSnapshot(self):
+        """ Runs quick_check on the databases of the snapshot.  Returns an error message, or "" if they are sound. """
+        for fileName in sorted(os.listdir(self.partialDirectory)):
+            connection = sqlite3.connect(os.path.join(self.partialDirectory, fileName))
+
+            try:
+                result = connection.execute("pragma quick_check").fetchone()[0]
+            finally:
+                connection.close()
+
+            if result != "ok":
+                return "Integrity check of {} failed: {}".format(fileName, result)
+
+        return ""
+
+
+class BackupCanceled(Exception):
+    pass
+
+
+class SourceChanged(Exception):
+    pass
+
+
+class DatabaseBackupThread(SnapshotCheckThread):
+    """ Takes a snapshot of the database and its archive with the SQLite online backup API, on a connection of its
+        own, and then checks it.  The databases are copied kBackupPagesPerStep pages at a time, so the application's
+        connections are never kept waiting for longer than one step.  If either database is written while they are
+        being copied, the copies would not match each other, so the snapshot is started again after a pause. """
+
+    def __init__(self, pathName, partialDirectory, snapshotDirectory):
+        super(DatabaseBackupThread, self).__init__(partialDirectory, snapshotDirectory)
+        self.pathName = pathName
+        self.stopFlag = False           # Used to abort the backup
+
+    def run(self):
+        try:
+            self.copyDatabases()
+        except BackupCanceled:
+            errorMessage = "Backup canceled"
+        except SourceChanged:
+            errorMessage = "Backup postponed: the database kept changing while it was being copied"
+        except (sqlite3.Error, OSError) as inst:
+            errorMessage = "Backup failed: {}".format(inst)
+        else:
+            super(DatabaseBackupThread, self).run()
+            return
+
+        shutil.rmtree(self.partialDirectory, ignore_errors=True)
+        self.snapshotDoneSignal.emit(self.snapshotDirectory, errorMessage)
+
+    def copyDatabases(self):
+        """ Copies the database, and its archive if there is one, to the partial directory, starting again if either
+            of them is written in the meantime.  Raises SourceChanged after kMaxBackupAttempts attempts. """
+        self.source = sqlite3.connect("{}?mode=ro".format(Path(self.pathName).as_uri()), uri=True)
+
+        try:
+            self.schemaNames = ["main"]
+            archivePath = Path(archivePathName(self.pathName))
+
+            if archivePath.is_file():
+                self.source.execute("attach database ? as {}".format(kArchiveSchema), ("{}?mode=ro".format(archivePath.as_uri()),))
+                self.schemaNames.append(kArchiveSchema)
+
+            for attempt in range(kMaxBackupAttempts):
+                if attempt > 0:
+                    self.pause(kBackupRetryDelaySec)
+
+                try:
+                    self.copyAttempt()
+                    return
+                except SourceChanged:
+                    logging.info("The database was written while it was being backed up; starting the backup again")
+
+            raise SourceChanged()
+        finally:
+            self.source.close()
+
+    def copyAttempt(self):
+        # data_version changes when another connection commits a change to the database
+        self.dataVersions = self.getDataVersions()
+
+        for schemaName in self.schemaNames:
+            targetPathName = os.path.join(self.partialDirectory, Path(self.pathName).name)
+
+            if schemaName == kArchiveSchema:
+                targetPathName = archivePathName(targetPathName)
+
+            target = sqlite3.connect(targetPathName)
+
+            try:
+                self.source.backup(target, pages=kBackupPagesPerStep, progress=self.onProgress, name=schemaName)
+            finally:
+                target.close()
+
+        if self.getDataVersions() != self.dataVersions:
+            raise SourceChanged()
+
+    def getDataVersions(self):
+        return [self.source.execute("pragma {}.data_version".format(schemaName)).fetchone()[0]
+                for schemaName in self.schemaNames]
+
+    def onProgress(self, status, remaining, total):
+        """ Called by the backup after each step.  A change to a database restarts its copy, so the copy is
+            abandoned instead (the copies taken so far would not match it). """
+        if self.getDataVersions() != self.dataVersions:
+            raise SourceChanged()
+
+        self.pause(kBackupStepDelaySec)
+
+    def pause(self, seconds):
+        """ Waits for the given time, or until the backup is canceled. """
+        endTime = time.monotonic() + seconds
+
+        while True:
+            if self.stopFlag:
+                raise BackupCanceled()
+
+            remaining = endTime - time.monotonic()
+
+            if remaining <= 0:
+                return
+
+            time.sleep(min(remaining, 0.1))
+
+
+class DatabaseBackup(QtCore.QObject):
+    """ Takes snapshots of the database while the application is running, keeping the most recent ones.  A snapshot
+        is taken by backUpIfDue() when the newest snapshot is older than the backup interval.  The application
+        calls it when it is idle (between feed updates).  The snapshot is taken by a DatabaseBackupThread. """
+    messageSignal = QtCore.Signal(str, int)
+
+    def __init__(self, parent):
+        super(DatabaseBackup, self).__init__(parent)
+        self.pathName = None
+        self.backupDirectory = None
+        self.intervalHours = 24         # Time between snapshots (0 disables the backups)
+        self.snapshotCount = 5          # Number of snapshots kept
+        self.backupThread = None
+
+    def open(self, pathName):
+        """ Sets the database that is backed up. """
+        self.pathName = pathName
+        self.backupDirectory = os.path.join(os.path.dirname(pathName), kBackupDirectoryName)
+
+    def setSchedule(self, intervalHours, snapshotCount):
+        self.intervalHours = intervalHours
+        self.snapshotCount = max(snapshotCount, 1)
+
+    def getSnapshots(self):
+        """ Returns the snapshot directories, oldest first. """
+        if self.backupDirectory is None or not os.path.isdir(self.backupDirectory):
+            return []
+
+        snapshots = []
+
+        for name in os.listdir(self.backupDirectory):
+            try:
+                datetime.datetime.strptime(name, kSnapshotTimeFormat)
+            except ValueError:
+                continue        # Not a snapshot (for example, an interrupted one)
+
+            snapshots.append(name)
+
+        return [os.path.join(self.backupDirectory, name) for name in sorted(snapshots)]
+
+    def lastBackupTime(self):
+        """ Returns the time the newest snapshot was taken, or None if there are no snapshots. """
+        snapshots = self.getSnapshots()
+
+        if len(snapshots) == 0:
+            return None
+
+        return datetime.datetime.strptime(os.path.basename(snapshots[-1]), kSnapshotTimeFormat)
+
+    def isBackingUp(self):
+        return self.backupThread is not None
+
+    def backUpIfDue(self):
+        """ Takes a snapshot if the newest one is older than the backup interval. """
+        if self.intervalHours <= 0 or self.pathName is None or self.isBackingUp():
+            return
+
+        lastBackupTime = self.lastBackupTime()
+
+        if lastBackupTime is None or datetime.datetime.now() - lastBackupTime >= datetime.timedelta(hours=self.intervalHours):
+            self.backUp()
+
+    def backUp(self):
+        """ Takes a snapshot in the background. """
+        if self.isBackingUp():
+            return
+
+        # Interrupted snapshots are left as .partial directories
+        if os.path.isdir(self.backupDirectory):
+            for name in os.listdir(self.backupDirectory):
+                if name.endswith(kPartialSnapshotSuffix):
+                    shutil.rmtree(os.path.join(self.backupDirectory, name), ignore_errors=True)
+
+        snapshotDirectory = os.path.join(self.backupDirectory, datetime.datetime.now().strftime(kSnapshotTimeFormat))
+        partialDirectory = snapshotDirectory + kPartialSnapshotSuffix
+
+        try:
+            os.makedirs(partialDirectory)
+        except OSError as inst:
+            self.onSnapshotDone(snapshotDirectory, "Backup failed: {}".format(inst))
+            return
+
+        self.backupThread = DatabaseBackupThread(self.pathName, partialDirectory, snapshotDirectory)
+        self.backupThread.snapshotDoneSignal.connect(self.onSnapshotDone)
+        self.backupThread.start()
+
+    def onSnapshotDone(self, snapshotDirectory, errorMessage):
+        if self.backupThread is not None:
+            self.backupThread.wait()
+            self.backupThread = None
+
+        if errorMessage:
+            logging.error(errorMessage)
+            self.messageSignal.emit(errorMessage, 10000)
+            return
+
+        logging.info("Database backed up to {}".format(snapshotDirectory))
+        self.rotateSnapshots()
+
+    def rotateSnapshots(self):
+        """ Deletes the oldest snapshots, keeping snapshotCount snapshots. """
+        snapshots = self.getSnapshots()
+
+        for snapshotDirectory in snapshots[:max(len(snapshots) - self.snapshotCount, 0)]:
+            shutil.rmtree(snapshotDirectory, ignore_errors=True)
+
+    def cancel(self):
+        """ Stops a backup in progress.  Called when the application exits. """
+        if self.backupThread is not None:
+            self.backupThread.stopFlag = True
+            self.backupThread.wait()
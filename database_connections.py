@@ -0,0 +1,55 @@
+from PySide6 import QtCore
+import itertools
+import threading
+from database import Database
+
+
+class ReadConnectionProvider(QtCore.QObject):
+    """ Gives each worker thread its own read-only connection to the database, as a connection can only be used
+        by the thread that created it.  A thread's connection is opened the first time the thread asks for it, and
+        closed when the thread finishes.  (The GUI thread uses the main Database object instead.) """
+    def __init__(self):
+        super(ReadConnectionProvider, self).__init__()
+        self.pathName = None
+        self.profile = None
+        self.connections = {}           # Thread identifier -> the thread's Database
+        self.lock = threading.Lock()
+        self.connectionNumbers = itertools.count(1)
+
+    def open(self, pathName, profile):
+        """ Sets the database that connections are opened on.  The database must already have been opened (and so,
+            created or updated) by the GUI thread. """
+        self.pathName = pathName
+        self.profile = profile
+
+    def applyProfile(self, profile):
+        """ Sets the DatabaseProfile of the connections opened from now on. """
+        self.profile = profile
+
+    def connection(self):
+        """ Returns the calling thread's read-only Database object. """
+        with self.lock:
+            db = self.connections.get(threading.get_ident())
+
+        if db is None:
+            db = Database()
+            db.open(self.pathName, self.profile, "reader{}".format(next(self.connectionNumbers)), readOnly=True)
+
+            with self.lock:
+                self.connections[threading.get_ident()] = db
+
+            # finished is emitted by the thread itself, so the connection is closed in the thread that opened it
+            QtCore.QThread.currentThread().finished.connect(self.closeConnection, QtCore.Qt.ConnectionType.DirectConnection)
+
+        return db
+
+    @QtCore.Slot()
+    def closeConnection(self):
+        """ Closes the calling thread's connection. """
+        # (A thread-local can't be used to hold the connections, as it has already been cleared when finished is
+        # emitted.)
+        with self.lock:
+            db = self.connections.pop(threading.get_ident(), None)
+
+        if db is not None:
+            db.close()
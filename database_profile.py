@@ -0,0 +1,38 @@
+# SQLite performance profile
+
+# Journal modes and synchronous levels offered to the user, in the order they appear in the Preferences dialog
+kJournalModes = ["WAL", "DELETE", "TRUNCATE"]
+kSynchronousLevels = ["OFF", "NORMAL", "FULL"]
+
+# temp_store values
+kTempStoreDefault = 0
+kTempStoreFile = 1
+kTempStoreMemory = 2
+
+
+class DatabaseProfile:
+    """ SQLite connection and storage settings applied by Database.open().  The defaults suit a single-user desktop
+        application: a write-ahead log lets readers proceed while the feed updater writes, and with WAL,
+        synchronous=NORMAL only syncs at checkpoints, while still never corrupting the database. """
+    def __init__(self):
+        super(DatabaseProfile, self).__init__()
+
+        self.journalMode = "WAL"
+        self.synchronous = "NORMAL"
+        self.mmapSizeMb = 256              # Size of the memory-mapped region of the database file (0 disables it)
+        self.cacheSizeMb = 64              # Page cache size
+        self.tempStore = kTempStoreMemory
+        self.busyTimeoutMs = 5000          # Time to wait for a lock held by another connection
+        self.compressBodies = True         # Store feed item descriptions and contents compressed
+
+    def pragmaStatements(self):
+        """ Returns the PRAGMA statements that apply this profile. """
+        journalMode = self.journalMode if self.journalMode in kJournalModes else "WAL"
+        synchronous = self.synchronous if self.synchronous in kSynchronousLevels else "NORMAL"
+
+        return ["pragma journal_mode={}".format(journalMode),
+                "pragma synchronous={}".format(synchronous),
+                "pragma mmap_size={}".format(int(self.mmapSizeMb) * 1024 * 1024),
+                "pragma cache_size={}".format(-int(self.cacheSizeMb) * 1024),     # Negative values are in KiB
+                "pragma temp_store={}".format(int(self.tempStore)),
+                "pragma busy_timeout={}".format(int(self.busyTimeoutMs))]
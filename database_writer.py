@@ -0,0 +1,433 @@
+from PySide6 import QtCore
+import logging
+import queue
+import time
+from database import Database, kArchiveBatchSize, kRecompressBatchSize
+from feed_item_filter_matcher import FeedItemFilterMatcher
+
+# Name of the writer's database connection
+kWriterConnectionName = "writer"
+
+# Number of feed items deleted per statement when purging a feed
+kPurgeChunkSize = 500
+
+# Time a purge may hold the write lock before the other queued writes are performed
+kPurgeTimeSliceSec = 0.05
+
+# Maximum number of queued writes performed in a single transaction.  This keeps the write lock from being held
+# for long when many writes are queued.
+kMaxCommandsPerTransaction = 50
+
+
+class DatabaseWriter(QtCore.QThread):
+    """ Thread that performs the feed item writes (storing the feed items of an update, setting read flags,
+        purging), and the feed updates' changes to the feeds table, on its own database connection, so that writes
+        do not block the UI (a write on the GUI thread's connection would wait for the writer's transaction to end).
+        Writes are queued by calling the methods below from the GUI thread.  Writes queued together are performed in a single
+        transaction, and their signals are emitted once it has been committed.  As the database uses a write-ahead
+        log, the GUI thread's connection can keep reading while a transaction is in progress. """
+
+    # Emitted when feed items have been stored.  Parameters: feed ID, list of the feed items that were new
+    feedItemsIngestedSignal = QtCore.Signal(int, list)
+
+    # Emitted when the feed items of a feed have been changed (read flags set, or feed items deleted).
+    # The parameter is the feed ID.
+    feedItemsChangedSignal = QtCore.Signal(int)
+
+    # Emitted when a feed's record in the feeds table has been changed (or the feed has been deleted).  The
+    # parameter is the feed ID.  The GUI thread re-reads the feed into its feed cache.
+    feedChangedSignal = QtCore.Signal(int)
+
+    # Emitted when read flags passed to setFeedItemReadFlags() have been stored.  The parameter is the list
+    # that was passed.
+    readFlagsSetSignal = QtCore.Signal(list)
+
+    # Emitted while a feed is being purged.  Parameters: feed ID, number of feed items deleted so far
+    purgeProgressSignal = QtCore.Signal(int, int)
+
+    # Emitted when a feed has been purged.  Parameters: feed ID, number of feed items deleted
+    feedPurgedSignal = QtCore.Signal(int, int)
+
+    # Emitted when archiveFeedItems() has finished.  The parameter is the number of feed items archived.
+    feedItemsArchivedSignal = QtCore.Signal(int)
+
+    # Emitted when recompressFeedItems() has finished.  Parameters: bytes used by the descriptions and contents of
+    # the feed items recompressed, before and after
+    feedItemsRecompressedSignal = QtCore.Signal(object, object)
+
+    # Emitted after each incrementalVacuum().  Parameters: bytes reclaimed, number of free pages left
+    incrementalVacuumDoneSignal = QtCore.Signal(int, int)
+
+    # Emitted when a full vacuum has been performed
+    vacuumDoneSignal = QtCore.Signal()
+
+    # Emitted when all writes queued before the call to sync() have been performed
+    syncedSignal = QtCore.Signal()
+
+    def __init__(self):
+        super(DatabaseWriter, self).__init__()
+        self.commandQueue = queue.Queue()
+        self.purgeSerial = 0        # Incremented to cancel the purges that are queued
+        self.transactionStartTime = 0
+        self.indexingSearchItems = False        # True while the indexing is continued in a later transaction
+
+    def open(self, pathName, profile):
+        """ Starts the writer thread.  The database must already have been opened (and so, created or updated) by
+            the GUI thread. """
+        self.pathName = pathName
+        self.profile = profile
+
+        # Completes an archive run that was interrupted between its transactions
+        self.queueCommand(self.doCompleteArchiveMove)
+        self.start()
+
+    def close(self):
+        """ Performs the queued writes, and then stops the writer thread. """
+        if self.isRunning():
+            self.commandQueue.put(None)
+            self.wait()
+
+    def queueCommand(self, function, *args, transactional=True):
+        self.commandQueue.put((function, args, transactional))
+
+    def applyProfile(self, profile):
+        self.queueCommand(self.doApplyProfile, profile, transactional=False)
+
+    def reloadFilters(self):
+        """ Reloads the feed item filters, after they have been edited. """
+        self.queueCommand(self.doReloadFilters)
+
+    def ingestFeedItems(self, feedId, feedItemList, validators=None):
+        """ Stores the given feed items, applies the feed item filters to those that were new, and then applies the
+            feed's retention policy.  validators, if given, is a tuple of the form: (etag, lastModified), holding the
+            HTTP validators of the response the feed items were parsed from.  They are stored in the same
+            transaction as the feed items, so a conditional fetch can only skip a feed whose items were stored. """
+        self.queueCommand(self.doIngestFeedItems, feedId, feedItemList, validators)
+
+    def setFeedItemReadFlags(self, readFlagList):
+        """ Sets the read flags of the given feed items.  readFlagList is a list of tuples of the form:
+            (feedId, guid, readFlag). """
+        self.queueCommand(self.doSetFeedItemReadFlags, readFlagList)
+
+    def setFeedReadFlagAllItems(self, feedId, readFlag):
+        self.queueCommand(self.doSetFeedReadFlagAllItems, feedId, readFlag)
+
+    def deleteFeedItem(self, feedId, guid):
+        self.queueCommand(self.doDeleteFeedItem, feedId, guid)
+
+    def deleteFeed(self, feedId):
+        """ Deletes a feed, and its feed items.  The GUI thread removes the feed from its feed cache and from the
+            feed order (see Database.deleteFeed()). """
+        self.queueCommand(self.doDeleteFeed, feedId)
+
+    def updateFeedLastUpdatedField(self, feedId, lastUpdatedDate):
+        self.queueCommand(self.doUpdateFeedLastUpdatedField, feedId, lastUpdatedDate)
+
+    def setFeedNextUpdate(self, feedId, nextUpdateDate):
+        self.queueCommand(self.doSetFeedNextUpdate, feedId, nextUpdateDate)
+
+    def purgeFeed(self, feedId, targetDate, deleteUnreadItems):
+        """ Deletes the feed items of the given feed published on or before targetDate.  The feed items are deleted
+            a chunk at a time.  Once a transaction has run for kPurgeTimeSliceSec, the rest of the purge is queued
+            again, so the purge does not hold up the other writes.  Once all of them have been deleted, the feed's
+            last-purged date is set to targetDate. """
+        self.queueCommand(self.doPurgeFeed, feedId, targetDate, deleteUnreadItems, self.purgeSerial, 0)
+
+    def cancelPurges(self):
+        """ Cancels the purges that have been queued.  A purge in progress stops after its current chunk. """
+        self.purgeSerial += 1
+
+    def archiveFeedItems(self, feedIdList, targetDate):
+        """ Moves the read feed items of the given feeds published before targetDate to the archive database.  Like
+            a purge, this is done a batch at a time, and continued in later transactions so the other writes are
+            not held up.  The feed items copied to the archive in one transaction are deleted from the main database
+            in the next one (see Database.archiveFeedItems()). """
+        self.queueCommand(self.doArchiveFeedItems, list(feedIdList), targetDate, 0, [])
+
+    def addItemOfInterest(self, feedId, guid):
+        """ Adds a feed item to the Items of Interest feed, restoring it from the archive if needed. """
+        self.queueCommand(self.doAddItemOfInterest, feedId, guid)
+
+    def removeDeletedItemsOfInterest(self):
+        """ Removes the entries of the Items of Interest feed whose feed items have been deleted. """
+        self.queueCommand(self.doRemoveDeletedItemsOfInterest)
+
+    def indexSearchItems(self):
+        """ Adds the feed items waiting to be indexed to the full-text search index.  Like a purge, this is done a
+            batch at a time, and continued in later transactions so the other writes are not held up. """
+        self.queueCommand(self.doIndexSearchItems, False)
+
+    def recompressFeedItems(self):
+        """ Rewrites the feed items whose descriptions and contents are not stored with the current body codec, a
+            batch at a time, continuing in later transactions so the other writes are not held up.  Nothing is read
+            if a recompression with the current codec has already completed. """
+        self.queueCommand(self.doRecompressFeedItems, None, 0, 0, 0)
+
+    def incrementalVacuum(self):
+        """ Returns a batch of free pages to the file system. """
+        self.queueCommand(self.doIncrementalVacuum)
+
+    def vacuumDatabase(self):
+        """ Rewrites the whole database file.  This can take some time with a large database. """
+        self.queueCommand(self.doVacuumDatabase, transactional=False)
+
+    def sync(self):
+        """ Emits syncedSignal once the writes queued so far have been performed. """
+        self.queueCommand(self.doSync)
+
+    def run(self):
+        self.db = Database()
+        self.db.open(self.pathName, self.profile, kWriterConnectionName)
+
+        self.feedItemFilterMatcher = FeedItemFilterMatcher(self.db)
+        self.feedItemFilterMatcher.initialize()
+
+        running = True
+        while running:
+            # Wait for a write, and then take any others that were queued while the previous writes were performed
+            commands = [self.commandQueue.get()]
+
+            while len(commands) < kMaxCommandsPerTransaction:
+                try:
+                    commands.append(self.commandQueue.get_nowait())
+                except queue.Empty:
+                    break
+
+            running = self.performCommands(commands)
+
+        self.db.close()
+
+    def performCommands(self, commands):
+        """ Performs the given commands, grouping the transactional ones into transactions.  Returns False if the
+            writer has been asked to stop. """
+        notifications = []
+
+        for command in commands:
+            if command is None:
+                self.commit(notifications)
+                return False
+
+            function, args, transactional = command
+
+            if transactional:
+                if self.db.transactionDepth == 0:
+                    self.db.beginTransaction()
+                    self.transactionStartTime = time.monotonic()
+
+                # Each write has its own savepoint, so a write that fails is undone without undoing the others
+                commandDepth = self.db.transactionDepth
+                self.db.beginTransaction()
+            else:
+                self.commit(notifications)
+
+            try:
+                notification = function(*args)
+            except Exception as inst:
+                logging.exception("Error when performing a database write: {}".format(inst))
+                notification = None
+
+                if transactional:
+                    # The write may have failed within transactions of its own, which were not ended
+                    self.db.transactionDepth = commandDepth + 1
+                    self.db.rollbackTransaction()
+            else:
+                if transactional:
+                    self.db.endTransaction()
+
+            if notification is not None:
+                notifications.append(notification)
+
+        self.commit(notifications)
+        return True
+
+    def commit(self, notifications):
+        """ Commits the current transaction (if any), and then emits the signals of the writes it contained. """
+        if self.db.transactionDepth > 0:
+            self.db.endTransaction()
+
+        for notification in notifications:
+            notification()
+
+        notifications.clear()
+
+    def doApplyProfile(self, profile):
+        self.db.applyProfile(profile)
+
+    def doReloadFilters(self):
+        self.feedItemFilterMatcher.initialize()
+
+    def doIngestFeedItems(self, feedId, feedItemList, validators):
+        newFeedItemList = self.db.ingestFeedItems(feedItemList, feedId)
+
+        if newFeedItemList is None:
+            # The validators are not stored either, so the next fetch gets the whole feed again
+            return None
+
+        self.feedItemFilterMatcher.filterFeedItems(feedId, newFeedItemList)
+
+        if len(newFeedItemList) > 0:
+            self.db.applyRetentionPolicy(feedId)
+
+        if validators is not None:
+            self.db.setFeedValidators(feedId, *validators)
+
+        def notify():
+            if validators is not None:
+                self.feedChangedSignal.emit(feedId)
+
+            self.feedItemsIngestedSignal.emit(feedId, newFeedItemList)
+
+        return notify
+
+    def doSetFeedItemReadFlags(self, readFlagList):
+        for feedId, guid, readFlag in readFlagList:
+            self.db.setFeedItemReadFlag(feedId, guid, readFlag)
+
+        def notify():
+            self.readFlagsSetSignal.emit(readFlagList)
+
+            for feedId in sorted({feedId for feedId, guid, readFlag in readFlagList}):
+                self.feedItemsChangedSignal.emit(feedId)
+
+        return notify
+
+    def doSetFeedReadFlagAllItems(self, feedId, readFlag):
+        self.db.setFeedReadFlagAllItems(feedId, readFlag)
+        return lambda: self.feedItemsChangedSignal.emit(feedId)
+
+    def doDeleteFeedItem(self, feedId, guid):
+        self.db.deleteFeedItem(feedId, guid)
+        return lambda: self.feedItemsChangedSignal.emit(feedId)
+
+    def doDeleteFeed(self, feedId):
+        self.db.deleteFeed(feedId)
+        return lambda: self.feedChangedSignal.emit(feedId)
+
+    def doUpdateFeedLastUpdatedField(self, feedId, lastUpdatedDate):
+        self.db.updateFeedLastUpdatedField(feedId, lastUpdatedDate)
+        return lambda: self.feedChangedSignal.emit(feedId)
+
+    def doSetFeedNextUpdate(self, feedId, nextUpdateDate):
+        self.db.setFeedNextUpdate(feedId, nextUpdateDate)
+        return lambda: self.feedChangedSignal.emit(feedId)
+
+    def doPurgeFeed(self, feedId, targetDate, deleteUnreadItems, purgeSerial, itemsDeleted):
+        while purgeSerial == self.purgeSerial:
+            if time.monotonic() - self.transactionStartTime >= kPurgeTimeSliceSec:
+                # Continue in a later transaction, after the writes queued in the meantime
+                self.queueCommand(self.doPurgeFeed, feedId, targetDate, deleteUnreadItems, purgeSerial, itemsDeleted)
+
+                if itemsDeleted == 0:
+                    return None
+
+                return lambda: self.purgeProgressSignal.emit(feedId, itemsDeleted)
+
+            numDeleted = self.db.deleteFeedItemsByDate(feedId, targetDate, deleteUnreadItems, kPurgeChunkSize)
+            itemsDeleted += numDeleted
+
+            if numDeleted < kPurgeChunkSize:
+                self.db.updateFeedLastPurgedField(feedId, targetDate)
+
+                def notify():
+                    self.feedChangedSignal.emit(feedId)
+                    self.feedPurgedSignal.emit(feedId, itemsDeleted)
+
+                return notify
+
+        # The purge was canceled
+        return None
+
+    def doArchiveFeedItems(self, feedIdList, targetDate, itemsArchived, copiedFeedIdList):
+        # The copies made by the previous transaction have been committed to the archive, so the feed items can now
+        # be deleted from the main database
+        for feedId in copiedFeedIdList:
+            self.db.deleteArchivedFeedItems(feedId)
+
+        copiedFeedIdList = []
+
+        while len(feedIdList) > 0:
+            if time.monotonic() - self.transactionStartTime >= kPurgeTimeSliceSec:
+                break
+
+            numArchived = self.db.archiveFeedItems(feedIdList[0], targetDate)
+            itemsArchived += numArchived
+
+            if feedIdList[0] not in copiedFeedIdList:
+                copiedFeedIdList.append(feedIdList[0])
+
+            if numArchived < kArchiveBatchSize:
+                feedIdList = feedIdList[1:]
+
+        if len(copiedFeedIdList) > 0 or len(feedIdList) > 0:
+            # Continue in a later transaction, after the writes queued in the meantime
+            self.queueCommand(self.doArchiveFeedItems, feedIdList, targetDate, itemsArchived, copiedFeedIdList)
+            return None
+
+        self.db.setArchiveMovePending(False)
+        return lambda: self.feedItemsArchivedSignal.emit(itemsArchived)
+
+    def doCompleteArchiveMove(self):
+        if self.db.isArchiveMovePending():
+            for feedId in self.db.getFeedIds():
+                self.db.deleteArchivedFeedItems(feedId)
+
+            self.db.setArchiveMovePending(False)
+
+    def doAddItemOfInterest(self, feedId, guid):
+        self.db.addItemOfInterest(feedId, guid)
+        return lambda: self.feedItemsChangedSignal.emit(feedId)
+
+    def doRemoveDeletedItemsOfInterest(self):
+        self.db.removeDeletedItemsOfInterest()
+
+    def doIndexSearchItems(self, continued):
+        if self.indexingSearchItems and not continued:
+            return None     # The feed items are already being indexed
+
+        self.indexingSearchItems = False
+
+        while self.db.indexPendingItems() > 0:
+            if time.monotonic() - self.transactionStartTime >= kPurgeTimeSliceSec:
+                # Continue in a later transaction, after the writes queued in the meantime
+                self.indexingSearchItems = True
+                self.queueCommand(self.doIndexSearchItems, True)
+                return None
+
+        return None
+
+    def doRecompressFeedItems(self, bodyCodec, lastItemId, bytesBefore, bytesAfter):
+        if bodyCodec != self.db.bodyCodec:
+            # Starting, or the body codec has been changed since the recompression started: start from the beginning
+            if self.db.isRecompressionComplete():
+                return lambda: self.feedItemsRecompressedSignal.emit(bytesBefore, bytesAfter)
+
+            self.db.setRecompressionComplete(False)
+            bodyCodec = self.db.bodyCodec
+            lastItemId = 0
+
+        while True:
+            if time.monotonic() - self.transactionStartTime >= kPurgeTimeSliceSec:
+                # Continue in a later transaction, after the writes queued in the meantime
+                self.queueCommand(self.doRecompressFeedItems, bodyCodec, lastItemId, bytesBefore, bytesAfter)
+                return None
+
+            batchLastItemId, batchBytesBefore, batchBytesAfter = self.db.recompressFeedItems(lastItemId, kRecompressBatchSize)
+
+            if batchLastItemId is None:
+                self.db.setRecompressionComplete(True)
+                return lambda: self.feedItemsRecompressedSignal.emit(bytesBefore, bytesAfter)
+
+            lastItemId = batchLastItemId
+            bytesBefore += batchBytesBefore
+            bytesAfter += batchBytesAfter
+
+    def doIncrementalVacuum(self):
+        bytesReclaimed, freePagesLeft = self.db.incrementalVacuum()
+        return lambda: self.incrementalVacuumDoneSignal.emit(bytesReclaimed, freePagesLeft)
+
+    def doVacuumDatabase(self):
+        self.db.vacuumDatabase()
+        return self.vacuumDoneSignal.emit
+
+    def doSync(self):
+        return self.syncedSignal.emit
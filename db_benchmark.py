@@ -0,0 +1,92 @@
+# Micro-benchmark of the Database hot paths.
+#
+# Builds a temporary database of 100 feeds x 1000 feed items (by default), and times the per-item calls
+# that run thousands of times during feed updates and purges.
+#
+# Usage:
+#   python db_benchmark.py [number of feeds] [items per feed]
+
+import sys
+import os
+import time
+import random
+import tempfile
+import datetime
+from PySide6 import QtCore
+from database import Database
+from feed import Feed
+from feed_item import FeedItem
+
+kDefaultNumFeeds = 100
+kDefaultItemsPerFeed = 1000
+kNumCalls = 20000
+
+
+def createFeedItem(feedIndex, itemIndex):
+    feedItem = FeedItem()
+    feedItem.m_guid = "https://example.com/{}/{}".format(feedIndex, itemIndex)
+    feedItem.m_title = "Item {} of feed {}".format(itemIndex, feedIndex)
+    feedItem.m_author = "Author"
+    feedItem.m_link = feedItem.m_guid
+    feedItem.m_description = "<p>{}</p>".format("Lorem ipsum dolor sit amet. " * 20)
+    feedItem.m_encodedContent = "<p>{}</p>".format("Lorem ipsum dolor sit amet. " * 80)
+    feedItem.m_categories = ["news", "benchmark"]
+    feedItem.m_publicationDatetime = datetime.datetime(2024, 1, 1) + datetime.timedelta(minutes=itemIndex)
+    feedItem.m_thumbnailSize = QtCore.QSize(0, 0)
+    return feedItem
+
+
+def timeCalls(name, func, argList):
+    startTime = time.perf_counter()
+    for args in argList:
+        func(*args)
+    elapsed = time.perf_counter() - startTime
+    print("{:<32} {:>8} calls  {:>9.1f} ms  {:>7.1f} us/call".format(name, len(argList), elapsed * 1000, elapsed * 1e6 / len(argList)))
+
+
+def main():
+    numFeeds = int(sys.argv[1]) if len(sys.argv) > 1 else kDefaultNumFeeds
+    itemsPerFeed = int(sys.argv[2]) if len(sys.argv) > 2 else kDefaultItemsPerFeed
+
+    app = QtCore.QCoreApplication(sys.argv)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        db = Database()
+        db.open(os.path.join(tempDir, "Feeds.db"))
+
+        feedIds = []
+        startTime = time.perf_counter()
+        for feedIndex in range(numFeeds):
+            feed = Feed()
+            feed.m_feedTitle = "Feed {}".format(feedIndex)
+            feed.m_feedUrl = "https://example.com/{}".format(feedIndex)
+            feedId = db.addFeed(feed).m_feedId
+            feedIds.append(feedId)
+            db.ingestFeedItems([createFeedItem(feedIndex, itemIndex) for itemIndex in range(itemsPerFeed)], feedId)
+        print("Created {} feed items in {:.1f} s".format(numFeeds * itemsPerFeed, time.perf_counter() - startTime))
+
+        random.seed(1)
+        targets = []
+        for _ in range(kNumCalls):
+            feedIndex = random.randrange(numFeeds)
+            guid = "https://example.com/{}/{}".format(feedIndex, random.randrange(itemsPerFeed))
+            targets.append((feedIds[feedIndex], guid))
+
+        # Per-item calls are timed inside a transaction, as they are during updates and purges, so that
+        # the time measured is the statement overhead rather than the disk sync.
+        db.beginTransaction()
+        timeCalls("feedItemExists", db.feedItemExists, targets)
+        timeCalls("isFeedItemRead", db.isFeedItemRead, targets)
+        timeCalls("getFeedItem", db.getFeedItem, [(guid, feedId) for feedId, guid in targets])
+        timeCalls("setFeedItemReadFlag", db.setFeedItemReadFlag, [(feedId, guid, True) for feedId, guid in targets])
+        db.endTransaction()
+
+        timeCalls("getFeedItemUnreadCount", db.getFeedItemUnreadCount, [(feedId,) for feedId in feedIds])
+        timeCalls("getFeedItems", db.getFeedItems, [(feedId,) for feedId in feedIds[:20]])
+        timeCalls("getFeedItemHeaders", db.getFeedItemHeaders, [(feedId,) for feedId in feedIds[:20]])
+
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,44 @@
 from PySide6 import QtCore
 from urllib.parse import urlparse
 import os.path
-from resource_fetcher import ResourceFetcher
+from network_fetcher import NetworkFetcher
 
+# Enclosures (podcasts, videos) can take a long time to download; only give up if no data arrives for this long
+kEnclosureTimeoutMs = 120000
 
-class EnclosureDownloader(QtCore.QThread):
+
+class EnclosureDownloader(QtCore.QObject):
     enclosureDownloadedSignal = QtCore.Signal(str)
 
-    def __init__(self, url, downloadDirectory, proxy):
+    def __init__(self, url, downloadDirectory, networkFetcher: NetworkFetcher):
         super(EnclosureDownloader, self).__init__()
         self.enclosureUrl = url
         self.downloadDirectory = downloadDirectory
-        self.proxy = proxy
+        self.networkFetcher = networkFetcher
+        self.fetchRequest = None
 
         # Extract file name from URL
         parsedUrl = urlparse(self.enclosureUrl)
         self.filename = os.path.basename(parsedUrl.path)
         self.enclosurePath = os.path.join(self.downloadDirectory, self.filename)
 
-    def run(self):
+    def start(self):
+        """ Starts downloading the enclosure.  enclosureDownloadedSignal is emitted when it is done. """
         if self.downloadDirectory:
-            resourceFetcher = ResourceFetcher(self.enclosureUrl, self.proxy)
-            enclosureData = resourceFetcher.getData()
-
-            if enclosureData is not None:
-                # Save data to file
-                if os.path.exists(self.downloadDirectory):
-                    fileObj = open(self.enclosurePath, 'wb')
-                    fileObj.write(enclosureData)
-                    fileObj.close()
+            self.fetchRequest = self.networkFetcher.fetch(self.enclosureUrl, kEnclosureTimeoutMs)
+            self.fetchRequest.fetchDoneSignal.connect(self.onEnclosureFetched)
+        else:
+            self.enclosureDownloadedSignal.emit(self.filename)
+
+    def onEnclosureFetched(self, fetchRequest):
+        self.fetchRequest = None
+        enclosureData = fetchRequest.getData()
+
+        if enclosureData is not None:
+            # Save data to file
+            if os.path.exists(self.downloadDirectory):
+                fileObj = open(self.enclosurePath, 'wb')
+                fileObj.write(enclosureData)
+                fileObj.close()
 
         self.enclosureDownloadedSignal.emit(self.filename)
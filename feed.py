@@ -2,6 +2,7 @@ from PySide6 import QtCore, QtGui
 import datetime
 
 kItemsOfInterestFeedId = 2147483647
+kSearchResultsFeedId = 2147483646
 
 class Feed(object):
     def __init__(self):
@@ -22,6 +23,21 @@ class Feed(object):
         self.m_feedDescription = ""
         self.m_feedWebPageLink = ""
 
+        # Retention policy (limits of 0 mean no limit)
+        self.m_retentionDays = 0  # Maximum age of the feed's items, in days
+        self.m_retentionItems = 0  # Maximum number of items in the feed
+        self.m_keepUnreadItems = True  # If True, unread items are never deleted by the retention limits
+        self.m_keepItemsOfInterest = True  # If True, Items of Interest are never deleted by the retention limits
+
+        # HTTP validators of the feed's last response, sent with the next fetch so an unchanged feed is not downloaded
+        self.m_etag = ""
+        self.m_lastModified = ""
+
+        # Update schedule (intervals of 0 mean the application's default)
+        self.m_nextUpdate = datetime.datetime(1990, 1, 1)  # Date and time the feed is next due to be updated
+        self.m_minUpdateInterval = 0  # Shortest time between updates, in minutes
+        self.m_maxUpdateInterval = 0  # Longest time between updates, in minutes
+
         self.m_feedId = -1  # ID number of the feed
         self.m_parentId = -1  # Used in the feed tree
 
@@ -0,0 +1,58 @@
+from PySide6 import QtCore, QtGui
+import hashlib
+
+# Size of the icons shown in the feed tree and the feed header
+kFeedIconSize = 32
+
+
+def decodeIcon(imageData):
+    """ Decodes the given image data (bytes) and scales it to kFeedIconSize.  Returns a null pixmap if the data is
+        not a valid image. """
+    pixmap = QtGui.QPixmap()
+
+    if not pixmap.loadFromData(imageData):
+        return QtGui.QPixmap()
+
+    return pixmap.scaled(kFeedIconSize, kFeedIconSize, QtCore.Qt.AspectRatioMode.KeepAspectRatio,
+                         QtCore.Qt.TransformationMode.SmoothTransformation)
+
+
+class FeedIconCache:
+    """ Cache of decoded feed icons, scaled to kFeedIconSize.  Icons are keyed by the hash of their image data, which
+        is computed before decoding, so feeds sharing the same favicon (common for feeds of the same site) decode and
+        scale it only once. """
+    def __init__(self):
+        super(FeedIconCache, self).__init__()
+
+        self.m_iconHashes = {}      # Feed ID -> hash of the image data of the feed's icon
+        self.m_icons = {}           # Hash of image data -> scaled QPixmap (a null pixmap if the data is not an image)
+
+    def getIcon(self, feedId):
+        """ Returns the cached icon of the given feed, or None if the feed's icon has not been cached. """
+        iconHash = self.m_iconHashes.get(feedId)
+        return self.m_icons.get(iconHash) if iconHash is not None else None
+
+    def addIcon(self, feedId, favicon, image):
+        """ Caches and returns the icon of the given feed, given the feed's favicon and image data (as stored in the
+            database).  As in Feed.getFeedIcon(), the feed image is preferred over the favicon. """
+        for imageData in [image, favicon]:
+            if isinstance(imageData, QtCore.QByteArray) and not imageData.isEmpty():
+                iconData = imageData.data()
+                iconHash = hashlib.sha1(iconData).hexdigest()
+
+                if iconHash not in self.m_icons:
+                    self.m_icons[iconHash] = decodeIcon(iconData)
+
+                if not self.m_icons[iconHash].isNull():
+                    self.m_iconHashes[feedId] = iconHash
+                    return self.m_icons[iconHash]
+
+        # The feed has no (valid) image: all such feeds share the null pixmap cached for empty data
+        iconHash = hashlib.sha1(b'').hexdigest()
+        self.m_icons.setdefault(iconHash, QtGui.QPixmap())
+        self.m_iconHashes[feedId] = iconHash
+        return self.m_icons[iconHash]
+
+    def removeIcon(self, feedId):
+        """ Removes the given feed from the cache (its icon stays cached for other feeds using the same image). """
+        self.m_iconHashes.pop(feedId, None)
@@ -1,42 +1,65 @@
 import logging
 import datetime
 import feedparser
-from lxml import etree
-from proxy import Proxy
-from resource_fetcher import ResourceFetcher
+from PySide6 import QtCore
+from network_fetcher import NetworkFetcher
 from feed import Feed
-from feed_item_parser import getElementValue
-from urllib.parse import urlparse
-from dateutil.relativedelta import *
 
 
-class FeedIdentifier:
-    def __init__(self, proxy: Proxy):
+class FeedIdentifier(QtCore.QObject):
+    """ Identifies a feed from its URL.  The feed, and then its image or its web site's favicon, are fetched
+        without blocking; feedIdentifiedSignal is emitted when they have been fetched. """
+
+    # Parameter: the identified Feed, or None if the feed could not be fetched
+    feedIdentifiedSignal = QtCore.Signal(object)
+
+    def __init__(self, networkFetcher: NetworkFetcher):
         super(FeedIdentifier, self).__init__()
-        self.proxy = proxy
+        self.networkFetcher = networkFetcher
         self.feed = None
+        self.fetchRequest = None
+
+    def isIdentifying(self):
+        return self.fetchRequest is not None
 
     def identifyFeed(self, feedUrl):
-        # Fetch the feed manually, since feedparser doesn't know about proxies.
-        resourceFetcher = ResourceFetcher(feedUrl, self.proxy)
-        feedText = resourceFetcher.getData()
+        self.cancel()
+        self.feed = None
+        self.fetchRequest = self.networkFetcher.fetchFeed(feedUrl)
+        self.fetchRequest.fetchDoneSignal.connect(lambda fetchRequest: self.onFeedFetched(feedUrl, fetchRequest))
+
+    def cancel(self):
+        if self.fetchRequest is not None:
+            fetchRequest = self.fetchRequest
+            self.fetchRequest = None
+            fetchRequest.cancel()
+
+    def onFeedFetched(self, feedUrl, fetchRequest):
+        if fetchRequest is not self.fetchRequest:
+            return      # Canceled
+
+        self.fetchRequest = None
+        feedText = fetchRequest.getData()
 
         if feedText is None:
-            return None
+            self.feedIdentifiedSignal.emit(None)
+            return
 
         try:
             parsedFeed = feedparser.parse(feedText)
         except Exception as inst:
             errMsg = f"parseFeed: Exception: {inst} when parsing feed item text:{feedText}"
             logging.error(errMsg)
-            return None
+            self.feedIdentifiedSignal.emit(None)
+            return
 
         self.feed = Feed()
 
         if parsedFeed.bozo:
             exc = parsedFeed.bozo_exception
             logging.info(f'Got Bozo error in feed: exception type: {type(exc).__name__}')
-            return self.feed
+            self.feedIdentifiedSignal.emit(self.feed)
+            return
 
         self.feed.m_feedUrl = feedUrl
         self.feed.m_feedTitle = self.getFeedData(parsedFeed, 'title', 'Untitled Feed')
@@ -50,64 +73,6 @@ class FeedIdentifier:
 
         self.readFeedImage(parsedFeed)
 
-        if self.feed.m_feedImage.isNull():
-            # The feed did not contain an image.  Try getting the favicon from the feed's web site.
-            self.getWebsiteFavicon()
-
-        return self.feed
-
-    def identifyFeedOLD(self, feedUrl):
-        # TODO: This should probably be done in a thread
-        resourceFetcher = ResourceFetcher(feedUrl, self.proxy)
-        feedText = resourceFetcher.getData()
-
-        self.feed = Feed()
-
-        if feedText is None:
-            return self.feed
-
-        try:
-            root = etree.fromstring(feedText, None)
-        except Exception as inst:
-            if len(feedText) > 50:
-                feedTextToDisplay = "<Feed text too large>"
-            else:
-                feedTextToDisplay = feedText
-
-            errMsg = "parseFeed: Exception: {} when parsing feed item text:\n{}".format(inst, feedTextToDisplay)
-            logging.error(errMsg)
-            return self.feed
-
-        channel = root.find('channel')
-
-        if channel is None:
-            # Some feeds use 'feed' instead of 'channel'
-            channel = root.find('feed')
-
-        # Some feeds (ahem, GOOGLE!) don't have a channel or feed tag
-        if channel is not None:
-            feedRoot = channel
-        else:
-            feedRoot = root
-
-        self.feed.m_feedUrl = feedUrl
-        self.feed.m_feedTitle = getElementValue(feedRoot, ['title'])
-        self.feed.m_feedName = self.feed.m_feedTitle    # This field is deprecated, but is still being set
-        self.feed.m_feedLanguage = getElementValue(feedRoot, ['language'])
-        self.feed.m_feedDescription = getElementValue(feedRoot, ['description'])
-        self.feed.m_feedWebPageLink = getElementValue(feedRoot, ['link'])
-        self.feed.m_feedDateAdded = datetime.datetime.today()
-        self.feed.m_feedLastUpdated = datetime.datetime(1990, 1, 1) # Indicate it has never been updated
-        self.feed.m_feedLastPurged = datetime.datetime(1990, 1, 1)  # Indicate it has never been purged
-
-        self.readFeedImageOLD(feedRoot)
-
-        if self.feed.m_feedImage.isNull():
-            # The feed did not contain an image.  Try getting the favicon from the feed's web site.
-            self.getWebsiteFavicon()
-
-        return self.feed
-
     def getFeedData(self, parsedFeed, dataItemName, defaultValue):
         if dataItemName in parsedFeed.feed:
             return parsedFeed.feed.get(dataItemName)
@@ -115,38 +80,43 @@ class FeedIdentifier:
             return defaultValue
 
     def readFeedImage(self, parsedFeed):
-        if self.feed is None:
-            return
-
         if 'image' in parsedFeed.feed:
             imageRoot = parsedFeed.feed.image
             feedImageUrl = imageRoot.href if 'href' in imageRoot else ''
 
-            if feedImageUrl is not None:
-                resourceFetcher = ResourceFetcher(feedImageUrl, self.proxy)
-                self.feed.m_feedImage = resourceFetcher.getDataAsPixmap()
+            if feedImageUrl:
+                self.fetchRequest = self.networkFetcher.fetchImage(feedImageUrl, self.feed.m_feedWebPageLink)
+                self.fetchRequest.fetchDoneSignal.connect(self.onFeedImageFetched)
+                return
 
-    def readFeedImageOLD(self, feedRoot):
-        if self.feed is None:
-            return
+        # The feed did not contain an image.  Try getting the favicon from the feed's web site.
+        self.getWebsiteFavicon()
 
-        imageRoot = feedRoot.find('image')
-        if imageRoot is not None:
-            feedImageUrlElement = imageRoot.find('url')
+    def onFeedImageFetched(self, fetchRequest):
+        if fetchRequest is not self.fetchRequest:
+            return      # Canceled
 
-            if feedImageUrlElement.text is not None:
-                feedImageUrl = feedImageUrlElement.text
+        self.fetchRequest = None
+        self.feed.m_feedImage = fetchRequest.getDataAsPixmap()
 
-                resourceFetcher = ResourceFetcher(feedImageUrl, self.proxy)
-                self.feed.m_feedImage = resourceFetcher.getDataAsPixmap()
+        if self.feed.m_feedImage.isNull():
+            # The image could not be fetched.  Try getting the favicon from the feed's web site.
+            self.getWebsiteFavicon()
+        else:
+            self.feedIdentifiedSignal.emit(self.feed)
 
     def getWebsiteFavicon(self):
         """ Attempts to retrieve the favicon from the feed's web site. """
-        if self.feed is None:
-            return
-
         if self.feed.m_feedWebPageLink:
-            parsed_uri = urlparse(self.feed.m_feedWebPageLink)
-            faviconUrl = '{uri.scheme}://{uri.netloc}/favicon.ico'.format(uri=parsed_uri)
-            resourceFetcher = ResourceFetcher(faviconUrl, self.proxy)
-            self.feed.m_feedFavicon = resourceFetcher.getDataAsPixmap()
+            self.fetchRequest = self.networkFetcher.fetchFavicon(self.feed.m_feedWebPageLink)
+            self.fetchRequest.fetchDoneSignal.connect(self.onFaviconFetched)
+        else:
+            self.feedIdentifiedSignal.emit(self.feed)
+
+    def onFaviconFetched(self, fetchRequest):
+        if fetchRequest is not self.fetchRequest:
+            return      # Canceled
+
+        self.fetchRequest = None
+        self.feed.m_feedFavicon = fetchRequest.getDataAsPixmap()
+        self.feedIdentifiedSignal.emit(self.feed)
@@ -0,0 +1,25 @@
+import datetime
+
+class FeedItemHeader:
+    """ The fields of a feed item that are shown in the title tree.  Unlike FeedItem, this does not hold the feed
+        item's description or content, which are read from the database only when the feed item is displayed. """
+    def __init__(self):
+        super(FeedItemHeader, self).__init__()
+
+        self.m_title = ""
+        self.m_author = ""
+        self.m_categories = []
+        self.m_publicationDatetime = datetime.datetime(1990, 1, 1)
+        self.m_guid = ""
+        self.m_enclosureLink = ""       # Link to media enclosure (e.g. podcast)
+        self.m_parentFeedId = -1        # Feed ID that owns this feed item
+        self.m_bRead = False            # True if feed item has been read
+
+    def hasEnclosure(self):
+        return len(self.m_enclosureLink) > 0
+
+    def isRead(self):
+        return self.m_bRead
+
+    def isValid(self):
+        return len(self.m_guid) > 0 and self.m_parentFeedId != -1
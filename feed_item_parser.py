@@ -19,6 +19,7 @@ def parseFeed(feedItemRawText):
         parsedFeed = feedparser.parse(feedItemRawText)
     except Exception as inst:
         logging.error(f'Exception {inst} parsing raw feed text.')
+        raise
 
     feedTitle = parsedFeed.feed.title if 'title' in parsedFeed.feed else '<unknown feed title>'
 
@@ -0,0 +1,38 @@
+from PySide6 import QtCore
+from feed_item_parser import parseFeed
+from feed_item_debugger import debugParseFeed
+
+# Use DEBUG = True to invoke feed parse debugging
+#DEBUG = True
+DEBUG = False
+
+
+class FeedParseTaskSignals(QtCore.QObject):
+    # Emitted when the feed has been parsed.  Parameters: feed ID, list of feed items
+    feedParseDoneSignal = QtCore.Signal(int, list)
+
+    # Emitted when the feed could not be parsed.  The parameter is the feed ID.
+    feedParseFailedSignal = QtCore.Signal(int)
+
+
+class FeedParseTask(QtCore.QRunnable):
+    """ Parses a fetched feed on a thread of the feed updater's thread pool.  (A QRunnable is not a QObject, so
+        its signals are emitted by a separate signals object.) """
+    def __init__(self, feedId, feedText):
+        super(FeedParseTask, self).__init__()
+        self.feedId = feedId
+        self.feedText = feedText
+        self.signals = FeedParseTaskSignals()
+
+    def run(self):
+        if DEBUG:
+            debugParseFeed(self.feedText)
+            feedItemList = []
+        else:
+            try:
+                feedItemList = parseFeed(self.feedText)
+            except Exception:
+                self.signals.feedParseFailedSignal.emit(self.feedId)
+                return
+
+        self.signals.feedParseDoneSignal.emit(self.feedId, feedItemList)
@@ -3,75 +3,136 @@ import datetime
 import time
 from dateutil.relativedelta import *
 
+# Delay between the batches of free pages returned to the file system after a purge, leaving the database writer
+# idle in between for other writes
+kIncrementalVacuumDelayMs = 100
+
 class FeedPurger(QtCore.QObject):
 
     # Emitted when a feed has been purged.  The parameter is the feed ID
     feedPurgedSignal = QtCore.Signal(int)
     messageSignal = QtCore.Signal(str, int)
 
-    def __init__(self, db, parent):
+    def __init__(self, db, dbWriter, parent):
         super(FeedPurger, self).__init__(parent)
         self.parent = parent
         self.db = db
+        self.dbWriter = dbWriter
+        self.dbWriter.feedPurgedSignal.connect(self.onFeedPurged)
+        self.dbWriter.purgeProgressSignal.connect(self.onPurgeProgress)
+        self.dbWriter.incrementalVacuumDoneSignal.connect(self.onIncrementalVacuumDone)
+        self.reclaimingSpace = False
+        self.bytesReclaimed = 0
+        self.progressDialog = None
+        self.numFeedsToPurge = 0
+        self.numFeedsPurged = 0
+        self.purgeMessage = ""
+
+    def isPurging(self):
+        return self.numFeedsPurged < self.numFeedsToPurge
 
     def purgeAllFeeds(self, priorDays, purgeUnreadItems):
         feedList = self.db.getFeeds()
         numFeeds = len(feedList)
         targetDate = self.calculateTargetDate(priorDays)
 
-        if numFeeds == 0:
+        if numFeeds == 0 or self.isPurging():
             return
 
-        self.progressDialog = QtWidgets.QProgressDialog("Purging Feeds", "Abort", 0, numFeeds-1)
-        self.progressDialog.setWindowModality(QtCore.Qt.WindowModality.WindowModal)
+        # The purge is performed by the database writer, so the dialog does not need to block the UI
+        self.progressDialog = QtWidgets.QProgressDialog("Purging Feeds", "Abort", 0, numFeeds)
+        self.progressDialog.setWindowModality(QtCore.Qt.WindowModality.NonModal)
         self.progressDialog.setWindowTitle("Purge Feeds")
+        self.progressDialog.canceled.connect(self.onPurgeCanceled)
+        self.progressDialog.setValue(0)
 
-        for index, feed in enumerate(feedList):
-            self.progressDialog.setLabelText("Purging: {}".format(feed.m_feedTitle))
-            self.progressDialog.setValue(index)
-            if self.progressDialog.wasCanceled():
-                return
-
-            self.db.deleteFeedItemsByDate(feed.m_feedId, targetDate, purgeUnreadItems)
-            self.db.updateFeedLastPurgedField(feed.m_feedId, targetDate)
-            self.feedPurgedSignal.emit(feed.m_feedId)
-
-        self.progressDialog.setValue(numFeeds-1)
-        self.removeDeletedItems()
-        self.db.vacuumDatabase()
-        self.messageSignal.emit("Feeds purged.", 10000)
+        self.startPurge(feedList, targetDate, purgeUnreadItems, "Feeds purged.")
 
     def purgeSingleFeed(self, feedId, priorDays, purgeUnreadItems):
         """ Purges a single feed. """
         feed = self.db.getFeed(feedId)
 
+        if self.isPurging():
+            return
+
         targetDate = self.calculateTargetDate(priorDays)
 
-        self.db.deleteFeedItemsByDate(feedId, targetDate, purgeUnreadItems)
-        self.db.updateFeedLastPurgedField(feedId, targetDate)
+        self.startPurge([feed], targetDate, purgeUnreadItems, "{} purged.".format(feed.m_feedTitle))
+
+    def startPurge(self, feedList, targetDate, purgeUnreadItems, purgeMessage):
+        """ Queues the purge of the given feeds on the database writer.  The purge is finished in onFeedPurged().
+            A feed's last-purged date is only updated (by the writer) once all of its feed items have been purged. """
+        self.numFeedsToPurge = len(feedList)
+        self.numFeedsPurged = 0
+        self.purgeMessage = purgeMessage
+
+        for feed in feedList:
+            self.dbWriter.purgeFeed(feed.m_feedId, targetDate, purgeUnreadItems)
+
+    def onPurgeProgress(self, feedId, itemsDeleted):
+        """ Called as a feed's items are being purged. """
+        message = "Purging {}: {} items deleted".format(self.db.getFeed(feedId).m_feedTitle, itemsDeleted)
+
+        if self.progressDialog is not None:
+            self.progressDialog.setLabelText(message)
+        else:
+            self.messageSignal.emit(message, 10000)
+
+    def onFeedPurged(self, feedId, itemsDeleted):
+        # The writer has set the feed's last-purged date
+        self.numFeedsPurged += 1
         self.feedPurgedSignal.emit(feedId)
 
-        self.removeDeletedItems()
-        self.db.vacuumDatabase()
-        self.messageSignal.emit("{} purged.".format(feed.m_feedTitle), 10000)
+        if self.progressDialog is not None:
+            self.progressDialog.setLabelText("Purged: {}".format(self.db.getFeed(feedId).m_feedTitle))
+            self.progressDialog.setValue(self.numFeedsPurged)
+
+        if self.numFeedsPurged == self.numFeedsToPurge:
+            self.closeProgressDialog()
+            self.messageSignal.emit(self.purgeMessage, 10000)
+            self.finishPurge()
+
+    def onPurgeCanceled(self):
+        # Feeds whose purge has not completed keep their last-purged dates
+        self.dbWriter.cancelPurges()
+        self.numFeedsToPurge = self.numFeedsPurged = 0
+        self.closeProgressDialog()
+        self.messageSignal.emit("Purge aborted.", 10000)
+        self.finishPurge()
+
+    def finishPurge(self):
+        self.dbWriter.removeDeletedItemsOfInterest()
+        self.reclaimSpace()
+
+    def reclaimSpace(self):
+        """ Returns the space freed by the purge to the file system, a batch of pages at a time. """
+        if not self.reclaimingSpace:
+            self.reclaimingSpace = True
+            self.bytesReclaimed = 0
+            self.dbWriter.incrementalVacuum()
+
+    def onIncrementalVacuumDone(self, bytesReclaimed, freePagesLeft):
+        if not self.reclaimingSpace:
+            return
+
+        self.bytesReclaimed += bytesReclaimed
+
+        if bytesReclaimed > 0 and freePagesLeft > 0:
+            QtCore.QTimer.singleShot(kIncrementalVacuumDelayMs, self.dbWriter.incrementalVacuum)
+        else:
+            self.reclaimingSpace = False
+
+            if self.bytesReclaimed > 0:
+                self.messageSignal.emit("Reclaimed {:.1f} MB of disk space.".format(self.bytesReclaimed / 1048576), 10000)
+
+    def closeProgressDialog(self):
+        if self.progressDialog is not None:
+            self.progressDialog.canceled.disconnect(self.onPurgeCanceled)
+            self.progressDialog.close()
+            self.progressDialog = None
 
     def calculateTargetDate(self, priorDays):
         """ Helper function to compute the targetDate, before which, feeds should be purged. """
         targetDate = datetime.datetime.today() + relativedelta(days=-priorDays)
         print("Today: {}, target date: {}".format(datetime.datetime.today(), targetDate))
         return targetDate
-
-    def removeDeletedItems(self):
-        """ Removes deleted items from the Items of Interest feed."""
-        self.db.beginTransaction()
-
-        ioiList = self.db.getItemsOfInterest()
-
-        for itemOfInterestTuple in ioiList:
-            feedId = itemOfInterestTuple[0]
-            guid = itemOfInterestTuple[1]
-            itemExists = self.db.feedItemExists(feedId, guid)
-            if not itemExists:
-                self.db.deleteItemOfInterest(feedId, guid)
-
-        self.db.endTransaction()
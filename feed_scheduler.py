@@ -0,0 +1,54 @@
+import datetime
+import random
+import statistics
+
+# Number of most recent feed items whose publication times determine a feed's posting interval
+kPostingHistorySize = 20
+
+# A feed is polled this many times per posting interval, so a new item waits at most about half an interval
+kPollsPerPostingInterval = 2
+
+# Poll times are moved by up to this fraction of the update interval, so feeds added (or updated) together do not
+# all become due at the same time
+kScheduleJitter = 0.1
+
+# Default longest time between updates of a feed, however rarely it posts
+kDefaultMaxUpdateIntervalMinutes = 24 * 60
+
+
+def getPostingIntervalMinutes(publicationTimes, now):
+    """ Returns a feed's typical time between posts, in minutes: the median gap between the given publication times
+        (as timestamps), counting the time since the newest one, so a feed that has stopped posting is polled less
+        and less often.  Returns None if there are no publication times. """
+    nowTimestamp = now.timestamp()
+    times = sorted(set(min(publicationTime, nowTimestamp) for publicationTime in publicationTimes))
+
+    if len(times) == 0:
+        return None
+
+    times = times[-kPostingHistorySize:] + [nowTimestamp]
+    gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+    return statistics.median(gaps) / 60
+
+
+def getUpdateIntervalMinutes(publicationTimes, now, minIntervalMinutes, maxIntervalMinutes):
+    """ Returns the time to wait before the next update of a feed, in minutes, within the given limits.  A feed
+        without any feed items is updated as often as the limits allow, until it has a posting history. """
+    postingInterval = getPostingIntervalMinutes(publicationTimes, now)
+
+    if postingInterval is None:
+        interval = minIntervalMinutes
+    else:
+        interval = postingInterval / kPollsPerPostingInterval
+
+    return min(max(interval, minIntervalMinutes), max(maxIntervalMinutes, minIntervalMinutes))
+
+
+def getNextUpdateTime(publicationTimes, now, minIntervalMinutes, maxIntervalMinutes):
+    """ Returns the time of the next update of a feed, with the given publication times (as timestamps). """
+    interval = getUpdateIntervalMinutes(publicationTimes, now, minIntervalMinutes, maxIntervalMinutes)
+
+    # The jitter is kept within the limits
+    shortestInterval = max(interval * (1 - kScheduleJitter), minIntervalMinutes)
+    longestInterval = max(min(interval * (1 + kScheduleJitter), maxIntervalMinutes), shortestInterval)
+    return now + datetime.timedelta(minutes=random.uniform(shortestInterval, longestInterval))
@@ -2,7 +2,7 @@ import logging
 from PySide6 import QtCore, QtGui, QtWidgets
 from feed import Feed
 from utility import getResourceFilePixmap
-from feed import kItemsOfInterestFeedId
+from feed import kItemsOfInterestFeedId, kSearchResultsFeedId
 from FeedPropertiesDlg import FeedPropertiesDialog
 
 kStarIcon = "star.png"
@@ -15,12 +15,14 @@ class FeedTree(QtCore.QObject):
     feedReadStateSignal = QtCore.Signal(int, bool)
     feedPurgeSignal = QtCore.Signal(int)
     feedDeleteSignal = QtCore.Signal(int)
+    feedShowArchiveSignal = QtCore.Signal(int)
 
-    def __init__(self, treeWidget, db, keyboardHandler):
+    def __init__(self, treeWidget, db, readStateBuffer, keyboardHandler):
         super(FeedTree, self).__init__()
 
         self.feedTree = treeWidget
         self.db = db
+        self.readStateBuffer = readStateBuffer      # Unread counts include the read flags not yet stored
         self.keyboardHandler = keyboardHandler
         self.lastClickedFeedId = -1     # ID of feed that was most-recently clicked
         self.feedTree.currentItemChanged.connect(self.onItemActivated)
@@ -39,6 +41,7 @@ class FeedTree(QtCore.QObject):
         self.m_actionMarkUnread = QtGui.QAction("Mark Feed As Unread")
         self.m_actionPurge = QtGui.QAction("Purge Feed")
         self.m_actionDeleteFeed = QtGui.QAction("Delete Feed")
+        self.m_actionShowArchive = QtGui.QAction("Show Archived Items")
         self.m_feedProperties = QtGui.QAction("Feed Properties")
 
         self.m_actionUpdate.triggered.connect(self.onActionUpdate)
@@ -47,12 +50,14 @@ class FeedTree(QtCore.QObject):
         self.m_actionMarkUnread.triggered.connect(self.onMarkFeedAsUnread)
         self.m_actionPurge.triggered.connect(self.onPurgeFeed)
         self.m_actionDeleteFeed.triggered.connect(self.onDeleteFeed)
+        self.m_actionShowArchive.triggered.connect(self.onShowArchive)
 
         self.m_contextMenu.addAction(self.m_actionUpdate)
         self.m_contextMenu.addAction(self.m_actionMarkRead)
         self.m_contextMenu.addAction(self.m_actionMarkUnread)
         self.m_contextMenu.addAction(self.m_actionPurge)
         self.m_contextMenu.addAction(self.m_actionDeleteFeed)
+        self.m_contextMenu.addAction(self.m_actionShowArchive)
         self.m_contextMenu.addSeparator()
         self.m_contextMenu.addAction(self.m_feedProperties)
 
@@ -110,22 +115,46 @@ class FeedTree(QtCore.QObject):
         ioiFeed.m_feedId = kItemsOfInterestFeedId
         return ioiFeed
 
-    def addFeedToTopLevel(self, feed):
-        feedIcon = QtGui.QIcon(feed.getFeedIcon())
+    def createSearchResultsFeed(self):
+        searchFeed = Feed()
+        searchFeed.m_feedName = "Search Results"
+        searchFeed.m_feedId = kSearchResultsFeedId
+        return searchFeed
+
+    def showSearchResultsFeed(self):
+        """ Selects the Search Results feed, adding it below the Items of Interest feed if it is not already present. """
+        item = self.findFeed(kSearchResultsFeedId)
+
+        if item is None:
+            item = self.createFeedTreeItem(self.createSearchResultsFeed())
+            self.feedTree.insertTopLevelItem(1, item)
+
+        self.feedTree.setCurrentItem(item)
+
+    def createFeedTreeItem(self, feed):
+        if feed.m_feedId in [kItemsOfInterestFeedId, kSearchResultsFeedId]:
+            feedIcon = QtGui.QIcon(feed.getFeedIcon())
+        else:
+            # The icons of actual feeds come from the database's icon cache, as feeds are read without their images
+            feedIcon = QtGui.QIcon(self.db.getFeedIcon(feed.m_feedId))
         pNewItem = QtWidgets.QTreeWidgetItem()
 
-        if feed.feedName():
-            pNewItem.setText(0, feed.feedName())
-            pNewItem.setData(0, QtCore.Qt.ItemDataRole.UserRole, feed.m_feedId)
-            pNewItem.setData(0, QtCore.Qt.ItemDataRole.UserRole+1, feed.feedName())
+        pNewItem.setText(0, feed.feedName())
+        pNewItem.setData(0, QtCore.Qt.ItemDataRole.UserRole, feed.m_feedId)
+        pNewItem.setData(0, QtCore.Qt.ItemDataRole.UserRole+1, feed.feedName())
+
+        if not feedIcon.isNull():
+            pNewItem.setIcon(0, feedIcon)
 
-            if not feedIcon.isNull():
-                pNewItem.setIcon(0, feedIcon)
+        curSizeHint = pNewItem.sizeHint(0)
+        curSizeHint.setHeight(kRowHeight)
 
-            curSizeHint = pNewItem.sizeHint(0)
-            curSizeHint.setHeight(kRowHeight)
+        pNewItem.setSizeHint(0, curSizeHint)
+        return pNewItem
 
-            pNewItem.setSizeHint(0, curSizeHint)
+    def addFeedToTopLevel(self, feed):
+        if feed.feedName():
+            pNewItem = self.createFeedTreeItem(feed)
 
             self.feedTree.addTopLevelItem(pNewItem)
             self.feedTree.setCurrentItem(pNewItem)
@@ -142,12 +171,21 @@ class FeedTree(QtCore.QObject):
             logging.error("FeedTree.removeFeed: feedId {} not found in tree.".format(feedId))
 
     def updateAllFeedCounts(self):
+        # Read the unread counts of all feeds at once, rather than querying each feed
+        unreadCounts = self.readStateBuffer.getAllUnreadCounts()
+
         curItem = self.feedTree.invisibleRootItem()
         curItem = curItem.child(0)
 
         while curItem is not None:
             curfeedId = self.feedIdForItem(curItem)
-            self.updateFeedCountForItem(curItem, curfeedId)
+            if curfeedId == kItemsOfInterestFeedId:
+                self.updateFeedCountForItem(curItem, curfeedId)
+            elif curfeedId == kSearchResultsFeedId:
+                # The unread count of the search results is set when the search is performed
+                pass
+            else:
+                self.setFeedCountForItem(curItem, unreadCounts.get(curfeedId, 0))
 
             curItem = self.feedTree.itemBelow(curItem)
 
@@ -161,13 +199,24 @@ class FeedTree(QtCore.QObject):
             item = self.findFeed(kItemsOfInterestFeedId)
             self.updateFeedCountForItem(item, kItemsOfInterestFeedId)
 
+    def setFeedCount(self, feedId, unreadItems):
+        """ Displays the given number of unread items for the given feed ID. """
+        item = self.findFeed(feedId)
+        if item is not None:
+            self.setFeedCountForItem(item, unreadItems)
+
     def updateFeedCountForItem(self, treeWidgetItem, feedId):
         """ Updates the feed count for the given tree widget item. """
-        feedName = self.feedNameForItem(treeWidgetItem)
         if feedId == kItemsOfInterestFeedId:
-            unreadItems = self.db.getUnreadCountForItemsOfInterest()
+            unreadItems = self.readStateBuffer.getUnreadCountForItemsOfInterest()
         else:
-            unreadItems = self.db.getFeedItemUnreadCount(feedId)
+            unreadItems = self.readStateBuffer.getFeedItemUnreadCount(feedId)
+
+        self.setFeedCountForItem(treeWidgetItem, unreadItems)
+
+    def setFeedCountForItem(self, treeWidgetItem, unreadItems):
+        """ Displays the given number of unread items on the given tree widget item. """
+        feedName = self.feedNameForItem(treeWidgetItem)
 
         itemFont = treeWidgetItem.font(0)
         itemFont.setBold(unreadItems > 0)
@@ -250,6 +299,9 @@ class FeedTree(QtCore.QObject):
         self.feedPurgeSignal.emit(self.lastClickedFeedId)
         self.updateFeedCount(self.lastClickedFeedId)
 
+    def onShowArchive(self):
+        self.feedShowArchiveSignal.emit(self.lastClickedFeedId)
+
     def onDeleteFeed(self):
         self.feedDeleteSignal.emit(self.lastClickedFeedId)
 
@@ -264,7 +316,7 @@ class FeedTree(QtCore.QObject):
 
         while curItem is not None:
             curfeedId = self.feedIdForItem(curItem)
-            if curfeedId != kItemsOfInterestFeedId:
+            if curfeedId != kItemsOfInterestFeedId and curfeedId != kSearchResultsFeedId:
                 feedIdList.append(str(curfeedId))
             curItem = self.feedTree.itemBelow(curItem)
 
@@ -1,49 +1,190 @@
 import datetime
-from feed_update_thread import FeedUpdateThread
-from feed_update_thread_debug import FeedUpdateThreadDebug
-from proxy import Proxy
+import time
+from feed_parse_task import FeedParseTask
+from feed_scheduler import getNextUpdateTime, kPostingHistorySize, kDefaultMaxUpdateIntervalMinutes
+from utility import dateToJulianDay
 from PySide6 import QtCore
 
 # Show feed update messages for 10 seconds
 kMessageTimeout = 10000
 
+# Default number of feeds fetched at the same time
+kDefaultMaxConcurrentUpdates = 16
+
 class FeedUpdater(QtCore.QObject):
-    # Emitted when feed items are available to be stored into the database.
-    # Parameters: feedID, list of feed items
-    feedItemUpdateSignal = QtCore.Signal(int, list)
+    """ Updates feeds, fetching up to maxConcurrentUpdates feeds at a time, so that a slow server only holds up its
+        own feed.  Feeds are fetched by the network fetcher, without blocking, and parsed on a pool of worker
+        threads.  Each feed's items are passed on as soon as the feed has been parsed.  Fetches are conditional on
+        the feed's ETag and Last-Modified validators, so a feed the server reports as not modified is not parsed.
+        Once a feed has been updated, its next update is scheduled from how often it posts.  The feed items, and the
+        changes to the feeds table, are stored by the database writer, so the updates do not write on the GUI
+        thread's connection. """
+
     feedUpdateMessageSignal = QtCore.Signal(str, int)
 
-    def __init__(self, db):
+    # Emitted when all the feeds passed to updateFeeds() have been updated
+    feedUpdatesDoneSignal = QtCore.Signal()
+
+    def __init__(self, db, dbWriter, networkFetcher):
         super(FeedUpdater, self).__init__()
         self.db = db
-        self.proxy = Proxy()
-        self.lastUpdatedDate = datetime.datetime.today()
+        self.dbWriter = dbWriter
+        self.networkFetcher = networkFetcher
+        self.threadPool = QtCore.QThreadPool(self)
+        self.maxConcurrentUpdates = kDefaultMaxConcurrentUpdates
+
+        # Default limits of the time between updates of a feed, in minutes
+        self.minUpdateInterval = 30
+        self.maxUpdateInterval = kDefaultMaxUpdateIntervalMinutes
+
+        # Feeds being updated, keyed by feed ID.  Each value is a tuple of the form: (lastUpdatedDate, lastPurgedDate)
+        self.pendingFeeds = {}
+        self.feedIdsToFetch = []        # Feeds waiting for a fetch slot
+        self.fetchRequests = {}         # Fetches in progress, keyed by feed ID
+        self.tasks = {}                 # Parse tasks, keyed by feed ID
+
+        # Changed validators (a tuple of the form: (etag, lastModified)) of the responses being parsed, keyed by feed
+        # ID.  They are only stored with the feed items, so they are not stored if the feed could not be parsed, or
+        # its update was canceled.
+        self.validators = {}
+        self.numFeedsToUpdate = 0
+        self.numFeedsUpdated = 0
+        self.numFeedsNotModified = 0
+        self.startTime = 0
+
+    def setMaxConcurrentUpdates(self, maxConcurrentUpdates):
+        self.maxConcurrentUpdates = max(maxConcurrentUpdates, 1)
+
+    def setUpdateIntervals(self, minUpdateInterval, maxUpdateInterval):
+        """ Sets the default shortest and longest times between updates of a feed, in minutes.  (These apply to
+            feeds that do not have their own.) """
+        self.minUpdateInterval = max(minUpdateInterval, 1)
+        self.maxUpdateInterval = max(maxUpdateInterval, self.minUpdateInterval)
 
-    def updateFeed(self, feedId, proxy):
+    def isUpdating(self):
+        return len(self.pendingFeeds) > 0
+
+    def updateFeed(self, feedId):
         """ Updates the given feed. """
-        self.feedId = feedId
-        feed = self.db.getFeed(feedId)
-        self.lastUpdatedDate = feed.m_feedLastUpdated
-        self.lastPurgedDate = feed.m_feedLastPurged
-        guids = self.db.getFeedItemGuids(feedId)
-        self.proxy = proxy
+        self.updateFeeds([feedId])
+
+    def updateFeeds(self, feedIdList):
+        """ Updates the given feeds.  Feeds already being updated are skipped. """
+        if not self.isUpdating():
+            self.numFeedsToUpdate = 0
+            self.numFeedsUpdated = 0
+            self.numFeedsNotModified = 0
+            self.startTime = time.monotonic()
+
+        for feedId in feedIdList:
+            if feedId in self.pendingFeeds:
+                continue
+
+            feed = self.db.getFeed(feedId)
+            self.pendingFeeds[feedId] = (feed.m_feedLastUpdated, feed.m_feedLastPurged)
+            self.feedIdsToFetch.append(feedId)
+            self.numFeedsToUpdate += 1
+
+        if len(feedIdList) == 1:
+            self.feedUpdateMessageSignal.emit("Updating {}".format(self.db.getFeed(feedIdList[0]).m_feedTitle), kMessageTimeout)
+
+        self.fetchNextFeeds()
+
+    def fetchNextFeeds(self):
+        """ Starts fetching waiting feeds, until maxConcurrentUpdates feeds are being fetched. """
+        while self.feedIdsToFetch and len(self.fetchRequests) < self.maxConcurrentUpdates:
+            feedId = self.feedIdsToFetch.pop(0)
+            feed = self.db.getFeed(feedId)
+            fetchRequest = self.networkFetcher.fetchFeed(feed.m_feedUrl, feed.m_etag, feed.m_lastModified)
+            fetchRequest.fetchDoneSignal.connect(lambda fetchRequest, feedId=feedId: self.onFeedFetched(feedId, fetchRequest))
+            self.fetchRequests[feedId] = fetchRequest
 
-        updateMessage = "Updating {}".format(feed.m_feedTitle)
+    def onFeedFetched(self, feedId, fetchRequest):
+        if self.fetchRequests.get(feedId) is not fetchRequest:
+            return      # The update was canceled
+
+        del self.fetchRequests[feedId]
+        feedText = fetchRequest.getData()
+
+        if fetchRequest.isNotModified():
+            # The feed has not changed since it was last fetched, so there are no new items
+            self.numFeedsNotModified += 1
+            self.onFeedUpdateDone(feedId, [])
+        elif feedText is None:
+            self.onFeedUpdateDone(feedId, [])
+        else:
+            feed = self.db.getFeed(feedId)
+            if (fetchRequest.etag, fetchRequest.lastModified) != (feed.m_etag, feed.m_lastModified):
+                self.validators[feedId] = (fetchRequest.etag, fetchRequest.lastModified)
+
+            task = FeedParseTask(feedId, feedText)
+            task.signals.feedParseDoneSignal.connect(self.onFeedUpdateDone)
+            task.signals.feedParseFailedSignal.connect(self.onFeedParseFailed)
+            self.tasks[feedId] = task
+            self.threadPool.start(task)
+
+        self.fetchNextFeeds()
+
+    def onFeedParseFailed(self, feedId):
+        # The feed's validators are dropped, so the feed is fetched in full next time
+        self.validators.pop(feedId, None)
+        self.onFeedUpdateDone(feedId, [])
+
+    def onFeedUpdateDone(self, feedId, feedItemList):
+        if feedId not in self.pendingFeeds:
+            return      # The update was canceled
+
+        lastUpdatedDate, lastPurgedDate = self.pendingFeeds.pop(feedId)
+        validators = self.validators.pop(feedId, None)
+        self.tasks.pop(feedId, None)
+        self.numFeedsUpdated += 1
+
+        if self.db.getFeed(feedId).isValid():       # The feed may have been deleted while it was being updated
+            self.dbWriter.updateFeedLastUpdatedField(feedId, datetime.datetime.today())
+            self.scheduleNextUpdate(feedId, feedItemList)
+
+            finalFeedItemList = []
+            for feedItem in feedItemList:
+                if feedItem.m_publicationDatetime >= lastUpdatedDate and \
+                    feedItem.m_publicationDatetime >= lastPurgedDate:
+                    finalFeedItemList.append(feedItem)
+
+            # The main window is notified once the writer has stored the feed items
+            self.dbWriter.ingestFeedItems(feedId, finalFeedItemList, validators)
+
+        elapsedTime = max(time.monotonic() - self.startTime, 0.001)
+        updateMessage = "Updated {} of {} feeds ({:.1f} feeds/s, {} not modified)".format(self.numFeedsUpdated,
+                                                                                          self.numFeedsToUpdate,
+                                                                                          self.numFeedsUpdated / elapsedTime,
+                                                                                          self.numFeedsNotModified)
         self.feedUpdateMessageSignal.emit(updateMessage, kMessageTimeout)
 
-        self.feedUpdateThread = FeedUpdateThread(feed.m_feedUrl, guids, self.proxy)
-        # self.feedUpdateThread = FeedUpdateThreadDebug(feed.m_feedUrl, guids, self.proxy)
-        self.feedUpdateThread.feedUpdateDoneSignal.connect(self.onFeedUpdateDone)
-        self.feedUpdateThread.start()
+        if not self.isUpdating():
+            self.feedUpdatesDoneSignal.emit()
+
+    def scheduleNextUpdate(self, feedId, feedItemList):
+        """ Schedules the next update of the given feed, from the publication times of its stored feed items and
+            of the feed items just fetched. """
+        feed = self.db.getFeed(feedId)
+        minUpdateInterval = feed.m_minUpdateInterval or self.minUpdateInterval
+        maxUpdateInterval = feed.m_maxUpdateInterval or self.maxUpdateInterval
+
+        publicationTimes = self.db.getFeedPublicationTimes(feedId, kPostingHistorySize)
+        publicationTimes.extend(dateToJulianDay(feedItem.m_publicationDatetime) for feedItem in feedItemList)
+
+        nextUpdate = getNextUpdateTime(publicationTimes, datetime.datetime.today(), minUpdateInterval, maxUpdateInterval)
+        self.dbWriter.setFeedNextUpdate(feedId, nextUpdate)
 
-    def onFeedUpdateDone(self, feedItemList):
-        self.db.updateFeedLastUpdatedField(self.feedId, datetime.datetime.today())
+    def cancel(self):
+        """ Cancels the feed updates.  Feeds being parsed are finished, but not stored. """
+        fetchRequests = list(self.fetchRequests.values())
+        self.fetchRequests.clear()
+        self.feedIdsToFetch.clear()
+        self.pendingFeeds.clear()
+        self.validators.clear()
 
-        finalFeedItemList = []
-        for feedItem in feedItemList:
-            if feedItem.m_publicationDatetime >= self.lastUpdatedDate and \
-                feedItem.m_publicationDatetime >= self.lastPurgedDate:
-                finalFeedItemList.append(feedItem)
+        for fetchRequest in fetchRequests:
+            fetchRequest.cancel()
 
-        # Pass this on up to the main window
-        self.feedItemUpdateSignal.emit(self.feedId, finalFeedItemList)
+        self.threadPool.clear()
+        self.tasks.clear()
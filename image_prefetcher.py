@@ -9,12 +9,14 @@ class ImagePrefetcher(QtCore.QObject):
     # Signal emitted when all images have been fetched.
     imagePrefetchDoneSignal = QtCore.Signal()
 
-    def __init__(self, db, imageCache, proxy):
+    def __init__(self, readConnections, imageCache, networkFetcher):
         super(ImagePrefetcher, self).__init__()
-        self.db = db
-        self.proxy = proxy
+        self.readConnections = readConnections
+        self.networkFetcher = networkFetcher
         self.imageCache = imageCache
         self.imagePrefetchThread = None
+        self.fetchRequests = set()      # Image fetches in progress
+        self.prefetchFeed = None        # Feed of the images being fetched
         self.feedItemList = None
         self.feed = None
 
@@ -25,19 +27,24 @@ class ImagePrefetcher(QtCore.QObject):
         self.feed = feed
 
         # If prefetching is ongoing, terminate it before starting a new fetch
-        if self.imagePrefetchThread is not None:
-            # The thread's finished() signal will trigger the onPrefetchDone slot to be called,
-            # which will start the next request.
-            self.imagePrefetchThread.abortFetching()
+        if self.isPrefetching():
+            # Once the current prefetch has been aborted, checkPrefetchDone() will start the next request.
+            self.abortPrefetching()
         else:
             self.startPrefetchThread()
 
-    def startPrefetchThread(self):
-        feedItems = self.db.getFeedItemsFromList(self.feedItemList)
+    def isPrefetching(self):
+        return self.imagePrefetchThread is not None or len(self.fetchRequests) > 0
+
+    def abortPrefetching(self):
+        for fetchRequest in list(self.fetchRequests):
+            fetchRequest.cancel()
 
-        self.imagePrefetchThread = ImagePrefetchThread(feedItems, self.feed, self.proxy)
-        self.imagePrefetchThread.imageReadySignal.connect(self.onImagePrefetched)
-        self.imagePrefetchThread.finished.connect(self.onPrefetchDone)
+    def startPrefetchThread(self):
+        # The thread finds the image URLs of the feed items; the images are then fetched by the network fetcher
+        self.imagePrefetchThread = ImagePrefetchThread(self.readConnections, self.feedItemList)
+        self.imagePrefetchThread.imageUrlsFoundSignal.connect(self.onImageUrlsFound)
+        self.prefetchFeed = self.feed
 
         self.imagePrefetchStartingSignal.emit()
 
@@ -46,19 +53,39 @@ class ImagePrefetcher(QtCore.QObject):
         self.feed = None
         self.imagePrefetchThread.start()
 
-    @QtCore.Slot(tuple)
-    def onImagePrefetched(self, imageTuple):
+    @QtCore.Slot(list)
+    def onImageUrlsFound(self, imageUrlList):
+        self.imagePrefetchThread.wait()
+        self.imagePrefetchThread = None
+
+        if self.feedItemList is None:
+            # Not superseded by a newer prefetch request
+            for url in imageUrlList:
+                if not self.imageCache.contains(url):
+                    fetchRequest = self.networkFetcher.fetchImage(url, self.prefetchFeed.m_feedWebPageLink)
+                    fetchRequest.fetchDoneSignal.connect(lambda fetchRequest, url=url: self.onImagePrefetched(url, fetchRequest))
+                    self.fetchRequests.add(fetchRequest)
+
+        self.checkPrefetchDone()
+
+    def onImagePrefetched(self, url, fetchRequest):
         """ Called when an image has been fetched. """
-        url = imageTuple[0]
-        image = imageTuple[1]
-        self.imageCache.addImage(url, image)
-        #print("Just added image: {} (cache length: {})".format(url, self.imageCache.cacheSize()))
+        self.fetchRequests.discard(fetchRequest)
+
+        # Note: if the feed's web page link needed to be added, the original url (without the web page link)
+        # is what will be used as the key in the image cache, since the HTML will contain only the urls
+        # without the web page link prepended.
+        if not fetchRequest.isCanceled():
+            self.imageCache.addImage(url, fetchRequest.getDataAsPixmap())
+
+        self.checkPrefetchDone()
+
+    def checkPrefetchDone(self):
+        if self.isPrefetching():
+            return
 
-    @QtCore.Slot()
-    def onPrefetchDone(self):
         if self.feedItemList is not None:
             # There is a prefetch request pending
             self.startPrefetchThread()
         else:
-            self.imagePrefetchThread = None
             self.imagePrefetchDoneSignal.emit()
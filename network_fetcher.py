@@ -0,0 +1,150 @@
+import logging
+from urllib.parse import urlparse
+from PySide6 import QtCore, QtGui, QtNetwork
+from proxy import Proxy
+
+# Time a fetch may go without receiving any data before it is aborted
+kDefaultTimeoutMs = 30000
+
+# HTTP status of a conditional fetch whose resource has not changed
+kHttpNotModified = 304
+
+kUserAgent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:120.0) Gecko/20100101 Firefox/120.0'
+
+
+def getFaviconUrl(webPageLink):
+    """ Returns the URL of the favicon of the web site of the given page. """
+    parsedUri = urlparse(webPageLink)
+    return '{uri.scheme}://{uri.netloc}/favicon.ico'.format(uri=parsedUri)
+
+
+class FetchRequest(QtCore.QObject):
+    """ A fetch started by NetworkFetcher.  fetchDoneSignal is emitted once, when the fetch has completed, failed,
+        or been canceled. """
+
+    # Parameter: this FetchRequest
+    fetchDoneSignal = QtCore.Signal(object)
+
+    def __init__(self, url, reply):
+        super(FetchRequest, self).__init__()
+        self.url = url
+        self.reply = reply
+        self.data = None
+        self.canceled = False
+        self.statusCode = None          # HTTP status code (None for non-HTTP URLs, or if there was no response)
+        self.etag = ""                  # ETag header of the response
+        self.lastModified = ""          # Last-Modified header of the response
+
+        self.reply.finished.connect(self.onFinished)
+
+    def cancel(self):
+        """ Aborts the fetch.  fetchDoneSignal is still emitted, with no data. """
+        if self.reply is not None:
+            self.canceled = True
+            self.reply.abort()
+
+    def isCanceled(self):
+        return self.canceled
+
+    def isNotModified(self):
+        """ Returns True if a conditional fetch found the resource unchanged.  There is no data in this case. """
+        return self.statusCode == kHttpNotModified
+
+    def getData(self):
+        """ Returns the fetched data, as bytes, or None if the fetch failed. """
+        return self.data
+
+    def getDataAsPixmap(self):
+        """ Returns the data as a pixmap. """
+        pixmap = QtGui.QPixmap()
+
+        if self.data is not None:
+            pixmap.loadFromData(self.data)
+
+        return pixmap
+
+    @QtCore.Slot()
+    def onFinished(self):
+        self.statusCode = self.reply.attribute(QtNetwork.QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+
+        if self.reply.error() == QtNetwork.QNetworkReply.NetworkError.NoError:
+            # A 304 (Not Modified) response has no data
+            if not self.isNotModified():
+                self.data = self.reply.readAll().data()
+                self.etag = self.reply.rawHeader("ETag").data().decode("latin-1")
+                self.lastModified = self.reply.rawHeader("Last-Modified").data().decode("latin-1")
+        elif not self.canceled:
+            logging.error("Could not fetch {}: {}".format(self.url, self.reply.errorString()))
+
+        self.reply.deleteLater()
+        self.reply = None
+        self.fetchDoneSignal.emit(self)
+
+
+class NetworkFetcher(QtCore.QObject):
+    """ Fetches resources without blocking, using one QNetworkAccessManager for all of the application's fetches.
+        Fetches run concurrently on the thread that owns the fetcher (the GUI thread), so no thread is needed per
+        fetch.  Each fetch returns a FetchRequest, which signals when it is done and can be canceled.  The manager
+        keeps connections alive, so feeds and images from the same host reuse its connections, and it asks for
+        compressed transfers (gzip, deflate, and any other encodings Qt was built with), which it decodes.  The
+        proxy only applies to this manager. """
+    def __init__(self, parent=None):
+        super(NetworkFetcher, self).__init__(parent)
+        self.networkAccessManager = QtNetwork.QNetworkAccessManager(self)
+        self.activeRequests = set()
+
+    def setProxy(self, proxy: Proxy):
+        if proxy.usesProxy():
+            networkProxy = QtNetwork.QNetworkProxy(QtNetwork.QNetworkProxy.ProxyType.HttpProxy, proxy.proxyUrl,
+                                                   proxy.proxyPort, proxy.proxyUser, proxy.proxyPassword)
+        else:
+            networkProxy = QtNetwork.QNetworkProxy(QtNetwork.QNetworkProxy.ProxyType.NoProxy)
+
+        self.networkAccessManager.setProxy(networkProxy)
+
+    def fetch(self, url, timeoutMs=kDefaultTimeoutMs, etag="", lastModified=""):
+        """ Starts fetching the given URL.  Returns a FetchRequest.  If the ETag or Last-Modified header of a
+            previous response is given, the fetch is conditional: if the resource has not changed, the server
+            responds with 304 (Not Modified) instead of the resource. """
+        request = QtNetwork.QNetworkRequest(QtCore.QUrl(url))
+        request.setHeader(QtNetwork.QNetworkRequest.KnownHeaders.UserAgentHeader, kUserAgent)
+        request.setTransferTimeout(timeoutMs)
+
+        if etag:
+            request.setRawHeader(b"If-None-Match", etag.encode("latin-1"))
+
+        if lastModified:
+            request.setRawHeader(b"If-Modified-Since", lastModified.encode("latin-1"))
+
+        fetchRequest = FetchRequest(url, self.networkAccessManager.get(request))
+        fetchRequest.fetchDoneSignal.connect(self.onFetchDone)
+        self.activeRequests.add(fetchRequest)
+        return fetchRequest
+
+    def fetchFeed(self, feedUrl, etag="", lastModified="", timeoutMs=kDefaultTimeoutMs):
+        """ Fetches a feed.  The feed's validators (from the previous fetch) make the fetch conditional. """
+        return self.fetch(feedUrl, timeoutMs, etag, lastModified)
+
+    def fetchImage(self, imageUrl, webPageLink, timeoutMs=kDefaultTimeoutMs):
+        """ Fetches an image.  Image URLs without a scheme are relative to the given web page link. """
+        if not imageUrl.startswith("http"):
+            if imageUrl.startswith("//"):
+                # In this case, we just need to add "https:"
+                imageUrl = "https:{}".format(imageUrl)
+            else:
+                imageUrl = "{}{}".format(webPageLink, imageUrl)
+
+        return self.fetch(imageUrl, timeoutMs)
+
+    def fetchFavicon(self, webPageLink, timeoutMs=kDefaultTimeoutMs):
+        """ Fetches the favicon of the web site of the given page. """
+        return self.fetch(getFaviconUrl(webPageLink), timeoutMs)
+
+    def cancelAll(self):
+        """ Aborts all the fetches in progress. """
+        for fetchRequest in list(self.activeRequests):
+            fetchRequest.cancel()
+
+    @QtCore.Slot(object)
+    def onFetchDone(self, fetchRequest):
+        self.activeRequests.discard(fetchRequest)
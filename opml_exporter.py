@@ -15,7 +15,7 @@ class OpmlExporter:
         outfile.close()
 
     def createDomTree(self):
-        feeds = self.db.getFeeds()
+        feeds = self.db.getFeeds(includeImages=True)
 
         root = etree.Element('opml', version='1.0')
         doc = etree.ElementTree(root)
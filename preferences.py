@@ -1,5 +1,6 @@
 # Preferences
 from encrypter import Encrypter
+from database_profile import DatabaseProfile
 import logging
 
 class Preferences:
@@ -7,10 +8,16 @@ class Preferences:
         self.encrypter = Encrypter()
 
         # Initialize default preferences
-        self.feedUpdateInterval = 30
+        self.feedUpdateInterval = 30                # Shortest time between updates of a feed, in minutes
+        self.maxFeedUpdateIntervalHours = 24        # Longest time between updates of a feed
+        self.maxConcurrentUpdates = 16              # Number of feeds fetched at the same time
         self.updateOnAppStart = False
         self.minimizeAppOnLoseFocus = False
         self.enclosureDirectory = ""
+        self.databaseProfile = DatabaseProfile()    # SQLite settings applied when the database is opened
+        self.archiveDays = 0                        # Read feed items older than this are archived (0: never)
+        self.backupIntervalHours = 24               # Time between database snapshots (0: never)
+        self.backupCount = 5                        # Number of database snapshots kept
         self.encryptedInstapaperUsername = b''       # This is stored encrypted
         self.encryptedInstapaperPassword = b''       # This is stored encrypted
 
@@ -1,9 +1,10 @@
 from PySide6 import QtCore, QtWidgets
 from proxy import Proxy
+from database_profile import kJournalModes, kSynchronousLevels, kTempStoreMemory, kTempStoreDefault
 from ui_PrefsDlg import Ui_PrefsDlg
 
 class PrefsDialog(QtWidgets.QDialog):
-    def __init__(self, parent, proxy: Proxy, preferences):
+    def __init__(self, parent, proxy: Proxy, preferences, db):
         super(PrefsDialog, self).__init__(parent)
 
         self.ui = Ui_PrefsDlg()
@@ -11,6 +12,7 @@ class PrefsDialog(QtWidgets.QDialog):
 
         self.proxy = proxy
         self.preferences = preferences
+        self.db = db
 
         self.populate()
 
@@ -26,6 +28,8 @@ class PrefsDialog(QtWidgets.QDialog):
 
         # Feed updating
         self.ui.intervalSpin.setValue(self.preferences.feedUpdateInterval)
+        self.ui.maxIntervalSpin.setValue(self.preferences.maxFeedUpdateIntervalHours)
+        self.ui.maxConcurrentUpdatesSpin.setValue(self.preferences.maxConcurrentUpdates)
         self.ui.updateOnStartCheckbox.setChecked(self.preferences.updateOnAppStart)
 
         self.ui.minimizeOnFocusOutCheckbox.setChecked(self.preferences.minimizeAppOnLoseFocus)
@@ -33,12 +37,33 @@ class PrefsDialog(QtWidgets.QDialog):
         # Enclosures
         self.ui.directoryLineEdit.setText(self.preferences.enclosureDirectory)
 
+        # Database
+        profile = self.preferences.databaseProfile
+        if profile.journalMode in kJournalModes:
+            self.ui.journalModeCombo.setCurrentIndex(kJournalModes.index(profile.journalMode))
+        if profile.synchronous in kSynchronousLevels:
+            self.ui.synchronousCombo.setCurrentIndex(kSynchronousLevels.index(profile.synchronous))
+        self.ui.cacheSizeSpin.setValue(profile.cacheSizeMb)
+        self.ui.mmapSizeSpin.setValue(profile.mmapSizeMb)
+        self.ui.busyTimeoutSpin.setValue(profile.busyTimeoutMs)
+        self.ui.tempStoreMemoryCheckbox.setChecked(profile.tempStore == kTempStoreMemory)
+        self.ui.compressBodiesCheckbox.setChecked(profile.compressBodies)
+        self.ui.archiveDaysSpin.setValue(self.preferences.archiveDays)
+        self.ui.backupIntervalSpin.setValue(self.preferences.backupIntervalHours)
+        self.ui.backupCountSpin.setValue(self.preferences.backupCount)
+
     @QtCore.Slot()
     def on_browseButton_clicked(self):
         directory = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Enclosure Directory")
         if directory:
             self.ui.directoryLineEdit.setText(directory)
 
+    @QtCore.Slot()
+    def on_showDatabaseSettingsButton_clicked(self):
+        pragmas = self.db.getEffectivePragmas()
+        text = "\n".join("{}: {}".format(name, value) for name, value in pragmas.items())
+        QtWidgets.QMessageBox.information(self, "Database Settings", text)
+
     def getProxySettings(self):
         """ Returns a Proxy object containing settings from the dialog. """
         self.proxy.proxyUrl = self.ui.proxyHostnameLineEdit.text()
@@ -50,8 +75,22 @@ class PrefsDialog(QtWidgets.QDialog):
     def getPreferences(self):
         """ Returns the feed update interval. """
         self.preferences.feedUpdateInterval = self.ui.intervalSpin.value()
+        self.preferences.maxFeedUpdateIntervalHours = self.ui.maxIntervalSpin.value()
+        self.preferences.maxConcurrentUpdates = self.ui.maxConcurrentUpdatesSpin.value()
         self.preferences.updateOnAppStart = self.ui.updateOnStartCheckbox.isChecked()
         self.preferences.minimizeAppOnLoseFocus = self.ui.minimizeOnFocusOutCheckbox.isChecked()
         self.preferences.enclosureDirectory = self.ui.directoryLineEdit.text()
+
+        profile = self.preferences.databaseProfile
+        profile.journalMode = kJournalModes[self.ui.journalModeCombo.currentIndex()]
+        profile.synchronous = kSynchronousLevels[self.ui.synchronousCombo.currentIndex()]
+        profile.cacheSizeMb = self.ui.cacheSizeSpin.value()
+        profile.mmapSizeMb = self.ui.mmapSizeSpin.value()
+        profile.busyTimeoutMs = self.ui.busyTimeoutSpin.value()
+        profile.tempStore = kTempStoreMemory if self.ui.tempStoreMemoryCheckbox.isChecked() else kTempStoreDefault
+        profile.compressBodies = self.ui.compressBodiesCheckbox.isChecked()
+        self.preferences.archiveDays = self.ui.archiveDaysSpin.value()
+        self.preferences.backupIntervalHours = self.ui.backupIntervalSpin.value()
+        self.preferences.backupCount = self.ui.backupCountSpin.value()
         return self.preferences
 
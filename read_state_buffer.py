@@ -0,0 +1,120 @@
+from PySide6 import QtCore
+
+# Time after the first buffered change that the buffered read flags are written to the database
+kFlushIntervalMs = 300
+
+
+class ReadStateBuffer(QtCore.QObject):
+    """ Buffers the read flags set by the user (for example, when stepping through feed items with the keyboard),
+        so that they are written to the database in one transaction every kFlushIntervalMs, rather than one
+        transaction each.  Read flags that have not yet been stored are applied to the unread counts and feed item
+        headers read from the database, so the UI reflects them immediately.  flush() must be called before the
+        database writer is closed, so no read flags are lost on exit. """
+    def __init__(self, db, dbWriter, parent):
+        super(ReadStateBuffer, self).__init__(parent)
+        self.db = db
+        self.dbWriter = dbWriter
+        self.dbWriter.readFlagsSetSignal.connect(self.onReadFlagsSet)
+
+        # Read flags that have not been stored yet, keyed by (feedId, guid).  Each value is a tuple of the form:
+        # (storedReadFlag, readFlag).  Read flags waiting to be flushed are in pending; read flags that have been
+        # passed to the writer, but not yet stored, are in flushing.
+        self.pending = {}
+        self.flushing = {}
+
+        self.flushTimer = QtCore.QTimer(self)
+        self.flushTimer.setSingleShot(True)
+        self.flushTimer.setInterval(kFlushIntervalMs)
+        self.flushTimer.timeout.connect(self.flush)
+
+    def bufferedEntries(self):
+        """ Returns the read flags that have not been stored yet, keyed by (feedId, guid). """
+        entries = dict(self.flushing)
+        entries.update(self.pending)        # Pending read flags are newer than those being flushed
+        return entries
+
+    def setFeedItemReadFlag(self, feedId, guid, readFlag):
+        """ Sets the read flag of the given feed item. """
+        key = (feedId, guid)
+        entry = self.pending.get(key) or self.flushing.get(key)
+        storedReadFlag = entry[0] if entry is not None else self.db.isFeedItemRead(feedId, guid)
+        currentReadFlag = entry[1] if entry is not None else storedReadFlag
+
+        if readFlag == currentReadFlag:
+            return
+
+        self.pending[key] = (storedReadFlag, readFlag)
+
+        if not self.flushTimer.isActive():
+            self.flushTimer.start()
+
+    def setFeedReadFlagAllItems(self, feedId, readFlag):
+        """ Sets the read flag of all feed items in the given feed.  This replaces the feed's buffered read flags. """
+        self.discardFeed(feedId)
+        self.dbWriter.setFeedReadFlagAllItems(feedId, readFlag)
+
+    def discardFeed(self, feedId):
+        """ Drops the buffered read flags of the given feed (for example, when the feed is deleted). """
+        self.pending = {key: entry for key, entry in self.pending.items() if key[0] != feedId}
+
+    @QtCore.Slot()
+    def flush(self):
+        """ Passes the buffered read flags to the database writer, which stores them in one transaction. """
+        self.flushTimer.stop()
+
+        readFlagList = [(feedId, guid, entry[1]) for (feedId, guid), entry in self.pending.items()]
+
+        if len(readFlagList) > 0:
+            self.flushing.update(self.pending)
+            self.pending = {}
+            self.dbWriter.setFeedItemReadFlags(readFlagList)
+
+    def onReadFlagsSet(self, readFlagList):
+        """ Called when the writer has stored read flags passed to it by flush(). """
+        for feedId, guid, readFlag in readFlagList:
+            key = (feedId, guid)
+
+            # The database now holds readFlag
+            for entries in [self.flushing, self.pending]:
+                if key in entries:
+                    entries[key] = (readFlag, entries[key][1])
+
+            if key in self.flushing and self.flushing[key][1] == readFlag:
+                del self.flushing[key]
+
+    def unreadCountChange(self, feedId):
+        """ Returns the difference between the unread count of the given feed and the unread count stored in the
+            database. """
+        return sum(int(storedReadFlag) - int(readFlag)
+                   for key, (storedReadFlag, readFlag) in self.bufferedEntries().items() if key[0] == feedId)
+
+    def getFeedItemUnreadCount(self, feedId):
+        return self.db.getFeedItemUnreadCount(feedId) + self.unreadCountChange(feedId)
+
+    def getUnreadCountForItemsOfInterest(self):
+        change = sum(int(storedReadFlag) - int(readFlag)
+                     for (feedId, guid), (storedReadFlag, readFlag) in self.bufferedEntries().items()
+                     if storedReadFlag != readFlag and self.db.isItemOfInterest(feedId, guid))
+
+        return self.db.getUnreadCountForItemsOfInterest() + change
+
+    def getAllUnreadCounts(self):
+        unreadCounts = self.db.getAllUnreadCounts()
+
+        for feedId in {key[0] for key in self.bufferedEntries()}:
+            unreadCounts[feedId] = unreadCounts.get(feedId, 0) + self.unreadCountChange(feedId)
+
+        return unreadCounts
+
+    def applyReadFlags(self, feedItemHeaderList):
+        """ Sets the read flags of the given feed item headers (read from the database) to their buffered values. """
+        entries = self.bufferedEntries()
+
+        if len(entries) > 0:
+            for feedItemHeader in feedItemHeaderList:
+                entry = entries.get((feedItemHeader.m_parentFeedId, feedItemHeader.m_guid))
+
+                if entry is not None:
+                    feedItemHeader.m_bRead = entry[1]
+
+        return feedItemHeaderList
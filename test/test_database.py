@@ -0,0 +1,821 @@
+import os
+import tempfile
+import threading
+import http.server
+import datetime
+from unittest import TestCase, mock
+from PySide6 import QtCore, QtGui, QtSql
+from database import Database, kDatabaseVersionId, kCurrentDatabaseVersion
+from database_profile import DatabaseProfile
+from body_codec import kBodyCodecZlib
+from database_writer import DatabaseWriter
+from database_backup import DatabaseBackup
+from database_connections import ReadConnectionProvider
+from feed_updater import FeedUpdater
+import feed_icon_cache
+from feed_scheduler import getUpdateIntervalMinutes, getNextUpdateTime
+from network_fetcher import NetworkFetcher
+from read_state_buffer import ReadStateBuffer
+from feed import Feed
+from feed_item import FeedItem
+from pathlib import Path
+
+app = QtGui.QGuiApplication.instance() or QtGui.QGuiApplication([])
+
+
+def createFeedItem(guid, title="Title", readFlag=False, pubDate=datetime.datetime(2024, 1, 1)):
+    feedItem = FeedItem()
+    feedItem.m_guid = guid
+    feedItem.m_title = title
+    feedItem.m_description = "<p>Description of {}</p>".format(title)
+    feedItem.m_encodedContent = "<p>Content of {}</p>".format(title)
+    feedItem.m_publicationDatetime = pubDate
+    feedItem.m_thumbnailSize = QtCore.QSize(0, 0)
+    feedItem.m_bRead = readFlag
+    return feedItem
+
+
+def createVersion7Database(pathName, feedItemTables, itemsOfInterest=()):
+    """ Creates a database using the version 7 layout (one FeedItems table per feed).
+        feedItemTables maps a feed ID to a list of (guid, readflag) tuples. """
+    connection = QtSql.QSqlDatabase.addDatabase("QSQLITE", "version7")
+    connection.setDatabaseName(pathName)
+    connection.open()
+
+    queryObj = QtSql.QSqlQuery(connection)
+    queryObj.exec("create table globals (key text UNIQUE, datatype int, intval int, stringval text, blobval blob)")
+    queryObj.exec("insert into globals (key, datatype, intval) values ('{}', 0, 7)".format(kDatabaseVersionId))
+    queryObj.exec("create table feeds (feedid integer primary key, name text, url text, parentid integer, added integer, "
+                  "lastupdated integer, title text, language text, description text, webpagelink text, favicon blob, "
+                  "image blob, lastpurged integer default 0)")
+    queryObj.exec("create table itemsofinterest (feedid integer, guid text)")
+
+    for feedId, guid in itemsOfInterest:
+        queryObj.exec("insert into itemsofinterest (feedid, guid) values ({}, '{}')".format(feedId, guid))
+
+    for feedId, rows in feedItemTables.items():
+        tableName = "FeedItems{:06}".format(feedId)
+        queryObj.exec("insert into feeds (feedid, name, url, added, lastupdated) values ({}, 'Feed', 'url', 0, 0)".format(feedId))
+        queryObj.exec("create table {} (title text, author text, link text, description text, categories text, "
+                      "pubdatetime integer, thumbnaillink text, thumbnailwidth integer, thumbnailheight integer, "
+                      "guid text UNIQUE, feedburneroriglink text, readflag integer, enclosurelink text, "
+                      "enclosurelength integer, enclosuretype text, contentencoded text)".format(tableName))
+
+        for guid, readFlag in rows:
+            queryObj.prepare("insert into {} (title, author, categories, pubdatetime, thumbnailwidth, thumbnailheight, guid, readflag) "
+                             "values (?, '', '', 0, 0, 0, ?, ?)".format(tableName))
+            queryObj.addBindValue("Title {}".format(guid))
+            queryObj.addBindValue(guid)
+            queryObj.addBindValue(readFlag)
+            queryObj.exec()
+
+    queryObj.finish()
+    del queryObj
+    connection.close()
+    del connection
+    QtSql.QSqlDatabase.removeDatabase("version7")
+
+
+class TestDatabase(TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.dbPath = os.path.join(self.tempDir.name, "Feeds.db")
+        self.db = Database()
+
+    def tearDown(self):
+        self.db.close()
+        self.tempDir.cleanup()
+
+    def addFeed(self):
+        feed = Feed()
+        feed.m_feedTitle = "Test Feed"
+        feed.m_feedUrl = "https://example.com/feed"
+        return self.db.addFeed(feed).m_feedId
+
+    def test_feedIcons(self):
+        self.db.open(self.dbPath)
+        image = QtGui.QPixmap(64, 64)
+        image.fill(QtGui.QColor("red"))
+
+        feedIds = []
+        for _ in range(2):
+            feed = Feed()
+            feed.m_feedUrl = "https://example.com/feed"
+            feed.m_feedImage = image
+            feedIds.append(self.db.addFeed(feed).m_feedId)
+
+        self.assertTrue(self.db.getFeed(feedIds[0]).m_feedImage.isNull())
+        self.assertFalse(self.db.getFeed(feedIds[0], includeImages=True).getFeedIcon().isNull())
+
+        # Feeds with the same image share one scaled icon
+        icon = self.db.getFeedIcon(feedIds[0])
+        self.assertEqual(icon.size(), QtCore.QSize(32, 32))
+        self.assertIs(self.db.getFeedIcon(feedIds[1]), icon)
+        self.assertTrue(self.db.getFeedIcon(self.addFeed()).isNull())
+
+    def test_feedIconsDecodedOnce(self):
+        image = QtGui.QPixmap(64, 64)
+        image.fill(QtGui.QColor("blue"))
+        imageBytes = QtCore.QByteArray()
+        imageBuffer = QtCore.QBuffer(imageBytes)
+        imageBuffer.open(QtCore.QIODevice.OpenModeFlag.WriteOnly)
+        image.save(imageBuffer, "PNG")
+
+        iconCache = feed_icon_cache.FeedIconCache()
+        with mock.patch("feed_icon_cache.decodeIcon", wraps=feed_icon_cache.decodeIcon) as decodeIcon:
+            # Two feeds with identical favicon bytes (in separate byte arrays, as read from the database)
+            icon = iconCache.addIcon(1, QtCore.QByteArray(imageBytes.data()), None)
+            self.assertIs(iconCache.addIcon(2, QtCore.QByteArray(imageBytes.data()), None), icon)
+            self.assertEqual(decodeIcon.call_count, 1)
+
+            # Invalid image data is only decoded once too, and the feed falls back to its favicon
+            self.assertIs(iconCache.addIcon(3, QtCore.QByteArray(imageBytes.data()), QtCore.QByteArray(b"junk")), icon)
+            self.assertIs(iconCache.addIcon(4, QtCore.QByteArray(imageBytes.data()), QtCore.QByteArray(b"junk")), icon)
+            self.assertEqual(decodeIcon.call_count, 2)
+
+        self.assertEqual(icon.size(), QtCore.QSize(32, 32))
+
+    def test_feedCache(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        otherFeedId = self.addFeed()
+
+        feed = self.db.getFeed(feedId)
+        feed.m_feedTitle = "Changed"
+        self.assertEqual(self.db.getFeed(feedId).m_feedTitle, "Test Feed")
+
+        self.db.updateFeedLastUpdatedField(feedId, datetime.datetime(2024, 2, 1))
+        self.assertEqual(self.db.getFeed(feedId).m_feedLastUpdated.replace(tzinfo=None), datetime.datetime(2024, 2, 1))
+
+        self.db.setFeedValidators(otherFeedId, '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+        self.assertEqual(self.db.getFeed(otherFeedId).m_etag, '"v1"')
+
+        self.db.deleteFeed(feedId)
+        self.assertEqual(self.db.getFeedIds(), [otherFeedId])
+        self.assertFalse(self.db.getFeed(feedId).isValid())
+
+        # The cache is read when the database is opened
+        self.db.close()
+        self.db.open(self.dbPath)
+        self.assertEqual([feed.m_feedId for feed in self.db.getFeeds()], [otherFeedId])
+        self.assertEqual(self.db.getFeed(otherFeedId).m_lastModified, "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    def test_addAndRetrieveFeedItems(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        otherFeedId = self.addFeed()
+
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b", readFlag=True)], feedId)
+        self.db.ingestFeedItems([createFeedItem("a")], otherFeedId)
+
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(feedId)), ["a", "b"])
+        self.assertEqual(sorted((header.m_guid, header.m_bRead) for header in self.db.getFeedItemHeaders(feedId)),
+                         [("a", False), ("b", True)])
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 1)
+        self.assertEqual(self.db.getFeedItem("b", feedId).m_title, "Title")
+        self.assertIsNone(self.db.getFeedItem("b", otherFeedId))
+
+        self.db.deleteFeed(feedId)
+        self.assertEqual(self.db.getFeedItems(feedId), [])
+        self.assertEqual(len(self.db.getFeedItems(otherFeedId)), 1)
+
+    def test_ingestReturnsOnlyNewItems(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        otherFeedId = self.addFeed()
+
+        newItems = self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b"), createFeedItem("a", title="Again")], feedId)
+        self.assertEqual([item.m_guid for item in newItems], ["a", "b"])
+
+        guids = ["guid{}".format(i) for i in range(450)]
+        newItems = self.db.ingestFeedItems([createFeedItem(guid) for guid in ["b", "c"] + guids], feedId)
+        self.assertEqual([item.m_guid for item in newItems], ["c"] + guids)
+
+        self.assertEqual(self.db.ingestFeedItems([createFeedItem("c")], feedId), [])
+        self.assertEqual(len(self.db.ingestFeedItems([createFeedItem("c")], otherFeedId)), 1)
+        self.assertEqual(self.db.getFeedItem("a", feedId).m_title, "Title")
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 453)
+
+    def test_databaseWriter(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+
+        writer = DatabaseWriter()
+        ingested = []
+        changed = []
+        writer.feedItemsIngestedSignal.connect(lambda feedId, feedItemList: ingested.append([item.m_guid for item in feedItemList]))
+        writer.feedItemsChangedSignal.connect(changed.append)
+
+        writer.open(self.dbPath, DatabaseProfile())
+        writer.ingestFeedItems(feedId, [createFeedItem("a"), createFeedItem("b")])
+        writer.ingestFeedItems(feedId, [createFeedItem("b"), createFeedItem("c")])
+        writer.setFeedItemReadFlags([(feedId, "a", True)])
+        writer.close()
+        app.processEvents()
+
+        self.assertEqual(ingested, [["a", "b"], ["c"]])
+        self.assertEqual(changed, [feedId])
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 2)
+        self.assertTrue(self.db.isFeedItemRead(feedId, "a"))
+
+    def test_failedWriteIsRolledBack(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+
+        writer = DatabaseWriter()
+        synced = []
+        writer.syncedSignal.connect(lambda: synced.append(True))
+
+        def failingWrite():
+            writer.db.beginTransaction()
+            writer.db.executeQuery("update feeds set title='Failed' where feedid=?", (feedId,))
+            raise RuntimeError("Failed write")
+
+        writer.open(self.dbPath, DatabaseProfile())
+        writer.ingestFeedItems(feedId, [createFeedItem("a")])
+        writer.queueCommand(failingWrite)
+        writer.ingestFeedItems(feedId, [createFeedItem("b")])
+        writer.sync()
+        while not synced:
+            app.processEvents()
+
+        # The other writes were committed, and the write lock has been released
+        self.db.executeQuery("pragma busy_timeout=100", cache=False)
+        self.db.setGlobalValue("test", 1)
+        self.assertEqual(self.db.getGlobalValue("test"), 1)
+        self.assertEqual(self.db.fetchOne("select title from feeds where feedid=?", (feedId,))[0], "Test Feed")
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(feedId)), ["a", "b"])
+        writer.close()
+
+    def test_purgeFeed(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("old{}".format(i), readFlag=(i % 2 == 0), pubDate=datetime.datetime(2020, 1, 1))
+                                 for i in range(10)] + [createFeedItem("new")], feedId)
+        self.db.addItemOfInterest(feedId, "old0")
+        self.db.addItemOfInterest(feedId, "old1")
+
+        writer = DatabaseWriter()
+        purged = []
+        writer.feedPurgedSignal.connect(lambda feedId, itemsDeleted: purged.append((feedId, itemsDeleted)))
+        writer.feedChangedSignal.connect(self.db.refreshCachedFeed)
+
+        with mock.patch("database_writer.kPurgeChunkSize", 2):
+            writer.open(self.dbPath, DatabaseProfile())
+            writer.purgeFeed(feedId, datetime.datetime(2021, 1, 1), False)
+            writer.removeDeletedItemsOfInterest()
+            writer.close()
+        app.processEvents()
+
+        self.assertEqual(purged, [(feedId, 5)])
+        self.assertEqual(self.db.getFeed(feedId).m_feedLastPurged.replace(tzinfo=None), datetime.datetime(2021, 1, 1))
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(feedId)),
+                         ["new", "old1", "old3", "old5", "old7", "old9"])
+        self.assertEqual(self.db.getItemsOfInterest(), [(feedId, "old1")])
+
+    def test_retentionPolicy(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.setFeedRetentionPolicy(feedId, 30, 3, True, True)
+        self.assertEqual(self.db.getFeed(feedId).m_retentionItems, 3)
+
+        today = datetime.datetime.today()
+        feedItemList = [createFeedItem("expired", readFlag=True, pubDate=today - datetime.timedelta(days=60)),
+                        createFeedItem("unread", pubDate=today - datetime.timedelta(days=50))] + \
+                       [createFeedItem("item{}".format(i), readFlag=True, pubDate=today - datetime.timedelta(days=10 - i))
+                        for i in range(4)]
+        self.db.ingestFeedItems(feedItemList, feedId)
+        self.db.addItemOfInterest(feedId, "item0")
+
+        # The unread item and the Item of Interest are kept, so the feed stays above its limit
+        self.assertEqual(self.db.applyRetentionPolicy(feedId), 3)
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(feedId)), ["item0", "item3", "unread"])
+
+        self.db.setFeedRetentionPolicy(feedId, 30, 1, False, False)
+        self.assertEqual(self.db.applyRetentionPolicy(feedId), 2)
+        self.assertEqual(self.db.getFeedItemCount(feedId), 1)
+        self.assertEqual(self.db.getItemsOfInterest(), [])
+
+        # The feed items deleted by the item limit are not added again while the feed still lists them
+        newFeedItemList = self.db.ingestFeedItems(feedItemList + [createFeedItem("fresh", pubDate=today)], feedId)
+        self.assertEqual([item.m_guid for item in newFeedItemList], ["fresh"])
+
+    def test_archive(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        oldFeedItem = createFeedItem("old", "Archived", readFlag=True, pubDate=datetime.datetime(2020, 1, 1))
+        oldFeedItem.m_description = "<p>Description of an archived feed item</p>" * 10
+        self.db.ingestFeedItems([oldFeedItem,
+                                 createFeedItem("older", readFlag=True, pubDate=datetime.datetime(2019, 1, 1)),
+                                 createFeedItem("unread", "Unread", pubDate=datetime.datetime(2020, 1, 1)),
+                                 createFeedItem("new", "Recent", readFlag=True)], feedId)
+
+        # The feed items are copied to the archive, and then deleted from the main database in a later transaction.
+        # If the database writer is stopped in between, it deletes them when it is next started.
+        self.assertEqual(self.db.archiveFeedItems(feedId, datetime.datetime(2023, 1, 1)), 2)
+        self.assertEqual(len(self.db.getFeedItemHeaders(feedId)), 4)
+        self.assertTrue(self.db.isArchiveMovePending())
+
+        writer = DatabaseWriter()
+        archived = []
+        writer.feedItemsArchivedSignal.connect(archived.append)
+        writer.open(self.dbPath, DatabaseProfile())
+        writer.archiveFeedItems([feedId], datetime.datetime(2023, 1, 1))
+        while len(archived) == 0:
+            app.processEvents()
+        writer.close()
+
+        self.assertEqual(archived, [0])
+        self.assertTrue(os.path.isfile(os.path.join(self.tempDir.name, "Feeds-archive.db")))
+
+        self.assertEqual(sorted(header.m_guid for header in self.db.getFeedItemHeaders(feedId)), ["new", "unread"])
+        self.assertEqual(sorted(header.m_guid for header in self.db.getFeedItemHeaders(feedId, includeArchive=True)),
+                         ["new", "old", "older", "unread"])
+        self.assertEqual(self.db.getFeedItem("old", feedId).m_description, oldFeedItem.m_description)
+        self.assertEqual(self.db.fetchOne("select bodycodec from archive.items where guid='old'")[0], kBodyCodecZlib)
+        self.assertEqual([header.m_guid for header in self.db.searchItems("archived")], ["old"])
+
+        readConnections = ReadConnectionProvider()
+        readConnections.open(self.dbPath, DatabaseProfile())
+        self.assertEqual(readConnections.connection().getFeedItem("old", feedId).m_title, "Archived")
+        readConnections.closeConnection()
+
+        # An archived feed item that is fetched again is not added again
+        self.assertEqual(self.db.ingestFeedItems([createFeedItem("old"), createFeedItem("newer")], feedId)[0].m_guid, "newer")
+
+        # Adding an archived feed item to the Items of Interest moves it back to the main database
+        self.db.addItemOfInterest(feedId, "old")
+        self.assertTrue(self.db.feedItemExists(feedId, "old"))
+        self.assertEqual(len(self.db.getFeedItemHeaders(feedId, includeArchive=True)), 5)
+        self.assertEqual(self.db.archiveFeedItems(feedId, datetime.datetime(2023, 1, 1)), 0)
+
+        # A purge also deletes archived feed items
+        self.assertEqual(self.db.deleteFeedItemsByDate(feedId, datetime.datetime(2019, 6, 1), False), 1)
+        self.assertEqual(self.db.fetchOne("select count(*) from archive.items")[0], 0)
+
+    def test_databaseBackup(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b"),
+                                 createFeedItem("old", readFlag=True, pubDate=datetime.datetime(2020, 1, 1))], feedId)
+        self.db.archiveFeedItems(feedId, datetime.datetime(2023, 1, 1))
+        self.db.deleteArchivedFeedItems(feedId)
+
+        backup = DatabaseBackup(None)
+        backup.open(self.dbPath)
+        backup.setSchedule(24, 2)
+        for name in ["20200101-000000", "20200102-000000"]:
+            os.makedirs(os.path.join(self.tempDir.name, "Backups", name))
+
+        backup.backUpIfDue()
+        while backup.isBackingUp():
+            app.processEvents()
+
+        snapshots = backup.getSnapshots()
+        self.assertEqual([os.path.basename(snapshot) for snapshot in snapshots[:1]], ["20200102-000000"])
+        self.assertEqual(sorted(os.listdir(snapshots[-1])), ["Feeds-archive.db", "Feeds.db"])
+
+        snapshot = Database()
+        snapshot.open(os.path.join(snapshots[-1], "Feeds.db"), connectionName="snapshot", readOnly=True)
+        self.assertEqual(sorted(header.m_guid for header in snapshot.getFeedItemHeaders(feedId)), ["a", "b"])
+        self.assertEqual(sorted(header.m_guid for header in snapshot.getFeedItemHeaders(feedId, includeArchive=True)), ["a", "b", "old"])
+        snapshot.close()
+
+        # The newest snapshot is recent, so no backup is due
+        backup.backUpIfDue()
+        self.assertFalse(backup.isBackingUp())
+
+    def test_writeDuringBackup(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("item{}".format(i)) for i in range(200)], feedId)
+
+        writer = DatabaseWriter()
+        events = []
+        writer.feedItemsIngestedSignal.connect(lambda feedId, feedItemList: events.append("ingested"))
+        writer.open(self.dbPath, DatabaseProfile())
+        backup = DatabaseBackup(None)
+        backup.open(self.dbPath)
+
+        # The snapshot is copied a page at a time, so the write is performed between two steps.  The write restarts
+        # the copy, which is then taken again.
+        with mock.patch("database_backup.kBackupPagesPerStep", 1), mock.patch("database_backup.kBackupStepDelaySec", 0.01), \
+                mock.patch("database_backup.kBackupRetryDelaySec", 0):
+            backup.backUp()
+            writer.ingestFeedItems(feedId, [createFeedItem("new")])
+            while backup.isBackingUp():
+                app.processEvents()
+            events.append("snapshot")
+
+        writer.close()
+        self.assertEqual(events, ["ingested", "snapshot"])
+
+        snapshot = Database()
+        snapshot.open(os.path.join(backup.getSnapshots()[-1], "Feeds.db"), connectionName="snapshot", readOnly=True)
+        self.assertTrue(snapshot.feedItemExists(feedId, "new"))
+        snapshot.close()
+
+    def test_feedUpdater(self):
+        self.db.open(self.dbPath)
+
+        feedIds = []
+        for index in range(5):
+            pathName = os.path.join(self.tempDir.name, "feed{}.xml".format(index))
+            with open(pathName, "w") as feedFile:
+                feedFile.write('<?xml version="1.0"?><rss version="2.0"><channel><title>Feed</title>'
+                               '<item><title>Item</title><guid>guid{}</guid><pubDate>Mon, 01 Jan 2035 00:00:00 +0000</pubDate>'
+                               '</item></channel></rss>'.format(index))
+
+            feed = Feed()
+            feed.m_feedUrl = Path(pathName).as_uri()
+            feedIds.append(self.db.addFeed(feed).m_feedId)
+
+        writer = DatabaseWriter()
+        writer.feedChangedSignal.connect(self.db.refreshCachedFeed)
+        writer.open(self.dbPath, DatabaseProfile())
+        feedUpdater = FeedUpdater(self.db, writer, NetworkFetcher())
+        feedUpdater.setMaxConcurrentUpdates(2)
+        updates = {}
+        doneSignals = []
+        writer.feedItemsIngestedSignal.connect(lambda feedId, feedItems: updates.update({feedId: [feedItem.m_guid for feedItem in feedItems]}))
+        feedUpdater.feedUpdatesDoneSignal.connect(lambda: doneSignals.append(True))
+
+        feedUpdater.updateFeeds(feedIds)
+        while feedUpdater.isUpdating():
+            app.processEvents()
+
+        # The feed updates are stored by the writer
+        writer.close()
+        app.processEvents()
+
+        self.assertEqual(updates, {feedId: ["guid{}".format(index)] for index, feedId in enumerate(feedIds)})
+        self.assertEqual(doneSignals, [True])
+
+        # Each updated feed has been scheduled for its next update
+        now = datetime.datetime.today()
+        self.assertGreater(self.db.getFeed(feedIds[0]).m_feedLastUpdated.replace(tzinfo=None), now - datetime.timedelta(minutes=1))
+        self.assertEqual(self.db.getDueFeedIds(now), [])
+        self.assertEqual(sorted(self.db.getDueFeedIds(now + datetime.timedelta(days=2))), feedIds)
+
+    def test_feedSchedule(self):
+        now = datetime.datetime(2024, 6, 1, 12, 0)
+        busyFeedTimes = [(now - datetime.timedelta(minutes=10 * i)).timestamp() for i in range(30)]
+        rareFeedTimes = [(now - datetime.timedelta(days=180 * i)).timestamp() for i in range(1, 4)]
+
+        self.assertEqual(getUpdateIntervalMinutes(busyFeedTimes, now, 1, 1440), 5)
+        self.assertEqual(getUpdateIntervalMinutes(busyFeedTimes, now, 30, 1440), 30)
+        self.assertEqual(getUpdateIntervalMinutes(rareFeedTimes, now, 30, 1440), 1440)
+        self.assertEqual(getUpdateIntervalMinutes([], now, 30, 1440), 30)
+
+        # Update times are jittered, within the limits
+        nextUpdateTimes = {getNextUpdateTime(rareFeedTimes, now, 30, 1440) for _ in range(10)}
+        self.assertGreater(len(nextUpdateTimes), 1)
+        self.assertTrue(all(now + datetime.timedelta(hours=21) <= nextUpdateTime <= now + datetime.timedelta(hours=24)
+                            for nextUpdateTime in nextUpdateTimes))
+
+    def test_conditionalFeedFetch(self):
+        class FeedRequestHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                body = b'<rss version="2.0"><channel><title>Feed</title><item><title>Item</title><guid>a</guid>' \
+                       b'<pubDate>Mon, 01 Jan 2035 00:00:00 +0000</pubDate></item></channel></rss>'
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), FeedRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        self.db.open(self.dbPath)
+        feed = Feed()
+        feed.m_feedUrl = "http://127.0.0.1:{}/feed".format(server.server_port)
+        feedId = self.db.addFeed(feed).m_feedId
+
+        writer = DatabaseWriter()
+        writer.feedChangedSignal.connect(self.db.refreshCachedFeed)
+        synced = []
+        writer.syncedSignal.connect(lambda: synced.append(True))
+        writer.open(self.dbPath, DatabaseProfile())
+        self.addCleanup(writer.close)
+
+        feedUpdater = FeedUpdater(self.db, writer, NetworkFetcher())
+
+        def updateFeed():
+            feedUpdater.updateFeed(feedId)
+            while feedUpdater.isUpdating():
+                app.processEvents()
+
+            # Wait until the writer has stored the update
+            synced.clear()
+            writer.sync()
+            while not synced:
+                app.processEvents()
+
+        # The validators are only stored with the feed items, so they are not stored if the feed cannot be parsed
+        with mock.patch("feed_parse_task.parseFeed", side_effect=ValueError("Parse error")):
+            updateFeed()
+
+        self.assertEqual(self.db.getFeed(feedId).m_etag, "")
+        self.assertEqual(self.db.getFeedItemCount(feedId), 0)
+
+        updateFeed()
+        self.assertEqual(self.db.getFeed(feedId).m_etag, '"v1"')
+        self.assertEqual(self.db.getFeedItemCount(feedId), 1)
+        self.assertEqual(feedUpdater.numFeedsNotModified, 0)
+
+        updateFeed()
+        self.assertEqual(feedUpdater.numFeedsNotModified, 1)
+
+    def test_readStateBuffer(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b"), createFeedItem("c", readFlag=True)], feedId)
+        self.db.addItemOfInterest(feedId, "a")
+
+        writer = DatabaseWriter()
+        writer.open(self.dbPath, DatabaseProfile())
+        readStateBuffer = ReadStateBuffer(self.db, writer, None)
+
+        readStateBuffer.setFeedItemReadFlag(feedId, "a", True)
+        readStateBuffer.setFeedItemReadFlag(feedId, "c", False)
+        readStateBuffer.setFeedItemReadFlag(feedId, "b", True)
+        readStateBuffer.setFeedItemReadFlag(feedId, "b", False)
+
+        # Nothing has been stored yet, but the counts and headers include the buffered read flags
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 2)
+        self.assertEqual(readStateBuffer.getFeedItemUnreadCount(feedId), 2)
+        self.assertEqual(readStateBuffer.getAllUnreadCounts(), {feedId: 2})
+        self.assertEqual(readStateBuffer.getUnreadCountForItemsOfInterest(), 0)
+        headers = readStateBuffer.applyReadFlags(self.db.getFeedItemHeaders(feedId))
+        self.assertEqual(sorted((header.m_guid, header.m_bRead) for header in headers), [("a", True), ("b", False), ("c", False)])
+
+        readStateBuffer.flush()
+        readStateBuffer.setFeedItemReadFlag(feedId, "b", True)
+        self.assertEqual(readStateBuffer.getFeedItemUnreadCount(feedId), 1)
+
+        # As on exit, the buffer is flushed before the writer is closed
+        readStateBuffer.flush()
+        writer.close()
+        app.processEvents()
+
+        self.assertEqual(readStateBuffer.bufferedEntries(), {})
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 1)
+        self.assertEqual(readStateBuffer.getFeedItemUnreadCount(feedId), 1)
+        self.assertTrue(self.db.isFeedItemRead(feedId, "a"))
+        self.assertFalse(self.db.isFeedItemRead(feedId, "c"))
+
+    def test_readConnections(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b")], feedId)
+
+        readConnections = ReadConnectionProvider()
+        readConnections.open(self.dbPath, DatabaseProfile())
+        results = []
+
+        class ReaderThread(QtCore.QThread):
+            def run(self):
+                db = readConnections.connection()
+                results.append(db is readConnections.connection())
+                results.append([item.m_guid for item in db.getFeedItemsFromList([(feedId, "b"), (feedId, "x")])])
+                results.append(db.getFeed(feedId).m_feedTitle)
+                results.append(QtSql.QSqlDatabase.connectionNames())
+
+        thread = ReaderThread()
+        thread.start()
+        thread.wait()
+
+        self.assertEqual(results[:3], [True, ["b"], "Test Feed"])
+        self.assertEqual(len(results[3]), 2)
+        self.assertEqual(len(QtSql.QSqlDatabase.connectionNames()), 1)      # Closed when the thread finished
+
+    def test_searchItems(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        otherFeedId = self.addFeed()
+
+        feedItem = createFeedItem("a", title="Apollo launch")
+        feedItem.m_encodedContent = "<p>The <b>Saturn&nbsp;V</b> rocket</p><script>var hidden = 1;</script>"
+        self.db.ingestFeedItems([feedItem, createFeedItem("b", title="Gemini"), createFeedItem("c", title="Saturn rings")], feedId)
+        self.db.ingestFeedItems([createFeedItem("d", title="Apollo program")], otherFeedId)
+
+        # The search does not wait for the feed items to be indexed
+        self.assertTrue(self.db.isSearchIndexPending())
+        self.assertEqual(self.db.searchItems("rocket"), [])
+
+        # The feed items are indexed by the database writer, continuing in a later transaction once its time is up
+        writer = DatabaseWriter()
+        with mock.patch("database_writer.kPurgeTimeSliceSec", 0):
+            writer.open(self.dbPath, DatabaseProfile())
+            writer.indexSearchItems()
+            writer.indexSearchItems()
+            writer.close()
+
+        self.assertFalse(self.db.isSearchIndexPending())
+        self.assertEqual([header.m_guid for header in self.db.searchItems("rocket")], ["a"])
+        self.assertEqual(sorted(header.m_guid for header in self.db.searchItems("saturn")), ["a", "c"])
+        self.assertEqual(sorted(header.m_guid for header in self.db.searchItems("apol*")), ["a", "d"])
+        self.assertEqual([header.m_guid for header in self.db.searchItems('"saturn v"')], ["a"])
+        self.assertEqual(self.db.searchItems("hidden"), [])
+        self.assertEqual(self.db.searchItems('AND ("'), [])
+        self.assertEqual(len(self.db.searchItems("description", limit=2)), 2)
+        self.assertEqual(len(self.db.searchItems("description", limit=10, offset=3)), 1)
+
+        self.db.deleteFeedItem(feedId, "a")
+        self.assertEqual(self.db.searchItems("rocket"), [])
+        self.db.deleteFeed(otherFeedId)
+        self.assertEqual(self.db.searchItems("apollo"), [])
+
+    def test_globalValues(self):
+        self.db.open(self.dbPath)
+        self.db.setGlobalValue("count", 5)
+        self.db.setGlobalValue("count", 6)
+        self.db.setGlobalValue("name", "value")
+        self.db.setGlobalValue("name", 7)
+        self.db.setGlobalValue("blob", QtCore.QByteArray(b"data"))
+        self.db.setFeedOrder([3, 1, 2])
+        self.db.close()
+
+        self.db.open(self.dbPath)
+        self.assertEqual(self.db.getGlobalValue("count"), 6)
+        self.assertEqual(self.db.getGlobalValue("name"), 7)
+        self.assertEqual(bytes(self.db.getGlobalValue("blob")), b"data")
+        self.assertEqual(self.db.getFeedOrder(), [3, 1, 2])
+        self.assertEqual(self.db.getGlobalValue(kDatabaseVersionId), kCurrentDatabaseVersion)
+        self.assertIsNone(self.db.getGlobalValue("missing"))
+        self.assertFalse(self.db.isPocketInitialized())
+
+    def test_bodyCompression(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+
+        sameBody = createFeedItem("same")
+        sameBody.m_description = sameBody.m_encodedContent = "<p>{}</p>".format("Lorem ipsum dolor sit amet. " * 20)
+        self.db.ingestFeedItems([sameBody, createFeedItem("different")], feedId)
+
+        feedItem = self.db.getFeedItem("same", feedId)
+        self.assertEqual(feedItem.m_description, sameBody.m_description)
+        self.assertEqual(feedItem.m_encodedContent, sameBody.m_description)
+        self.assertEqual(self.db.getFeedItem("different", feedId).m_encodedContent, "<p>Content of Title</p>")
+
+        while self.db.indexPendingItems() > 0:
+            pass
+
+        self.assertEqual([header.m_guid for header in self.db.searchItems("lorem")], ["same"])
+
+        # Switching off compression rewrites the stored items as plain text
+        profile = DatabaseProfile()
+        profile.compressBodies = False
+        self.db.applyProfile(profile)
+        lastItemId, bytesBefore, bytesAfter = self.db.recompressFeedItems(0)
+        self.assertIsNotNone(lastItemId)
+        self.assertGreater(bytesAfter, bytesBefore)
+        self.assertEqual(self.db.recompressFeedItems(lastItemId), (None, 0, 0))
+        self.assertEqual(self.db.getFeedItem("same", feedId).m_encodedContent, sameBody.m_description)
+
+        # The database writer records a completed recompression, so the feed items are not read again
+        writer = DatabaseWriter()
+        recompressed = []
+        writer.feedItemsRecompressedSignal.connect(lambda bytesBefore, bytesAfter: recompressed.append(bytesBefore))
+
+        with mock.patch.object(Database, "recompressFeedItems", autospec=True,
+                               side_effect=Database.recompressFeedItems) as recompressFeedItems:
+            writer.open(self.dbPath, profile)
+            writer.recompressFeedItems()
+            writer.recompressFeedItems()
+            writer.close()
+        app.processEvents()
+
+        self.assertEqual(recompressed, [0, 0])
+        self.assertEqual(recompressFeedItems.call_count, 1)
+
+    def test_databaseProfile(self):
+        self.db.open(self.dbPath)
+        pragmas = self.db.getEffectivePragmas()
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["synchronous"], 1)
+        self.assertEqual(pragmas["cache_size"], -64 * 1024)
+
+        profile = DatabaseProfile()
+        profile.journalMode = "DELETE"
+        profile.synchronous = "FULL"
+        profile.busyTimeoutMs = 250
+        self.db.applyProfile(profile)
+        pragmas = self.db.getEffectivePragmas()
+        self.assertEqual(pragmas["journal_mode"], "delete")
+        self.assertEqual(pragmas["synchronous"], 2)
+        self.assertEqual(pragmas["busy_timeout"], 250)
+
+    def test_migrateFeedItemTables(self):
+        createVersion7Database(self.dbPath, {1: [("a", 0), ("b", 1), ("c", 0)], 2: [("a", 1)]},
+                               [(1, "a"), (1, "a"), (2, "a")])
+
+        self.db.open(self.dbPath)
+
+        self.assertEqual(self.db.getGlobalValue(kDatabaseVersionId), kCurrentDatabaseVersion)
+        self.assertEqual(self.db.getLegacyFeedItemsTableNames(), [])
+        self.assertIsNone(self.db.fetchOne("select name from sqlite_master where name='itemsbodycodec'"))
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(1)), ["a", "b", "c"])
+        self.assertEqual(self.db.getAllUnreadCounts(), {1: 2, 2: 0})
+        self.assertTrue(self.db.isFeedItemRead(2, "a"))
+        self.assertEqual(self.db.getItemsOfInterest(), [(1, "a"), (2, "a")])
+
+        # The migrated feed items are waiting to be indexed
+        self.assertTrue(self.db.isSearchIndexPending())
+        while self.db.indexPendingItems() > 0:
+            pass
+
+        self.assertEqual(sorted(header.m_guid for header in self.db.searchItems("Title")), ["a", "a", "b", "c"])
+        self.assertEqual(self.db.getPragmaValue("auto_vacuum"), 2)      # Incremental
+
+    def test_incrementalVacuum(self):
+        self.db.open(self.dbPath)
+        self.assertEqual(self.db.getPragmaValue("auto_vacuum"), 2)      # Incremental
+        feedId = self.addFeed()
+
+        feedItems = [createFeedItem("guid{}".format(i)) for i in range(300)]
+        for feedItem in feedItems:
+            feedItem.m_description = os.urandom(2000).hex()
+        self.db.ingestFeedItems(feedItems, feedId)
+        self.db.deleteFeedItemsByDate(feedId, datetime.datetime(2030, 1, 1), True)
+
+        freePages = self.db.getPragmaValue("freelist_count")
+        self.assertGreater(freePages, 10)
+
+        bytesReclaimed, freePagesLeft = self.db.incrementalVacuum(10)
+        self.assertEqual(bytesReclaimed, 10 * self.db.getPragmaValue("page_size"))
+        self.assertEqual(freePagesLeft, freePages - 10)
+
+        self.db.incrementalVacuum(freePages)
+        self.assertEqual(self.db.incrementalVacuum(), (0, 0))
+
+    def test_migrationResumesAfterInterruption(self):
+        createVersion7Database(self.dbPath, {1: [("a", 0), ("b", 1), ("c", 0), ("d", 0), ("e", 1)]})
+
+        # Abort the migration after its first batch has been committed
+        with mock.patch("database.kMigrationBatchSize", 2), \
+             mock.patch("database.QtCore.QCoreApplication.processEvents", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.db.open(self.dbPath)
+
+        self.assertEqual(self.db.getLegacyFeedItemsTableNames(), ["FeedItems000001"])
+        self.assertEqual(self.db.getGlobalValue(kDatabaseVersionId), 7)
+        self.db.close()
+
+        with mock.patch("database.kMigrationBatchSize", 2):
+            self.db.open(self.dbPath)
+
+        self.assertEqual(self.db.getLegacyFeedItemsTableNames(), [])
+        self.assertEqual(sorted(item.m_guid for item in self.db.getFeedItems(1)), ["a", "b", "c", "d", "e"])
+        self.assertEqual(self.db.getFeedItemUnreadCount(1), 3)
+
+    def test_unreadCountsFollowItemChanges(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        otherFeedId = self.addFeed()
+
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b"), createFeedItem("c", readFlag=True)], feedId)
+        self.db.ingestFeedItems([createFeedItem("a")], otherFeedId)
+        self.assertEqual(self.db.getAllUnreadCounts(), {feedId: 2, otherFeedId: 1})
+
+        self.db.setFeedItemReadFlag(feedId, "a", True)
+        self.db.setFeedItemReadFlag(feedId, "a", True)
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 1)
+
+        self.db.deleteFeedItem(feedId, "b")
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 0)
+
+        self.db.setFeedReadFlagAllItems(feedId, False)
+        self.assertEqual(self.db.getFeedItemUnreadCount(feedId), 2)
+
+        self.db.deleteFeed(otherFeedId)
+        self.assertEqual(self.db.getAllUnreadCounts(), {feedId: 2})
+
+    def test_itemsOfInterest(self):
+        self.db.open(self.dbPath)
+        feedId = self.addFeed()
+        self.db.ingestFeedItems([createFeedItem("a"), createFeedItem("b", readFlag=True), createFeedItem("c")], feedId)
+
+        self.db.addItemOfInterest(feedId, "a")
+        self.db.addItemOfInterest(feedId, "a")
+        self.db.addItemOfInterest(feedId, "b")
+        self.db.addItemOfInterest(feedId, "deleted")
+
+        self.assertEqual(len(self.db.getItemsOfInterest()), 3)
+        self.assertEqual(self.db.getUnreadCountForItemsOfInterest(), 1)
+
+        unreadCount, feedItemList = self.db.getItemsOfInterestFeedItemHeaders()
+        self.assertEqual(unreadCount, 1)
+        self.assertEqual(sorted(feedItem.m_guid for feedItem in feedItemList), ["a", "b"])
+        self.assertTrue(all(feedItem.isValid() for feedItem in feedItemList))
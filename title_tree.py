@@ -29,10 +29,12 @@ class TitleTree(QtCore.QObject):
 
     movementKeys = [ QtCore.Qt.Key.Key_Up, QtCore.Qt.Key.Key_Down, QtCore.Qt.Key.Key_PageUp, QtCore.Qt.Key.Key_PageDown ]
 
-    def __init__(self, db, treeView: QtWidgets.QTreeView, languageFilter, keyboardHandler: KeyboardHandler, imagePrefetcher):
+    def __init__(self, db, dbWriter, readStateBuffer, treeView: QtWidgets.QTreeView, languageFilter, keyboardHandler: KeyboardHandler, imagePrefetcher):
         super(TitleTree, self).__init__()
 
         self.db = db
+        self.dbWriter = dbWriter
+        self.readStateBuffer = readStateBuffer
         self.languageFilter = languageFilter
         self.titleTreeView = treeView
         self.keyboardHandler = keyboardHandler
@@ -63,17 +65,20 @@ class TitleTree(QtCore.QObject):
         self.actionMarkAsRead = QtGui.QAction("Mark as read")
         self.actionMarkAsUnread = QtGui.QAction("Mark as unread")
         self.actionDelete = QtGui.QAction("Delete")
+        self.actionAddToItemsOfInterest = QtGui.QAction("Add to Items of Interest")
         self.actionDownloadEnclosure = QtGui.QAction("Download Enclosure")
 
         # TODO: Add grouper stuff
         self.actionMarkAsRead.triggered.connect(self.onMarkAsRead)
         self.actionMarkAsUnread.triggered.connect(self.onMarkAsUnread)
         self.actionDelete.triggered.connect(self.onDelete)
+        self.actionAddToItemsOfInterest.triggered.connect(self.onAddToItemsOfInterest)
         self.actionDownloadEnclosure.triggered.connect(self.onDownloadEnclosure)
 
         self.contextMenu.addAction(self.actionMarkAsRead)
         self.contextMenu.addAction(self.actionMarkAsUnread)
         self.contextMenu.addAction(self.actionDelete)
+        self.contextMenu.addAction(self.actionAddToItemsOfInterest)
         self.contextMenu.addAction(self.actionDownloadEnclosure)
 
     def configureTree(self):
@@ -171,18 +176,22 @@ class TitleTree(QtCore.QObject):
 
     def onMarkAsRead(self):
         self.markRowAsRead(self.rowClicked)
-        self.db.setFeedItemReadFlag(self.feedId, self.feedItemGuid, True)
+        self.readStateBuffer.setFeedItemReadFlag(self.feedId, self.feedItemGuid, True)
 
     def onMarkAsUnread(self):
         self.markRowAsUnread(self.rowClicked)
-        self.db.setFeedItemReadFlag(self.feedId, self.feedItemGuid, False)
+        self.readStateBuffer.setFeedItemReadFlag(self.feedId, self.feedItemGuid, False)
 
     def onDelete(self):
-        self.db.deleteFeedItem(self.feedId, self.feedItemGuid)
+        self.dbWriter.deleteFeedItem(self.feedId, self.feedItemGuid)
 
         # Remove from UI
         self.model.takeRow(self.rowClicked)
 
+    def onAddToItemsOfInterest(self):
+        # An archived feed item is moved back to the main database
+        self.dbWriter.addItemOfInterest(self.feedId, self.feedItemGuid)
+
     def onDownloadEnclosure(self):
         enclosureUrl = self.getEnclosureUrlForRow(self.rowClicked)
         self.downloadEnclosureSignal.emit(enclosureUrl)
@@ -231,7 +240,8 @@ class TitleTree(QtCore.QObject):
             item.setSizeHint(sizeHint)
 
     def addFeedItems(self, feedItemList, feed, sameFeed=False):
-        """ Removes existing feed items from the tree, if any, and adds the given feed item list.
+        """ Removes existing feed items from the tree, if any, and adds the given feed items (either FeedItem or
+            FeedItemHeader objects).
             If sameFeed is True, the feed items are from the same feed as the tree was already
             displaying.  In that case, an attempt is made to keep the same feed item selected. """
         self.disableUserActions()
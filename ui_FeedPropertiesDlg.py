@@ -15,16 +15,17 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QFont, QFontDatabase, QGradient, QIcon,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QAbstractButton, QApplication, QDialog, QDialogButtonBox,
-    QFormLayout, QFrame, QHBoxLayout, QLabel,
-    QSizePolicy, QSpacerItem, QVBoxLayout, QWidget)
+from PySide6.QtWidgets import (QAbstractButton, QApplication, QCheckBox, QDialog,
+    QDialogButtonBox, QFormLayout, QFrame, QGroupBox,
+    QHBoxLayout, QLabel, QSizePolicy, QSpacerItem,
+    QSpinBox, QVBoxLayout, QWidget)
 import PyRssReader_rc
 
 class Ui_FeedPropertiesDlg(object):
     def setupUi(self, FeedPropertiesDlg):
         if not FeedPropertiesDlg.objectName():
             FeedPropertiesDlg.setObjectName(u"FeedPropertiesDlg")
-        FeedPropertiesDlg.resize(359, 183)
+        FeedPropertiesDlg.resize(359, 300)
         icon = QIcon()
         icon.addFile(u":/RssReader/Resources/RssReader.ico", QSize(), QIcon.Mode.Normal, QIcon.State.Off)
         FeedPropertiesDlg.setWindowIcon(icon)
@@ -112,9 +113,111 @@ class Ui_FeedPropertiesDlg(object):
 
         self.formLayout.setWidget(2, QFormLayout.FieldRole, self.lastPurgedLabel)
 
+        self.label_6 = QLabel(FeedPropertiesDlg)
+        self.label_6.setObjectName(u"label_6")
+
+        self.formLayout.setWidget(3, QFormLayout.LabelRole, self.label_6)
+
+        self.itemCountLabel = QLabel(FeedPropertiesDlg)
+        self.itemCountLabel.setObjectName(u"itemCountLabel")
+
+        self.formLayout.setWidget(3, QFormLayout.FieldRole, self.itemCountLabel)
+
+        self.label_9 = QLabel(FeedPropertiesDlg)
+        self.label_9.setObjectName(u"label_9")
+
+        self.formLayout.setWidget(4, QFormLayout.LabelRole, self.label_9)
+
+        self.nextUpdateLabel = QLabel(FeedPropertiesDlg)
+        self.nextUpdateLabel.setObjectName(u"nextUpdateLabel")
+
+        self.formLayout.setWidget(4, QFormLayout.FieldRole, self.nextUpdateLabel)
+
 
         self.verticalLayout.addLayout(self.formLayout)
 
+        self.verticalSpacer_3 = QSpacerItem(20, 8, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Fixed)
+
+        self.verticalLayout.addItem(self.verticalSpacer_3)
+
+        self.retentionGroupBox = QGroupBox(FeedPropertiesDlg)
+        self.retentionGroupBox.setObjectName(u"retentionGroupBox")
+        self.formLayout_2 = QFormLayout(self.retentionGroupBox)
+        self.formLayout_2.setSpacing(6)
+        self.formLayout_2.setContentsMargins(11, 11, 11, 11)
+        self.formLayout_2.setObjectName(u"formLayout_2")
+        self.formLayout_2.setHorizontalSpacing(3)
+        self.formLayout_2.setVerticalSpacing(3)
+        self.label_7 = QLabel(self.retentionGroupBox)
+        self.label_7.setObjectName(u"label_7")
+
+        self.formLayout_2.setWidget(0, QFormLayout.LabelRole, self.label_7)
+
+        self.retentionDaysSpinBox = QSpinBox(self.retentionGroupBox)
+        self.retentionDaysSpinBox.setObjectName(u"retentionDaysSpinBox")
+        self.retentionDaysSpinBox.setMaximum(3650)
+
+        self.formLayout_2.setWidget(0, QFormLayout.FieldRole, self.retentionDaysSpinBox)
+
+        self.label_8 = QLabel(self.retentionGroupBox)
+        self.label_8.setObjectName(u"label_8")
+
+        self.formLayout_2.setWidget(1, QFormLayout.LabelRole, self.label_8)
+
+        self.retentionItemsSpinBox = QSpinBox(self.retentionGroupBox)
+        self.retentionItemsSpinBox.setObjectName(u"retentionItemsSpinBox")
+        self.retentionItemsSpinBox.setMaximum(100000)
+        self.retentionItemsSpinBox.setSingleStep(100)
+
+        self.formLayout_2.setWidget(1, QFormLayout.FieldRole, self.retentionItemsSpinBox)
+
+        self.keepUnreadCheckBox = QCheckBox(self.retentionGroupBox)
+        self.keepUnreadCheckBox.setObjectName(u"keepUnreadCheckBox")
+
+        self.formLayout_2.setWidget(2, QFormLayout.SpanningRole, self.keepUnreadCheckBox)
+
+        self.keepItemsOfInterestCheckBox = QCheckBox(self.retentionGroupBox)
+        self.keepItemsOfInterestCheckBox.setObjectName(u"keepItemsOfInterestCheckBox")
+
+        self.formLayout_2.setWidget(3, QFormLayout.SpanningRole, self.keepItemsOfInterestCheckBox)
+
+
+        self.verticalLayout.addWidget(self.retentionGroupBox)
+
+        self.updatesGroupBox = QGroupBox(FeedPropertiesDlg)
+        self.updatesGroupBox.setObjectName(u"updatesGroupBox")
+        self.formLayout_3 = QFormLayout(self.updatesGroupBox)
+        self.formLayout_3.setSpacing(6)
+        self.formLayout_3.setContentsMargins(11, 11, 11, 11)
+        self.formLayout_3.setObjectName(u"formLayout_3")
+        self.formLayout_3.setHorizontalSpacing(3)
+        self.formLayout_3.setVerticalSpacing(3)
+        self.label_10 = QLabel(self.updatesGroupBox)
+        self.label_10.setObjectName(u"label_10")
+
+        self.formLayout_3.setWidget(0, QFormLayout.LabelRole, self.label_10)
+
+        self.minUpdateIntervalSpinBox = QSpinBox(self.updatesGroupBox)
+        self.minUpdateIntervalSpinBox.setObjectName(u"minUpdateIntervalSpinBox")
+        self.minUpdateIntervalSpinBox.setMaximum(43200)
+        self.minUpdateIntervalSpinBox.setSingleStep(5)
+
+        self.formLayout_3.setWidget(0, QFormLayout.FieldRole, self.minUpdateIntervalSpinBox)
+
+        self.label_11 = QLabel(self.updatesGroupBox)
+        self.label_11.setObjectName(u"label_11")
+
+        self.formLayout_3.setWidget(1, QFormLayout.LabelRole, self.label_11)
+
+        self.maxUpdateIntervalSpinBox = QSpinBox(self.updatesGroupBox)
+        self.maxUpdateIntervalSpinBox.setObjectName(u"maxUpdateIntervalSpinBox")
+        self.maxUpdateIntervalSpinBox.setMaximum(720)
+
+        self.formLayout_3.setWidget(1, QFormLayout.FieldRole, self.maxUpdateIntervalSpinBox)
+
+
+        self.verticalLayout.addWidget(self.updatesGroupBox)
+
         self.verticalSpacer = QSpacerItem(20, 14, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
 
         self.verticalLayout.addItem(self.verticalSpacer)
@@ -128,7 +231,7 @@ class Ui_FeedPropertiesDlg(object):
 
         self.buttonBox = QDialogButtonBox(FeedPropertiesDlg)
         self.buttonBox.setObjectName(u"buttonBox")
-        self.buttonBox.setStandardButtons(QDialogButtonBox.StandardButton.Close)
+        self.buttonBox.setStandardButtons(QDialogButtonBox.StandardButton.Cancel|QDialogButtonBox.StandardButton.Ok)
 
         self.verticalLayout.addWidget(self.buttonBox)
 
@@ -151,5 +254,36 @@ class Ui_FeedPropertiesDlg(object):
         self.lastUpdatedLabel.setText(QCoreApplication.translate("FeedPropertiesDlg", u"-", None))
         self.label_5.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Last Purged:", None))
         self.lastPurgedLabel.setText(QCoreApplication.translate("FeedPropertiesDlg", u"-", None))
+        self.label_6.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Feed Items:", None))
+        self.itemCountLabel.setText(QCoreApplication.translate("FeedPropertiesDlg", u"-", None))
+        self.label_9.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Next Update:", None))
+        self.nextUpdateLabel.setText(QCoreApplication.translate("FeedPropertiesDlg", u"-", None))
+        self.retentionGroupBox.setTitle(QCoreApplication.translate("FeedPropertiesDlg", u"Retention", None))
+        self.label_7.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Maximum Age:", None))
+#if QT_CONFIG(tooltip)
+        self.retentionDaysSpinBox.setToolTip(QCoreApplication.translate("FeedPropertiesDlg", u"Feed items older than this are deleted when the feed is updated", None))
+#endif // QT_CONFIG(tooltip)
+        self.retentionDaysSpinBox.setSpecialValueText(QCoreApplication.translate("FeedPropertiesDlg", u"No limit", None))
+        self.retentionDaysSpinBox.setSuffix(QCoreApplication.translate("FeedPropertiesDlg", u" days", None))
+        self.label_8.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Maximum Items:", None))
+#if QT_CONFIG(tooltip)
+        self.retentionItemsSpinBox.setToolTip(QCoreApplication.translate("FeedPropertiesDlg", u"When the feed is updated, its oldest feed items are deleted to keep it within this number of items", None))
+#endif // QT_CONFIG(tooltip)
+        self.retentionItemsSpinBox.setSpecialValueText(QCoreApplication.translate("FeedPropertiesDlg", u"No limit", None))
+        self.keepUnreadCheckBox.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Keep unread items", None))
+        self.keepItemsOfInterestCheckBox.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Keep Items of Interest", None))
+        self.updatesGroupBox.setTitle(QCoreApplication.translate("FeedPropertiesDlg", u"Updates", None))
+        self.label_10.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Shortest Interval:", None))
+#if QT_CONFIG(tooltip)
+        self.minUpdateIntervalSpinBox.setToolTip(QCoreApplication.translate("FeedPropertiesDlg", u"The feed is not updated more often than this, however often it posts", None))
+#endif // QT_CONFIG(tooltip)
+        self.minUpdateIntervalSpinBox.setSpecialValueText(QCoreApplication.translate("FeedPropertiesDlg", u"Default", None))
+        self.minUpdateIntervalSpinBox.setSuffix(QCoreApplication.translate("FeedPropertiesDlg", u" minutes", None))
+        self.label_11.setText(QCoreApplication.translate("FeedPropertiesDlg", u"Longest Interval:", None))
+#if QT_CONFIG(tooltip)
+        self.maxUpdateIntervalSpinBox.setToolTip(QCoreApplication.translate("FeedPropertiesDlg", u"The feed is updated at least this often, however rarely it posts", None))
+#endif // QT_CONFIG(tooltip)
+        self.maxUpdateIntervalSpinBox.setSpecialValueText(QCoreApplication.translate("FeedPropertiesDlg", u"Default", None))
+        self.maxUpdateIntervalSpinBox.setSuffix(QCoreApplication.translate("FeedPropertiesDlg", u" hours", None))
     # retranslateUi
 
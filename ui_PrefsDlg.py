@@ -26,7 +26,7 @@ class Ui_PrefsDlg(object):
     def setupUi(self, PrefsDlg):
         if not PrefsDlg.objectName():
             PrefsDlg.setObjectName(u"PrefsDlg")
-        PrefsDlg.resize(395, 492)
+        PrefsDlg.resize(395, 700)
         icon = QIcon()
         icon.addFile(u":/RssReader/Resources/RssReader.ico", QSize(), QIcon.Mode.Normal, QIcon.State.Off)
         PrefsDlg.setWindowIcon(icon)
@@ -91,6 +91,56 @@ class Ui_PrefsDlg(object):
 
         self.verticalLayout.addLayout(self.horizontalLayout)
 
+        self.horizontalLayout_7 = QHBoxLayout()
+        self.horizontalLayout_7.setSpacing(6)
+        self.horizontalLayout_7.setObjectName(u"horizontalLayout_7")
+        self.label_25 = QLabel(PrefsDlg)
+        self.label_25.setObjectName(u"label_25")
+
+        self.horizontalLayout_7.addWidget(self.label_25)
+
+        self.maxIntervalSpin = QSpinBox(PrefsDlg)
+        self.maxIntervalSpin.setObjectName(u"maxIntervalSpin")
+        self.maxIntervalSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.maxIntervalSpin.setMinimum(1)
+        self.maxIntervalSpin.setMaximum(720)
+        self.maxIntervalSpin.setValue(24)
+
+        self.horizontalLayout_7.addWidget(self.maxIntervalSpin)
+
+        self.label_26 = QLabel(PrefsDlg)
+        self.label_26.setObjectName(u"label_26")
+
+        self.horizontalLayout_7.addWidget(self.label_26)
+
+
+        self.verticalLayout.addLayout(self.horizontalLayout_7)
+
+        self.horizontalLayout_6 = QHBoxLayout()
+        self.horizontalLayout_6.setSpacing(6)
+        self.horizontalLayout_6.setObjectName(u"horizontalLayout_6")
+        self.label_23 = QLabel(PrefsDlg)
+        self.label_23.setObjectName(u"label_23")
+
+        self.horizontalLayout_6.addWidget(self.label_23)
+
+        self.maxConcurrentUpdatesSpin = QSpinBox(PrefsDlg)
+        self.maxConcurrentUpdatesSpin.setObjectName(u"maxConcurrentUpdatesSpin")
+        self.maxConcurrentUpdatesSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.maxConcurrentUpdatesSpin.setMinimum(1)
+        self.maxConcurrentUpdatesSpin.setMaximum(64)
+        self.maxConcurrentUpdatesSpin.setValue(16)
+
+        self.horizontalLayout_6.addWidget(self.maxConcurrentUpdatesSpin)
+
+        self.label_24 = QLabel(PrefsDlg)
+        self.label_24.setObjectName(u"label_24")
+
+        self.horizontalLayout_6.addWidget(self.label_24)
+
+
+        self.verticalLayout.addLayout(self.horizontalLayout_6)
+
         self.verticalSpacer_5 = QSpacerItem(20, 10, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
 
         self.verticalLayout.addItem(self.verticalSpacer_5)
@@ -254,6 +304,144 @@ class Ui_PrefsDlg(object):
 
         self.verticalLayout.addItem(self.verticalSpacer_3)
 
+        self.label_14 = QLabel(PrefsDlg)
+        self.label_14.setObjectName(u"label_14")
+        self.label_14.setFont(font1)
+
+        self.verticalLayout.addWidget(self.label_14)
+
+        self.line_6 = QFrame(PrefsDlg)
+        self.line_6.setObjectName(u"line_6")
+        self.line_6.setFrameShape(QFrame.Shape.HLine)
+        self.line_6.setFrameShadow(QFrame.Shadow.Sunken)
+
+        self.verticalLayout.addWidget(self.line_6)
+
+        self.formLayout_2 = QFormLayout()
+        self.formLayout_2.setSpacing(6)
+        self.formLayout_2.setObjectName(u"formLayout_2")
+        self.formLayout_2.setVerticalSpacing(3)
+        self.label_15 = QLabel(PrefsDlg)
+        self.label_15.setObjectName(u"label_15")
+
+        self.formLayout_2.setWidget(0, QFormLayout.LabelRole, self.label_15)
+
+        self.journalModeCombo = QComboBox(PrefsDlg)
+        self.journalModeCombo.addItem("")
+        self.journalModeCombo.addItem("")
+        self.journalModeCombo.addItem("")
+        self.journalModeCombo.setObjectName(u"journalModeCombo")
+
+        self.formLayout_2.setWidget(0, QFormLayout.FieldRole, self.journalModeCombo)
+
+        self.label_16 = QLabel(PrefsDlg)
+        self.label_16.setObjectName(u"label_16")
+
+        self.formLayout_2.setWidget(1, QFormLayout.LabelRole, self.label_16)
+
+        self.synchronousCombo = QComboBox(PrefsDlg)
+        self.synchronousCombo.addItem("")
+        self.synchronousCombo.addItem("")
+        self.synchronousCombo.addItem("")
+        self.synchronousCombo.setObjectName(u"synchronousCombo")
+
+        self.formLayout_2.setWidget(1, QFormLayout.FieldRole, self.synchronousCombo)
+
+        self.label_17 = QLabel(PrefsDlg)
+        self.label_17.setObjectName(u"label_17")
+
+        self.formLayout_2.setWidget(2, QFormLayout.LabelRole, self.label_17)
+
+        self.cacheSizeSpin = QSpinBox(PrefsDlg)
+        self.cacheSizeSpin.setObjectName(u"cacheSizeSpin")
+        self.cacheSizeSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.cacheSizeSpin.setMaximum(4096)
+
+        self.formLayout_2.setWidget(2, QFormLayout.FieldRole, self.cacheSizeSpin)
+
+        self.label_18 = QLabel(PrefsDlg)
+        self.label_18.setObjectName(u"label_18")
+
+        self.formLayout_2.setWidget(3, QFormLayout.LabelRole, self.label_18)
+
+        self.mmapSizeSpin = QSpinBox(PrefsDlg)
+        self.mmapSizeSpin.setObjectName(u"mmapSizeSpin")
+        self.mmapSizeSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.mmapSizeSpin.setMaximum(65536)
+
+        self.formLayout_2.setWidget(3, QFormLayout.FieldRole, self.mmapSizeSpin)
+
+        self.label_19 = QLabel(PrefsDlg)
+        self.label_19.setObjectName(u"label_19")
+
+        self.formLayout_2.setWidget(4, QFormLayout.LabelRole, self.label_19)
+
+        self.busyTimeoutSpin = QSpinBox(PrefsDlg)
+        self.busyTimeoutSpin.setObjectName(u"busyTimeoutSpin")
+        self.busyTimeoutSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.busyTimeoutSpin.setMaximum(600000)
+
+        self.formLayout_2.setWidget(4, QFormLayout.FieldRole, self.busyTimeoutSpin)
+
+        self.tempStoreMemoryCheckbox = QCheckBox(PrefsDlg)
+        self.tempStoreMemoryCheckbox.setObjectName(u"tempStoreMemoryCheckbox")
+
+        self.formLayout_2.setWidget(5, QFormLayout.FieldRole, self.tempStoreMemoryCheckbox)
+
+        self.compressBodiesCheckbox = QCheckBox(PrefsDlg)
+        self.compressBodiesCheckbox.setObjectName(u"compressBodiesCheckbox")
+
+        self.formLayout_2.setWidget(6, QFormLayout.FieldRole, self.compressBodiesCheckbox)
+
+        self.label_20 = QLabel(PrefsDlg)
+        self.label_20.setObjectName(u"label_20")
+
+        self.formLayout_2.setWidget(7, QFormLayout.LabelRole, self.label_20)
+
+        self.archiveDaysSpin = QSpinBox(PrefsDlg)
+        self.archiveDaysSpin.setObjectName(u"archiveDaysSpin")
+        self.archiveDaysSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.archiveDaysSpin.setMaximum(3650)
+
+        self.formLayout_2.setWidget(7, QFormLayout.FieldRole, self.archiveDaysSpin)
+
+        self.label_21 = QLabel(PrefsDlg)
+        self.label_21.setObjectName(u"label_21")
+
+        self.formLayout_2.setWidget(8, QFormLayout.LabelRole, self.label_21)
+
+        self.backupIntervalSpin = QSpinBox(PrefsDlg)
+        self.backupIntervalSpin.setObjectName(u"backupIntervalSpin")
+        self.backupIntervalSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.backupIntervalSpin.setMaximum(720)
+
+        self.formLayout_2.setWidget(8, QFormLayout.FieldRole, self.backupIntervalSpin)
+
+        self.label_22 = QLabel(PrefsDlg)
+        self.label_22.setObjectName(u"label_22")
+
+        self.formLayout_2.setWidget(9, QFormLayout.LabelRole, self.label_22)
+
+        self.backupCountSpin = QSpinBox(PrefsDlg)
+        self.backupCountSpin.setObjectName(u"backupCountSpin")
+        self.backupCountSpin.setAlignment(Qt.AlignmentFlag.AlignRight|Qt.AlignmentFlag.AlignTrailing|Qt.AlignmentFlag.AlignVCenter)
+        self.backupCountSpin.setMinimum(1)
+        self.backupCountSpin.setMaximum(100)
+
+        self.formLayout_2.setWidget(9, QFormLayout.FieldRole, self.backupCountSpin)
+
+        self.showDatabaseSettingsButton = QPushButton(PrefsDlg)
+        self.showDatabaseSettingsButton.setObjectName(u"showDatabaseSettingsButton")
+
+        self.formLayout_2.setWidget(10, QFormLayout.FieldRole, self.showDatabaseSettingsButton)
+
+
+        self.verticalLayout.addLayout(self.formLayout_2)
+
+        self.verticalSpacer_6 = QSpacerItem(20, 13, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Expanding)
+
+        self.verticalLayout.addItem(self.verticalSpacer_6)
+
         self.label_4 = QLabel(PrefsDlg)
         self.label_4.setObjectName(u"label_4")
         self.label_4.setFont(font1)
@@ -314,8 +502,15 @@ class Ui_PrefsDlg(object):
         PrefsDlg.setWindowTitle(QCoreApplication.translate("PrefsDlg", u"Preferences", None))
         self.label_12.setText(QCoreApplication.translate("PrefsDlg", u"Feeds", None))
         self.updateOnStartCheckbox.setText(QCoreApplication.translate("PrefsDlg", u"Update feeds on startup", None))
-        self.label.setText(QCoreApplication.translate("PrefsDlg", u"Update Feeds Every", None))
+        self.label.setText(QCoreApplication.translate("PrefsDlg", u"Update each feed at most every", None))
         self.label_2.setText(QCoreApplication.translate("PrefsDlg", u"minutes", None))
+        self.label_25.setText(QCoreApplication.translate("PrefsDlg", u"and at least every", None))
+#if QT_CONFIG(tooltip)
+        self.maxIntervalSpin.setToolTip(QCoreApplication.translate("PrefsDlg", u"Feeds are updated more or less often depending on how often they post, within these limits", None))
+#endif // QT_CONFIG(tooltip)
+        self.label_26.setText(QCoreApplication.translate("PrefsDlg", u"hours", None))
+        self.label_23.setText(QCoreApplication.translate("PrefsDlg", u"Fetch up to", None))
+        self.label_24.setText(QCoreApplication.translate("PrefsDlg", u"feeds at a time", None))
         self.label_11.setText(QCoreApplication.translate("PrefsDlg", u"User Interface", None))
         self.minimizeOnFocusOutCheckbox.setText(QCoreApplication.translate("PrefsDlg", u"Minimize App when Lose Focus", None))
         self.label_5.setText(QCoreApplication.translate("PrefsDlg", u"Enclosures", None))
@@ -333,6 +528,39 @@ class Ui_PrefsDlg(object):
         self.label_8.setText(QCoreApplication.translate("PrefsDlg", u"Proxy port", None))
         self.label_9.setText(QCoreApplication.translate("PrefsDlg", u"Proxy user ID", None))
         self.label_13.setText(QCoreApplication.translate("PrefsDlg", u"Proxy password", None))
+        self.label_14.setText(QCoreApplication.translate("PrefsDlg", u"Database", None))
+        self.label_15.setText(QCoreApplication.translate("PrefsDlg", u"Journal mode", None))
+        self.journalModeCombo.setItemText(0, QCoreApplication.translate("PrefsDlg", u"WAL", None))
+        self.journalModeCombo.setItemText(1, QCoreApplication.translate("PrefsDlg", u"Delete", None))
+        self.journalModeCombo.setItemText(2, QCoreApplication.translate("PrefsDlg", u"Truncate", None))
+
+        self.label_16.setText(QCoreApplication.translate("PrefsDlg", u"Synchronous", None))
+        self.synchronousCombo.setItemText(0, QCoreApplication.translate("PrefsDlg", u"Off", None))
+        self.synchronousCombo.setItemText(1, QCoreApplication.translate("PrefsDlg", u"Normal", None))
+        self.synchronousCombo.setItemText(2, QCoreApplication.translate("PrefsDlg", u"Full", None))
+
+        self.label_17.setText(QCoreApplication.translate("PrefsDlg", u"Page cache size", None))
+        self.cacheSizeSpin.setSuffix(QCoreApplication.translate("PrefsDlg", u" MB", None))
+        self.label_18.setText(QCoreApplication.translate("PrefsDlg", u"Memory-mapped size", None))
+        self.mmapSizeSpin.setSuffix(QCoreApplication.translate("PrefsDlg", u" MB", None))
+        self.label_19.setText(QCoreApplication.translate("PrefsDlg", u"Busy timeout", None))
+        self.busyTimeoutSpin.setSuffix(QCoreApplication.translate("PrefsDlg", u" ms", None))
+        self.tempStoreMemoryCheckbox.setText(QCoreApplication.translate("PrefsDlg", u"Keep temporary tables in memory", None))
+        self.compressBodiesCheckbox.setText(QCoreApplication.translate("PrefsDlg", u"Compress article text", None))
+        self.label_20.setText(QCoreApplication.translate("PrefsDlg", u"Archive items older than", None))
+#if QT_CONFIG(tooltip)
+        self.archiveDaysSpin.setToolTip(QCoreApplication.translate("PrefsDlg", u"Read feed items older than this are moved to the archive database after each update", None))
+#endif // QT_CONFIG(tooltip)
+        self.archiveDaysSpin.setSpecialValueText(QCoreApplication.translate("PrefsDlg", u"Never", None))
+        self.archiveDaysSpin.setSuffix(QCoreApplication.translate("PrefsDlg", u" days", None))
+        self.label_21.setText(QCoreApplication.translate("PrefsDlg", u"Back up every", None))
+#if QT_CONFIG(tooltip)
+        self.backupIntervalSpin.setToolTip(QCoreApplication.translate("PrefsDlg", u"Snapshots of the database are taken while the application is running, between feed updates", None))
+#endif // QT_CONFIG(tooltip)
+        self.backupIntervalSpin.setSpecialValueText(QCoreApplication.translate("PrefsDlg", u"Never", None))
+        self.backupIntervalSpin.setSuffix(QCoreApplication.translate("PrefsDlg", u" hours", None))
+        self.label_22.setText(QCoreApplication.translate("PrefsDlg", u"Backups kept", None))
+        self.showDatabaseSettingsButton.setText(QCoreApplication.translate("PrefsDlg", u"Show Effective Settings...", None))
         self.label_4.setText(QCoreApplication.translate("PrefsDlg", u"Logging level", None))
         self.loggingLevelComboBox.setItemText(0, QCoreApplication.translate("PrefsDlg", u"Trace", None))
         self.loggingLevelComboBox.setItemText(1, QCoreApplication.translate("PrefsDlg", u"Debug", None))
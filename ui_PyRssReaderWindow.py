@@ -64,6 +64,8 @@ class Ui_RssReaderWindow(object):
         self.actionEdit_Ad_Filter.setObjectName(u"actionEdit_Ad_Filter")
         self.actionImport_OPML = QAction(RssReaderWindow)
         self.actionImport_OPML.setObjectName(u"actionImport_OPML")
+        self.actionCompact_Database = QAction(RssReaderWindow)
+        self.actionCompact_Database.setObjectName(u"actionCompact_Database")
         self.actionAdd_to_Instapaper = QAction(RssReaderWindow)
         self.actionAdd_to_Instapaper.setObjectName(u"actionAdd_to_Instapaper")
         icon1 = QIcon()
@@ -202,6 +204,8 @@ class Ui_RssReaderWindow(object):
         self.menuExit.addAction(self.actionImport_OPML)
         self.menuExit.addAction(self.actionExport_OPML)
         self.menuExit.addSeparator()
+        self.menuExit.addAction(self.actionCompact_Database)
+        self.menuExit.addSeparator()
         self.menuExit.addAction(self.actionExit)
         self.menuExit.addSeparator()
         self.menuGroup_By.addAction(self.actionNo_Groups)
@@ -239,6 +243,10 @@ class Ui_RssReaderWindow(object):
         self.actionExport_OPML.setText(QCoreApplication.translate("RssReaderWindow", u"Export OPML...", None))
         self.actionEdit_Ad_Filter.setText(QCoreApplication.translate("RssReaderWindow", u"Edit Ad Filter", None))
         self.actionImport_OPML.setText(QCoreApplication.translate("RssReaderWindow", u"Import OPML...", None))
+        self.actionCompact_Database.setText(QCoreApplication.translate("RssReaderWindow", u"Compact Database", None))
+#if QT_CONFIG(tooltip)
+        self.actionCompact_Database.setToolTip(QCoreApplication.translate("RssReaderWindow", u"Rewrite the database file, removing all unused space", None))
+#endif // QT_CONFIG(tooltip)
         self.actionAdd_to_Instapaper.setText(QCoreApplication.translate("RssReaderWindow", u"Add to Instapaper", None))
         self.feedImageLabel.setText("")
         self.feedNameLabel.setText(QCoreApplication.translate("RssReaderWindow", u"Feed Name", None))
@@ -5,6 +5,12 @@ import time
 import datetime
 from datetime import timezone
 import logging
+import re
+import html
+
+# Used by htmlToPlainText()
+kScriptOrStyleElementRegex = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+kHtmlTagRegex = re.compile(r"<[^>]*>")
 
 def julianDayToDate(julianDay):
     """ Returns a Python datetime object corresponding to the given Julian day. """
@@ -19,6 +25,16 @@ def dateToJulianDay(inDate):
     """ Returns a Julian day (ie, a 'timestamp') for the given date. """
     return int(time.mktime(inDate.timetuple()))
 
+def htmlToPlainText(htmlText):
+    """ Returns the text of the given HTML, with the tags (and any scripts and style sheets) removed, and the
+        character entities decoded. """
+    if not htmlText:
+        return ""
+
+    text = kScriptOrStyleElementRegex.sub(" ", htmlText)
+    text = kHtmlTagRegex.sub(" ", text)
+    return html.unescape(text)
+
 def getTextFileFromResource(filename):
     file = QtCore.QFile(f":/RssReader/Resources/{filename}")
     if file.open(QtCore.QIODevice.OpenModeFlag.ReadOnly | QtCore.QIODevice.OpenModeFlag.Text):